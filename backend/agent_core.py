@@ -3,31 +3,54 @@ import re
 from db import save_prompt, mark_saved
 from sources_manager import add_source, get_all_sources
 from scraper import search_on_demand
+from jobs import submit_job
+from utils import normalize_text
 from calendar_utils import add_event
 from file_manager import create_folder
 from ai_agent import parse_with_ai, is_ai_enabled
 from conversation_manager import save_conversation, log_ai_api_call
 
-# Κρατάμε το τελευταίο conversation_id
-last_conversation_id = None
+def _search_job(job, query: str) -> dict:
+    n = search_on_demand(query)
+    return {
+        "new_articles": n,
+        "message": f"[OK] Βρέθηκαν {n} νέα σχετικά αποτελέσματα για '{query}'. Δες το tab 'Νέα'."
+    }
+
+def _start_search(query: str) -> tuple:
+    """
+    Η αναζήτηση στο web κρατάει αρκετά δευτερόλεπτα: τρέχει ως background job
+    (βλ. jobs.py) και το prompt απαντάει αμέσως με το job id
+
+    Returns:
+        (μήνυμα για τον χρήστη, job id)
+    """
+    job, created = submit_job("search", _search_job, query, key=normalize_text(query),
+                              description=f"Αναζήτηση: {query}")
+    if not created:
+        return f"[INFO] Η αναζήτηση για '{query}' εκτελείται ήδη. Τα αποτελέσματα θα εμφανιστούν στο tab 'Νέα'.", job.id
+    return f"[OK] Η αναζήτηση για '{query}' ξεκίνησε. Τα αποτελέσματα θα εμφανιστούν στο tab 'Νέα'.", job.id
 
 def handle_prompt(prompt: str) -> dict:
     """
-    Επεξεργασία prompt και επιστροφή dict με reply και conversation_id
+    Επεξεργασία prompt και επιστροφή dict με reply, conversation_id και
+    job_id (για αναζητήσεις που τρέχουν στο background, αλλιώς None)
+
+    Το /prompt τρέχει στο threadpool, οπότε conversation_id και job_id
+    συλλέγονται ανά κλήση (στο result) και όχι σε module globals.
     """
-    global last_conversation_id
     save_prompt(prompt)
+    result = {"conversation_id": None, "job_id": None}
+    result["reply"] = _execute_prompt_logic(prompt, result)
+    return result
 
-    response_text = _execute_prompt_logic(prompt)
-
-    return {
-        "reply": response_text,
-        "conversation_id": last_conversation_id
-    }
+def _execute_prompt_logic(prompt: str, result: dict) -> str:
+    """
+    Εσωτερική function που εκτελεί τη λογική του prompt
 
-def _execute_prompt_logic(prompt: str) -> str:
-    """Εσωτερική function που εκτελεί τη λογική του prompt"""
-    global last_conversation_id
+    Args:
+        result: Dict της κλήσης όπου γράφονται conversation_id και job_id
+    """
     save_prompt(prompt)
 
     # Αν το AI είναι ενεργοποιημένο, προσπάθησε πρώτα με AI
@@ -40,29 +63,28 @@ def _execute_prompt_logic(prompt: str) -> str:
         # Εκτέλεση της εντολής που επέστρεψε το AI
         if command == "SEARCH" and params:
             try:
-                n = search_on_demand(params)
-                response = f"[OK] Βρέθηκαν {n} νέα σχετικά αποτελέσματα για '{params}'. Δες το tab 'Νέα'."
-                last_conversation_id = save_conversation(prompt, response, f"SEARCH: {params}")
+                response, result["job_id"] = _start_search(params)
+                result["conversation_id"] = save_conversation(prompt, response, f"SEARCH: {params}")
                 if usage:
-                    log_ai_api_call(last_conversation_id, "gpt-4o-mini", usage.get("prompt_tokens", 0),
+                    log_ai_api_call(result["conversation_id"], usage.get("model"), usage.get("prompt_tokens", 0),
                                    usage.get("completion_tokens", 0), usage.get("latency_ms", 0))
                 return response
             except Exception as e:
                 response = f"[ERROR] Σφάλμα κατά την αναζήτηση: {str(e)}"
-                last_conversation_id = save_conversation(prompt, response, "SEARCH_ERROR")
+                result["conversation_id"] = save_conversation(prompt, response, "SEARCH_ERROR")
                 return response
 
         elif command == "ADD_SOURCE" and params:
             try:
                 response = add_source(params)
-                last_conversation_id = save_conversation(prompt, response, f"ADD_SOURCE: {params}")
+                result["conversation_id"] = save_conversation(prompt, response, f"ADD_SOURCE: {params}")
                 if usage:
-                    log_ai_api_call(last_conversation_id, "gpt-4o-mini", usage.get("prompt_tokens", 0),
+                    log_ai_api_call(result["conversation_id"], usage.get("model"), usage.get("prompt_tokens", 0),
                                    usage.get("completion_tokens", 0), usage.get("latency_ms", 0))
                 return response
             except Exception as e:
                 response = f"[ERROR] Σφάλμα κατά την προσθήκη πηγής: {str(e)}"
-                last_conversation_id = save_conversation(prompt, response, "ADD_SOURCE_ERROR")
+                result["conversation_id"] = save_conversation(prompt, response, "ADD_SOURCE_ERROR")
                 return response
 
         elif command == "LIST_SOURCES":
@@ -70,28 +92,28 @@ def _execute_prompt_logic(prompt: str) -> str:
                 sources = get_all_sources()
                 lines = [f"- {s['url']} ({s['type']})" for s in sources]
                 response = "Πηγές:\n" + "\n".join(lines) if lines else "Δεν υπάρχουν πηγές."
-                last_conversation_id = save_conversation(prompt, response, "LIST_SOURCES")
+                result["conversation_id"] = save_conversation(prompt, response, "LIST_SOURCES")
                 if usage:
-                    log_ai_api_call(last_conversation_id, "gpt-4o-mini", usage.get("prompt_tokens", 0),
+                    log_ai_api_call(result["conversation_id"], usage.get("model"), usage.get("prompt_tokens", 0),
                                    usage.get("completion_tokens", 0), usage.get("latency_ms", 0))
                 return response
             except Exception as e:
                 response = f"[ERROR] Σφάλμα κατά την ανάκτηση πηγών: {str(e)}"
-                last_conversation_id = save_conversation(prompt, response, "LIST_SOURCES_ERROR")
+                result["conversation_id"] = save_conversation(prompt, response, "LIST_SOURCES_ERROR")
                 return response
 
         elif command == "CREATE_FOLDER" and params:
             try:
                 create_folder(params)
                 response = f"[OK] Δημιουργήθηκε ο φάκελος: {params}"
-                last_conversation_id = save_conversation(prompt, response, f"CREATE_FOLDER: {params}")
+                result["conversation_id"] = save_conversation(prompt, response, f"CREATE_FOLDER: {params}")
                 if usage:
-                    log_ai_api_call(last_conversation_id, "gpt-4o-mini", usage.get("prompt_tokens", 0),
+                    log_ai_api_call(result["conversation_id"], usage.get("model"), usage.get("prompt_tokens", 0),
                                    usage.get("completion_tokens", 0), usage.get("latency_ms", 0))
                 return response
             except Exception as e:
                 response = f"[ERROR] Σφάλμα κατά τη δημιουργία φακέλου: {str(e)}"
-                last_conversation_id = save_conversation(prompt, response, "CREATE_FOLDER_ERROR")
+                result["conversation_id"] = save_conversation(prompt, response, "CREATE_FOLDER_ERROR")
                 return response
 
         elif command == "HELP":
@@ -103,9 +125,9 @@ def _execute_prompt_logic(prompt: str) -> str:
 • Βοήθεια - Αυτό το μήνυμα
 
 Μιλάς ελεύθερα στον agent, δεν χρειάζονται ακριβείς εντολές!"""
-            last_conversation_id = save_conversation(prompt, response, "HELP")
+            result["conversation_id"] = save_conversation(prompt, response, "HELP")
             if usage:
-                log_ai_api_call(last_conversation_id, "gpt-4o-mini", usage.get("prompt_tokens", 0),
+                log_ai_api_call(result["conversation_id"], usage.get("model"), usage.get("prompt_tokens", 0),
                                usage.get("completion_tokens", 0), usage.get("latency_ms", 0))
             return response
 
@@ -130,11 +152,11 @@ def _execute_prompt_logic(prompt: str) -> str:
             url = prompt.lower().split("πηγη")[-1].strip()
         try:
             res = add_source(url)
-            last_conversation_id = save_conversation(prompt, res, f"ADD_SOURCE: {url}")
+            result["conversation_id"] = save_conversation(prompt, res, f"ADD_SOURCE: {url}")
             return res
         except Exception as e:
             response = f"[ERROR] Σφάλμα κατά την προσθήκη πηγής: {str(e)}"
-            last_conversation_id = save_conversation(prompt, response, "ADD_SOURCE_ERROR")
+            result["conversation_id"] = save_conversation(prompt, response, "ADD_SOURCE_ERROR")
             return response
 
     if p.startswith("δείξε τις πηγές") or p.startswith("δειξε τις πηγες"):
@@ -142,11 +164,11 @@ def _execute_prompt_logic(prompt: str) -> str:
             sources = get_all_sources()
             lines = [f"- {s['url']} ({s['type']})" for s in sources]
             response = "Πηγές:\n" + "\n".join(lines) if lines else "Δεν υπάρχουν πηγές."
-            last_conversation_id = save_conversation(prompt, response, "LIST_SOURCES")
+            result["conversation_id"] = save_conversation(prompt, response, "LIST_SOURCES")
             return response
         except Exception as e:
             response = f"[ERROR] Σφάλμα κατά την ανάκτηση πηγών: {str(e)}"
-            last_conversation_id = save_conversation(prompt, response, "LIST_SOURCES_ERROR")
+            result["conversation_id"] = save_conversation(prompt, response, "LIST_SOURCES_ERROR")
             return response
 
     if p.startswith("ψάξε") or p.startswith("ψαξε"):
@@ -154,16 +176,15 @@ def _execute_prompt_logic(prompt: str) -> str:
             parts = prompt.split(" ", 1)
             if len(parts) < 2:
                 response = "[ERROR] Πρέπει να δώσεις έναν όρο αναζήτησης. Π.χ.: 'ψάξε φωτοβολταϊκά'"
-                last_conversation_id = save_conversation(prompt, response, "SEARCH_ERROR")
+                result["conversation_id"] = save_conversation(prompt, response, "SEARCH_ERROR")
                 return response
             query = parts[1].strip()
-            n = search_on_demand(query)
-            response = f"[OK] Βρέθηκαν {n} νέα σχετικά αποτελέσματα για '{query}'. Δες το tab 'Νέα'."
-            last_conversation_id = save_conversation(prompt, response, f"SEARCH: {query}")
+            response, result["job_id"] = _start_search(query)
+            result["conversation_id"] = save_conversation(prompt, response, f"SEARCH: {query}")
             return response
         except Exception as e:
             response = f"[ERROR] Σφάλμα κατά την αναζήτηση: {str(e)}"
-            last_conversation_id = save_conversation(prompt, response, "SEARCH_ERROR")
+            result["conversation_id"] = save_conversation(prompt, response, "SEARCH_ERROR")
             return response
 
     if "σημαντικό" in p or "σημαντικο" in p:
@@ -172,14 +193,14 @@ def _execute_prompt_logic(prompt: str) -> str:
             if m:
                 mark_saved(m.group(0))
                 response = "[OK] Σημάνθηκε ως σημαντικό."
-                last_conversation_id = save_conversation(prompt, response, f"MARK_SAVED: {m.group(0)}")
+                result["conversation_id"] = save_conversation(prompt, response, f"MARK_SAVED: {m.group(0)}")
                 return response
             response = "[INFO] Δώσε και το link στο ίδιο prompt για να το σημάνω ως σημαντικό."
-            last_conversation_id = save_conversation(prompt, response, "MARK_SAVED_INFO")
+            result["conversation_id"] = save_conversation(prompt, response, "MARK_SAVED_INFO")
             return response
         except Exception as e:
             response = f"[ERROR] Σφάλμα: {str(e)}"
-            last_conversation_id = save_conversation(prompt, response, "MARK_SAVED_ERROR")
+            result["conversation_id"] = save_conversation(prompt, response, "MARK_SAVED_ERROR")
             return response
 
     if p.startswith("φτιάξε φάκελο") or p.startswith("φτιαξε φακελο"):
@@ -191,17 +212,17 @@ def _execute_prompt_logic(prompt: str) -> str:
 
         if not name:
             response = "[ERROR] Πρέπει να δώσεις όνομα για τον φάκελο. Π.χ.: 'φτιάξε φάκελο Έργα'"
-            last_conversation_id = save_conversation(prompt, response, "CREATE_FOLDER_ERROR")
+            result["conversation_id"] = save_conversation(prompt, response, "CREATE_FOLDER_ERROR")
             return response
 
         try:
             create_folder(name)
             response = f"[OK] Δημιουργήθηκε ο φάκελος: {name}"
-            last_conversation_id = save_conversation(prompt, response, f"CREATE_FOLDER: {name}")
+            result["conversation_id"] = save_conversation(prompt, response, f"CREATE_FOLDER: {name}")
             return response
         except Exception as e:
             response = f"[ERROR] Σφάλμα κατά τη δημιουργία φακέλου: {str(e)}"
-            last_conversation_id = save_conversation(prompt, response, "CREATE_FOLDER_ERROR")
+            result["conversation_id"] = save_conversation(prompt, response, "CREATE_FOLDER_ERROR")
             return response
 
     if "βάλε στο ημερολόγιο" in p or "βαλε στο ημερολογιο" in p:
@@ -210,19 +231,19 @@ def _execute_prompt_logic(prompt: str) -> str:
             if len(dates) == 2:
                 add_event("Πρόγραμμα", dates[0], dates[1], description="Καταχώρηση από prompt")
                 response = f"[OK] Προστέθηκε event {dates[0]} -> {dates[1]} στο calendar."
-                last_conversation_id = save_conversation(prompt, response, f"ADD_EVENT: {dates[0]}-{dates[1]}")
+                result["conversation_id"] = save_conversation(prompt, response, f"ADD_EVENT: {dates[0]}-{dates[1]}")
                 return response
             elif len(dates) == 1:
                 add_event("Σημαντικό γεγονός", dates[0], None, description="Καταχώρηση από prompt")
                 response = f"[OK] Προστέθηκε event την {dates[0]}."
-                last_conversation_id = save_conversation(prompt, response, f"ADD_EVENT: {dates[0]}")
+                result["conversation_id"] = save_conversation(prompt, response, f"ADD_EVENT: {dates[0]}")
                 return response
             response = "[INFO] Δεν βρήκα ημερομηνίες (μορφή: ΗΗ/ΜΜ/ΕΕΕΕ)."
-            last_conversation_id = save_conversation(prompt, response, "ADD_EVENT_INFO")
+            result["conversation_id"] = save_conversation(prompt, response, "ADD_EVENT_INFO")
             return response
         except Exception as e:
             response = f"[ERROR] Σφάλμα κατά την προσθήκη event: {str(e)}"
-            last_conversation_id = save_conversation(prompt, response, "ADD_EVENT_ERROR")
+            result["conversation_id"] = save_conversation(prompt, response, "ADD_EVENT_ERROR")
             return response
 
     if "βοήθεια" in p or "help" in p:
@@ -4,9 +4,9 @@ AI-powered natural language command parser με Conversation Memory
 Διατηρεί conversation history για context-aware responses
 """
 
-import os
 import time
 from dotenv import load_dotenv
+import llm_gateway
 from conversation_manager import (
     get_conversation_history,
     save_conversation,
@@ -15,30 +15,8 @@ from conversation_manager import (
 
 load_dotenv()
 
-# Καθαρισμός proxy environment variables που προκαλούν πρόβλημα με OpenAI client
-proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy',
-              'ALL_PROXY', 'all_proxy', 'NO_PROXY', 'no_proxy']
-saved_proxies = {}
-for var in proxy_vars:
-    if var in os.environ:
-        saved_proxies[var] = os.environ[var]
-        del os.environ[var]
-
-# Ελέγχουμε αν υπάρχει OpenAI API key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-AI_ENABLED = bool(OPENAI_API_KEY and OPENAI_API_KEY.strip())
-
-if AI_ENABLED:
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-    except Exception as e:
-        print(f"[WARNING] AI agent disabled: {e}")
-        AI_ENABLED = False
-
-# Επαναφορά proxy variables
-for var, value in saved_proxies.items():
-    os.environ[var] = value
+# Το proxy handling και το connection pooling γίνονται στο llm_gateway
+AI_ENABLED = llm_gateway.is_enabled()
 
 SYSTEM_PROMPT = """Είσαι ένας έξυπνος βοηθός για Energy Agent Dashboard που μετατρέπει φυσική ελληνική γλώσσα σε συγκεκριμένες εντολές.
 
@@ -136,8 +114,7 @@ def parse_with_ai(user_input: str, use_history: bool = True) -> dict:
 
             start_time = time.time()
 
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = llm_gateway.chat(
                 messages=messages,
                 temperature=0.3,
                 max_tokens=100
@@ -158,6 +135,8 @@ def parse_with_ai(user_input: str, use_history: bool = True) -> dict:
                 "original_input": user_input,
                 "ai_response": ai_output,
                 "usage": {
+                    # Το μοντέλο που απάντησε (AI_MODEL του llm_gateway, με την έκδοση του API)
+                    "model": getattr(response, "model", None) or llm_gateway.AI_MODEL,
                     "prompt_tokens": response.usage.prompt_tokens,
                     "completion_tokens": response.usage.completion_tokens,
                     "latency_ms": latency_ms
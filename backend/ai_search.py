@@ -4,79 +4,28 @@ AI-powered search με έξυπνη κατηγοριοποίηση και φιλ
 
 import os
 from dotenv import load_dotenv
+import llm_gateway
+from keyword_matcher import TOPIC_MATCHER
 
 load_dotenv()
 
 # Ρυθμίσεις
 AI_SEARCH_ENABLED = os.getenv("AI_SEARCH_ENABLED", "false").lower() == "true"
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
-if AI_SEARCH_ENABLED and OPENAI_API_KEY:
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        print("[INFO] AI Search enabled with OpenAI")
-    except Exception as e:
-        print(f"[WARNING] AI Search disabled: {e}")
-        AI_SEARCH_ENABLED = False
+if AI_SEARCH_ENABLED and llm_gateway.is_enabled():
+    print("[INFO] AI Search enabled with OpenAI")
 else:
+    AI_SEARCH_ENABLED = False
     print("[INFO] AI Search disabled (set AI_SEARCH_ENABLED=true in .env to enable)")
 
-# Keyword-based fallback (χωρίς OpenAI)
-TOPIC_KEYWORDS = {
-    "Φωτοβολταϊκά": [
-        "φωτοβολταϊκά", "φωτοβολταϊκα", "φωτοβολταικά", "φωτοβολταικα",
-        "pv", "solar", "ηλιακά", "ηλιακα", "net metering", "net billing",
-        "αυτοπαραγωγή", "αυτοπαραγωγη", "πάνελ", "πανελ", "panels"
-    ],
-    "Μπαταρίες": [
-        "μπαταρία", "μπαταριά", "μπαταριες", "μπαταρίες",
-        "battery", "batteries", "αποθήκευση", "αποθηκευση",
-        "storage", "ενεργειακή αποθήκευση", "ενεργειακη αποθηκευση"
-    ],
-    "Αντλίες": [
-        "αντλία", "αντλια", "αντλίες", "αντλιες",
-        "heat pump", "θερμότητα", "θερμοτητα",
-        "θέρμανση", "θερμανση", "ψύξη", "ψυξη"
-    ],
-    "Νομοθεσία": [
-        "νόμος", "νομος", "νομοθεσία", "νομοθεσια",
-        "φεκ", "κανονισμός", "κανονισμος", "απόφαση", "αποφαση",
-        "ρυθμιστικό", "ρυθμιστικο", "πλαίσιο", "πλαισιο",
-        "law", "regulation", "legislation"
-    ],
-    "Επιδοτήσεις": [
-        "επιδότηση", "επιδοτηση", "επιδοτήσεις", "επιδοτησεις",
-        "επιχορήγηση", "επιχορηγηση", "πρόγραμμα", "προγραμμα",
-        "εσπα", "espa", "χρηματοδότηση", "χρηματοδοτηση",
-        "subsidy", "grant", "funding"
-    ],
-    "Smart_Σπίτια": [
-        "smart", "έξυπνο", "εξυπνο", "iot",
-        "αυτοματισμός", "αυτοματισμος", "αισθητήρες", "αισθητηρες",
-        "έξυπνο σπίτι", "εξυπνο σπιτι", "smart home",
-        "automation", "sensors"
-    ]
-}
-
 def classify_query_keyword(query: str) -> str:
     """
     Κατηγοριοποίηση query με keywords (fallback χωρίς AI)
-    """
-    query_lower = query.lower()
-
-    # Έλεγχος για κάθε κατηγορία
-    matches = {}
-    for topic, keywords in TOPIC_KEYWORDS.items():
-        match_count = sum(1 for kw in keywords if kw in query_lower)
-        if match_count > 0:
-            matches[topic] = match_count
-
-    # Επιστροφή της κατηγορίας με τα περισσότερα matches
-    if matches:
-        return max(matches.items(), key=lambda x: x[1])[0]
 
-    return ""
+    Returns:
+        Η κατηγορία με τα περισσότερα keywords στο query ("" αν καμία)
+    """
+    return TOPIC_MATCHER.best(query)
 
 def classify_query_with_ai(query: str) -> dict:
     """
@@ -89,7 +38,13 @@ def classify_query_with_ai(query: str) -> dict:
             "intent": "comparison|information|news|subsidy|...",  # Τι θέλει ο χρήστης
             "query_refined": "..."  # Βελτιωμένο query
         }
+
+    Χωρίς AI search ισχύει η κατηγοριοποίηση με keywords. Με AI search, αν
+    ο τοπικός classifier (local_classifier.py) είναι σίγουρος για το topic,
+    το LLM δεν καλείται.
     """
+    from local_classifier import classify_topic, LOCAL_CLASSIFIER_MIN_CONFIDENCE
+
     if not AI_SEARCH_ENABLED:
         # Fallback σε keyword-based
         topic = classify_query_keyword(query)
@@ -100,6 +55,15 @@ def classify_query_with_ai(query: str) -> dict:
             "query_refined": query
         }
 
+    local = classify_topic(query)
+    if local and local[1] >= LOCAL_CLASSIFIER_MIN_CONFIDENCE:
+        return {
+            "topics": [local[0]],
+            "keywords": [query.lower()],
+            "intent": "search",
+            "query_refined": query
+        }
+
     try:
         system_prompt = """Είσαι ένας ειδικός στον ενεργειακό τομέα. Αναλύεις ερωτήσεις χρηστών.
 
@@ -127,8 +91,7 @@ Intent types:
   "query_refined": "βελτιωμένο query"
 }"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = llm_gateway.chat(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Ανάλυσε αυτό το query: {query}"}
@@ -153,54 +116,6 @@ Intent types:
             "query_refined": query
         }
 
-def filter_results_by_relevance(query: str, news_items: list) -> list:
-    """
-    Φιλτράρει αποτελέσματα με βάση τη σχετικότητα
-
-    Args:
-        query: Το αρχικό query
-        news_items: Lista από news items με keys: title, url, topic, summary
-
-    Returns:
-        Filtered και sorted list
-    """
-    # Αν δεν έχουμε AI, κάνε απλό keyword matching
-    query_analysis = classify_query_with_ai(query)
-    topics = query_analysis.get("topics", [])
-    keywords = query_analysis.get("keywords", [query.lower()])
-
-    # Score κάθε άρθρο
-    scored_items = []
-    for item in news_items:
-        score = 0
-        title = (item.get("title", "") or "").lower()
-        topic = item.get("topic", "")
-        summary = (item.get("summary", "") or "").lower()
-
-        # +10 points αν το topic ταιριάζει
-        if topic and topic in topics:
-            score += 10
-
-        # +5 points για κάθε keyword στον τίτλο
-        for kw in keywords:
-            if kw in title:
-                score += 5
-
-        # +2 points για κάθε keyword στο summary
-        for kw in keywords:
-            if kw in summary:
-                score += 2
-
-        # Κράτα μόνο αν έχει score > 0
-        if score > 0:
-            scored_items.append((score, item))
-
-    # Sort by score (descending)
-    scored_items.sort(key=lambda x: x[0], reverse=True)
-
-    # Return top results
-    return [item for score, item in scored_items]
-
 def is_ai_search_enabled() -> bool:
     """Επιστρέφει True αν το AI search είναι enabled"""
     return AI_SEARCH_ENABLED
@@ -1,58 +1,189 @@
 
 import os, time, json
-from datetime import datetime
+from llm_gateway import estimate_tokens
 
-USAGE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "api_usage.log")
-MAX_DAILY_SECONDS = 1200  # 20 minutes
+# Η ημερήσια κατανάλωση μετριέται στο api_quota (thread/process safe)
+from api_quota import check_api_quota, update_quota, reserve_quota, MAX_DAILY_SECONDS
 
-def check_api_quota():
-    if not os.path.exists(USAGE_FILE):
-        return 0
-    try:
-        with open(USAGE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        today = datetime.now().strftime("%Y-%m-%d")
-        if data.get("date") != today:
-            return 0
-        return float(data.get("seconds", 0))
-    except Exception:
-        return 0
-
-def update_quota(elapsed):
-    today = datetime.now().strftime("%Y-%m-%d")
-    current = check_api_quota()
-    with open(USAGE_FILE, "w", encoding="utf-8") as f:
-        json.dump({"date": today, "seconds": current + float(elapsed)}, f)
-
-def summarize_article(title, content):
-    api_key = os.getenv("OPENAI_API_KEY") or ""
-    if not api_key:
+# llm: μόνο OpenAI, local: μόνο TextRank (χωρίς δίκτυο), hybrid: LLM με TextRank fallback
+ENGINE_LLM, ENGINE_LOCAL, ENGINE_HYBRID = "llm", "local", "hybrid"
+SUMMARY_ENGINE = os.getenv("SUMMARY_ENGINE", ENGINE_LLM).lower()
+
+SUMMARY_PROMPT = "Σύνοψη στα ελληνικά με 2-3 προτάσεις:\nΤίτλος: {title}\nΚείμενο: {content}"
+SUMMARY_MAX_CHARS = 4000
+
+# Batch mode: πολλά άρθρα σε ένα chat completion με JSON απάντηση
+SUMMARY_BATCH_PROMPT = """Για κάθε άρθρο παρακάτω γράψε σύνοψη στα ελληνικά με 2-3 προτάσεις.
+Απάντησε ΜΟΝΟ σε JSON: {{"summaries": [{{"id": <id άρθρου>, "summary": "..."}}]}}
+
+{articles}"""
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+# Εκτίμηση input tokens ανά batch (prompt + κείμενα)
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", "12000"))
+SUMMARY_MAX_TOKENS = 120
+
+def _prepare(title, content):
+    """Κανονικοποιημένο κείμενο και κλειδί cache, κοινά για single και batch mode"""
+    import llm_gateway
+    from summary_cache import cache_key
+
+    content = " ".join((content or "").split())[:SUMMARY_MAX_CHARS]
+    return content, cache_key(llm_gateway.AI_MODEL, SUMMARY_PROMPT, title, content)
+
+def _summarize_single(title, content, key):
+    import llm_gateway
+    from summary_cache import store_summary
+
+    if not llm_gateway.is_enabled():
         return None
-    if check_api_quota() >= MAX_DAILY_SECONDS:
+    reservation = reserve_quota()
+    if reservation is None:
         return None
 
     start = time.time()
+    usage = None
     try:
-        import httpx
-        from openai import OpenAI
-
-        # Δημιουργία custom http client χωρίς proxies
-        http_client = httpx.Client(
-            proxies=None,  # Explicitly disable proxies
-            timeout=30.0
-        )
-
-        client = OpenAI(api_key=api_key, http_client=http_client)
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": f"Σύνοψη στα ελληνικά με 2-3 προτάσεις:\nΤίτλος: {title}\nΚείμενο: {content[:4000]}"}],
-            max_tokens=120,
-        )
-        text = resp.choices[0].message.content.strip()
-        http_client.close()
+        resp = llm_gateway.chat([{"role": "user", "content": SUMMARY_PROMPT.format(title=title, content=content)}],
+                                max_tokens=SUMMARY_MAX_TOKENS)
+        text = (resp.choices[0].message.content or "").strip() or None
+        usage = resp.usage
     except Exception as e:
         print(f"[ERROR] Σφάλμα AI summarization: {e}")
         text = None
-    elapsed = time.time() - start
-    update_quota(elapsed)
+    _record(time.time() - start, usage, reservation)
+    store_summary(key, text)
     return text
+
+def _record(elapsed, usage, reservation):
+    import llm_gateway
+
+    update_quota(elapsed,
+                 prompt_tokens=getattr(usage, "prompt_tokens", 0),
+                 completion_tokens=getattr(usage, "completion_tokens", 0),
+                 model=llm_gateway.AI_MODEL, reservation=reservation)
+
+def _summarize_local(title, content):
+    from local_summarizer import summarize_local
+
+    try:
+        return summarize_local(title, content)
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα local summarization: {e}")
+        return None
+
+def summarize_article(title, content, with_engine: bool = False):
+    """
+    Περίληψη ενός άρθρου με το engine του SUMMARY_ENGINE
+
+    Returns:
+        Η περίληψη (ή None), ή (περίληψη, engine) αν with_engine=True
+    """
+    return summarize_articles([(title, content)], with_engine=with_engine)[0]
+
+def _summarize_batch(batch: list, reservation: int) -> dict:
+    """
+    Ένα chat completion για όλο το batch
+
+    Args:
+        batch: List από (id, title, content)
+        reservation: Η δέσμευση quota της κλήσης (βλ. api_quota.reserve_quota)
+
+    Returns:
+        dict id -> περίληψη, μόνο για όσα άρθρα επέστρεψε σωστά το μοντέλο
+    """
+    import llm_gateway
+
+    articles = "\n\n".join(f"[id={i}]\nΤίτλος: {title}\nΚείμενο: {content}" for i, title, content in batch)
+    start = time.time()
+    summaries = {}
+    usage = None
+    try:
+        resp = llm_gateway.chat(
+            [{"role": "user", "content": SUMMARY_BATCH_PROMPT.format(articles=articles)}],
+            max_tokens=(SUMMARY_MAX_TOKENS + 30) * len(batch),
+            response_format={"type": "json_object"},
+        )
+        usage = resp.usage
+        parsed = json.loads(resp.choices[0].message.content)
+        wanted = {i for i, _, _ in batch}
+        for entry in parsed.get("summaries", []):
+            try:
+                i, text = int(entry.get("id")), (entry.get("summary") or "").strip()
+            except (TypeError, ValueError, AttributeError):
+                continue
+            if i in wanted and text:
+                summaries[i] = text
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα batch summarization ({len(batch)} άρθρα): {e}")
+    _record(time.time() - start, usage, reservation)
+    return summaries
+
+def summarize_articles(articles: list, with_engine: bool = False) -> list:
+    """
+    Περιλήψεις για πολλά άρθρα με λίγα round trips
+
+    Με SUMMARY_ENGINE=llm (default) τα άρθρα που δεν είναι στην cache
+    πακετάρονται σε batches (έως SUMMARY_BATCH_SIZE άρθρα και
+    SUMMARY_BATCH_TOKEN_BUDGET tokens) με JSON απάντηση και όσα παραλείψει το
+    μοντέλο ζητούνται ξεχωριστά. Με local χρησιμοποιείται μόνο ο TextRank
+    summarizer (local_summarizer.py), με hybrid ο TextRank καλύπτει ό,τι δεν
+    έδωσε το LLM (όριο χρήσης, χωρίς API key, σφάλμα).
+
+    Args:
+        articles: List από (title, content)
+        with_engine: Αν True, κάθε στοιχείο είναι (περίληψη, engine)
+
+    Returns:
+        List με τις περιλήψεις στην ίδια σειρά (None όπου απέτυχε)
+    """
+    prepared = [(title,) + _prepare(title, content) for title, content in articles]
+    if SUMMARY_ENGINE == ENGINE_LOCAL:
+        results = [None] * len(prepared)
+    else:
+        results = _summarize_llm(prepared)
+    engines = [ENGINE_LLM if text else None for text in results]
+
+    if SUMMARY_ENGINE in (ENGINE_LOCAL, ENGINE_HYBRID):
+        for i, (title, content, _) in enumerate(prepared):
+            if not results[i]:
+                results[i] = _summarize_local(title, content)
+                engines[i] = ENGINE_LOCAL if results[i] else None
+    return list(zip(results, engines)) if with_engine else results
+
+def _summarize_llm(prepared: list) -> list:
+    """Περιλήψεις LLM (cache + batches) για τα (title, content, key) του _prepare"""
+    import llm_gateway
+    from summary_cache import get_cached_summary, store_summary
+
+    results = [get_cached_summary(key) for _, _, key in prepared]
+    missing = [i for i, text in enumerate(results) if not text]
+    if not missing or not llm_gateway.is_enabled():
+        return results
+
+    overhead = estimate_tokens(SUMMARY_BATCH_PROMPT)
+    batches, batch, budget = [], [], overhead
+    for i in missing:
+        title, content, _ = prepared[i]
+        cost = estimate_tokens(title) + estimate_tokens(content)
+        if batch and (len(batch) >= SUMMARY_BATCH_SIZE or budget + cost > SUMMARY_BATCH_TOKEN_BUDGET):
+            batches.append(batch)
+            batch, budget = [], overhead
+        batch.append((i, title, content))
+        budget += cost
+    if batch:
+        batches.append(batch)
+
+    for batch in batches:
+        summaries = {}
+        reservation = reserve_quota() if len(batch) > 1 else None
+        if reservation is not None:
+            summaries = _summarize_batch(batch, reservation)
+        for i, title, content in batch:
+            key = prepared[i][2]
+            if i in summaries:
+                results[i] = summaries[i]
+                store_summary(key, summaries[i])
+            else:
+                # Fallback σε μεμονωμένη κλήση για ό,τι έλειψε από το batch
+                results[i] = _summarize_single(title, content, key)
+    return results
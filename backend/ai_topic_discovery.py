@@ -3,33 +3,13 @@ AI-Powered Topic Discovery System
 Αυτόματη ανακάλυψη trending topics και δημιουργία smart search queries
 """
 
-import os
-import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict
 from dotenv import load_dotenv
+import llm_gateway
 
 load_dotenv()
 
-def get_openai_client():
-    """Δημιουργία OpenAI client με proper proxy handling"""
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if not api_key:
-        return None
-
-    try:
-        import httpx
-        from openai import OpenAI
-
-        # Disable proxies που μπορεί να προκαλούν προβλήματα
-        http_client = httpx.Client(proxies=None, timeout=60.0)
-        client = OpenAI(api_key=api_key, http_client=http_client)
-        return client
-    except Exception as e:
-        print(f"[ERROR] Αδυναμία δημιουργίας OpenAI client: {e}")
-        return None
-
-
 def analyze_trending_topics(recent_articles: List[Dict]) -> List[Dict]:
     """
     Αναλύει πρόσφατα άρθρα και ανιχνεύει trending topics με AI
@@ -40,8 +20,7 @@ def analyze_trending_topics(recent_articles: List[Dict]) -> List[Dict]:
     Returns:
         List με trending topics [{topic, importance, keywords, suggested_queries}]
     """
-    client = get_openai_client()
-    if not client or not recent_articles:
+    if not llm_gateway.is_enabled() or not recent_articles:
         return []
 
     try:
@@ -71,8 +50,7 @@ def analyze_trending_topics(recent_articles: List[Dict]) -> List[Dict]:
   }}
 ]"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = llm_gateway.chat(
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
             max_tokens=1000,
@@ -108,8 +86,7 @@ def discover_new_topics_from_web() -> List[str]:
     Returns:
         List με suggested search queries
     """
-    client = get_openai_client()
-    if not client:
+    if not llm_gateway.is_enabled():
         return []
 
     try:
@@ -126,8 +103,7 @@ def discover_new_topics_from_web() -> List[str]:
 
 Απάντησε ΜΟΝΟ με τα queries, ένα ανά γραμμή, χωρίς numbering."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = llm_gateway.chat(
             messages=[{"role": "user", "content": prompt}],
             temperature=0.5,
             max_tokens=300
@@ -165,8 +141,7 @@ def generate_smart_queries_for_topic(topic: str, context: str = "") -> List[str]
     Returns:
         List με search queries
     """
-    client = get_openai_client()
-    if not client:
+    if not llm_gateway.is_enabled():
         # Fallback σε basic queries
         return [
             f"{topic} νέα",
@@ -187,8 +162,7 @@ def generate_smart_queries_for_topic(topic: str, context: str = "") -> List[str]
 
 Απάντησε ΜΟΝΟ με τα queries, ένα ανά γραμμή."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = llm_gateway.chat(
             messages=[{"role": "user", "content": prompt}],
             temperature=0.4,
             max_tokens=200
@@ -216,44 +190,25 @@ def generate_smart_queries_for_topic(topic: str, context: str = "") -> List[str]
 def get_recent_articles_from_db(days: int = 7, limit: int = 50) -> List[Dict]:
     """Ανάκτηση πρόσφατων άρθρων από τη βάση για analysis"""
     from db import fetch_news
-    import sqlite3
-    from datetime import datetime, timedelta
 
     try:
-        all_news = fetch_news()
-
-        # Φιλτράρισμα για τις τελευταίες X μέρες
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        recent = []
-        for article in all_news:
-            try:
-                # Parse date
-                date_str = article.get('date', '')
-                if date_str:
-                    # Handle different date formats
-                    for fmt in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S']:
-                        try:
-                            article_date = datetime.strptime(date_str[:19], fmt)
-                            if article_date >= cutoff_date:
-                                recent.append(article)
-                            break
-                        except:
-                            continue
-            except:
-                continue
-
-        return recent[:limit]
+        # Φιλτράρισμα για τις τελευταίες X μέρες μέσω του index στο published_ts
+        cutoff_ts = int((datetime.now() - timedelta(days=days)).timestamp())
+        return fetch_news(limit=limit, since_ts=cutoff_ts)
 
     except Exception as e:
         print(f"[ERROR] Failed to fetch recent articles: {e}")
         return []
 
 
-def run_ai_topic_discovery_and_search(max_queries: int = 5) -> Dict:
+def run_ai_topic_discovery_and_search(max_queries: int = 5, job=None) -> Dict:
     """
     Main function: Ανακαλύπτει topics και κάνει automatic search
 
+    Args:
+        max_queries: Μέγιστος αριθμός αναζητήσεων
+        job: Προαιρετικό jobs.Job για progress και ακύρωση ανάμεσα στις αναζητήσεις
+
     Returns:
         Dict με results summary
     """
@@ -268,8 +223,16 @@ def run_ai_topic_discovery_and_search(max_queries: int = 5) -> Dict:
         "timestamp": datetime.now().isoformat()
     }
 
+    # Τα βήματα 1 και 2 είναι ανεξάρτητες LLM κλήσεις: τρέχουν παράλληλα
+    from concurrent.futures import ThreadPoolExecutor
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="discovery")
+    new_queries_future = pool.submit(discover_new_topics_from_web)
+    pool.shutdown(wait=False)
+
     # Step 1: Ανάλυση trending topics από existing articles
     print("[1/3] Analyzing recent articles for trending topics...")
+    if job:
+        job.report(message="Ανάλυση trending topics")
     recent_articles = get_recent_articles_from_db(days=7, limit=50)
 
     if recent_articles:
@@ -284,7 +247,7 @@ def run_ai_topic_discovery_and_search(max_queries: int = 5) -> Dict:
 
     # Step 2: AI-generated new search queries
     print("\n[2/3] Discovering new topics with AI...")
-    new_queries = discover_new_topics_from_web()
+    new_queries = new_queries_future.result()
     results["new_queries"] = new_queries
 
     if new_queries:
@@ -310,7 +273,16 @@ def run_ai_topic_discovery_and_search(max_queries: int = 5) -> Dict:
 
     # Execute searches
     total_saved = 0
-    for query in all_queries[:max_queries]:
+    all_queries = all_queries[:max_queries]
+    if job:
+        job.add_partial("trending_topics", results["trending_topics"])
+        job.add_partial("new_queries", new_queries)
+    for done, query in enumerate(all_queries):
+        if job:
+            if job.cancelled:
+                break
+            job.report(done, len(all_queries), f"Αναζήτηση: {query}")
+            job.add_partial("total_articles_found", total_saved)
         try:
             print(f"\n  Searching: '{query}'...")
             search_results = smart_web_search(query, max_results=5, use_ai_filter=True)
@@ -322,8 +294,6 @@ def run_ai_topic_discovery_and_search(max_queries: int = 5) -> Dict:
             else:
                 print(f"    → No results found")
 
-            time.sleep(2)  # Rate limiting
-
         except Exception as e:
             print(f"    → Error: {e}")
             continue
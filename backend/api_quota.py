@@ -0,0 +1,185 @@
+"""
+API Quota - Ημερήσια κατανάλωση του AI (δευτερόλεπτα, tokens, κόστος)
+
+Κάθε κλήση δεσμεύει πρώτα ένα εκτιμώμενο κόστος σε δευτερόλεπτα
+(reserve_quota) με ένα conditional INSERT σε BEGIN IMMEDIATE transaction
+στο data/api_usage.db: η δέσμευση γίνεται μόνο αν κατανάλωση + ενεργές
+δεσμεύσεις όλων των threads και worker processes χωράνε στο ημερήσιο όριο.
+Στο τέλος της κλήσης (update_quota) η δέσμευση αντικαθίσταται από την
+πραγματική κατανάλωση στο ίδιο transaction, με atomic increment (INSERT ...
+ON CONFLICT DO UPDATE). Δεσμεύσεις ενός process που πέθανε λήγουν μετά από
+QUOTA_RESERVATION_TTL.
+
+Δεν υπάρχουν μετρητές στη μνήμη: τα σύνολα (check_api_quota, usage_today)
+διαβάζονται από τη βάση, οπότε είναι ίδια από οποιονδήποτε worker.
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+from db import get_connection
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+USAGE_DB = os.path.join(DATA_DIR, "api_usage.db")
+# Παλιό format (ένα JSON αρχείο), διαβάζεται μία φορά για migration
+USAGE_FILE = os.path.join(DATA_DIR, "api_usage.log")
+MAX_DAILY_SECONDS = 1200  # 20 minutes
+# Μετά από τόσα δευτερόλεπτα μια δέσμευση που δεν έκλεισε (π.χ. crash) δεν μετράει
+QUOTA_RESERVATION_TTL = float(os.getenv("QUOTA_RESERVATION_TTL", "600"))
+
+# USD ανά 1M tokens (input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.150, 0.600),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+def model_prices(model: str) -> tuple:
+    """
+    (input, output) USD ανά 1M tokens για το μοντέλο
+
+    Δέχεται και ονόματα με έκδοση όπως τα επιστρέφει το API
+    (π.χ. "gpt-4o-mini-2024-07-18"). Άγνωστα μοντέλα χρεώνονται ως gpt-4o-mini.
+    """
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if (model or "").startswith(name):
+            return MODEL_PRICES[name]
+    return MODEL_PRICES["gpt-4o-mini"]
+
+USAGE_FIELDS = ("seconds", "calls", "prompt_tokens", "completion_tokens", "cost_usd")
+
+# EWMA της διάρκειας μιας κλήσης αυτού του process, για το μέγεθος των δεσμεύσεων
+_avg_seconds = 2.0
+_table_ready = False
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+def _conn():
+    global _table_ready
+    if not _table_ready:
+        # Πριν από το connect: η SQLite δεν δημιουργεί τον φάκελο
+        os.makedirs(DATA_DIR, exist_ok=True)
+    conn = get_connection(USAGE_DB)
+    if not _table_ready:
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS api_usage (
+                    date TEXT PRIMARY KEY,
+                    seconds REAL DEFAULT 0,
+                    calls INTEGER DEFAULT 0,
+                    prompt_tokens INTEGER DEFAULT 0,
+                    completion_tokens INTEGER DEFAULT 0,
+                    cost_usd REAL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quota_reservations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            if os.path.exists(USAGE_FILE):
+                try:
+                    with open(USAGE_FILE, "r", encoding="utf-8") as f:
+                        legacy = json.load(f)
+                    conn.execute("INSERT OR IGNORE INTO api_usage(date, seconds) VALUES (?, ?)",
+                                 (legacy.get("date"), float(legacy.get("seconds", 0))))
+                except Exception as e:
+                    print(f"[WARNING] Αδυναμία ανάγνωσης {USAGE_FILE}: {e}")
+        _table_ready = True
+    return conn
+
+def _read_usage(conn, date: str) -> dict:
+    row = conn.execute(f"SELECT {','.join(USAGE_FIELDS)} FROM api_usage WHERE date=?", (date,)).fetchone()
+    return dict(zip(USAGE_FIELDS, row)) if row else dict.fromkeys(USAGE_FIELDS, 0)
+
+def check_api_quota():
+    """Δευτερόλεπτα AI που έχουν χρησιμοποιηθεί σήμερα (όλα τα processes)"""
+    try:
+        return float(_read_usage(_conn(), _today())["seconds"])
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα ανάγνωσης api usage: {e}")
+        return 0.0
+
+def reserve_quota():
+    """
+    Δεσμεύει την εκτιμώμενη διάρκεια μιας κλήσης, atomically για όλα τα
+    threads και worker processes (BEGIN IMMEDIATE: ένας writer τη φορά)
+
+    Returns:
+        Το id της δέσμευσης (για το update_quota), ή None αν το ημερήσιο όριο
+        έχει εξαντληθεί μαζί με τις κλήσεις σε πτήση
+    """
+    date, estimate, now = _today(), _avg_seconds, time.time()
+    conn = _conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM quota_reservations WHERE expires_at < ?", (now,))
+        cur = conn.execute("""
+            INSERT INTO quota_reservations(date, seconds, expires_at)
+            SELECT ?, ?, ?
+            WHERE COALESCE((SELECT seconds FROM api_usage WHERE date = ?), 0)
+                + COALESCE((SELECT SUM(seconds) FROM quota_reservations WHERE date = ?), 0)
+                + ? <= ?
+        """, (date, estimate, now + QUOTA_RESERVATION_TTL, date, date, estimate, MAX_DAILY_SECONDS))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[WARNING] Σφάλμα δέσμευσης api quota: {e}")
+        return None
+    return cur.lastrowid if cur.rowcount == 1 else None
+
+def update_quota(elapsed, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 model: str = None, reservation: int = None):
+    """
+    Καταγραφή μιας κλήσης: atomic increment των μετρητών της ημέρας και
+    κλείσιμο της δέσμευσης της, σε ένα transaction
+
+    Args:
+        elapsed: Διάρκεια σε δευτερόλεπτα
+        prompt_tokens, completion_tokens: Από το usage του response
+        model: Για τον υπολογισμό κόστους (MODEL_PRICES)
+        reservation: Το id από το reserve_quota()
+    """
+    global _avg_seconds
+    price_in, price_out = model_prices(model)
+    delta = {
+        "seconds": float(elapsed),
+        "calls": 1,
+        "prompt_tokens": int(prompt_tokens or 0),
+        "completion_tokens": int(completion_tokens or 0),
+        "cost_usd": ((prompt_tokens or 0) * price_in + (completion_tokens or 0) * price_out) / 1e6,
+    }
+    _avg_seconds = 0.8 * _avg_seconds + 0.2 * float(elapsed)
+    try:
+        conn = _conn()
+        with conn:
+            if reservation is not None:
+                conn.execute("DELETE FROM quota_reservations WHERE id=?", (reservation,))
+            conn.execute(f"""
+                INSERT INTO api_usage(date, {','.join(USAGE_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(date) DO UPDATE SET
+                    {', '.join(f'{f} = {f} + excluded.{f}' for f in USAGE_FIELDS)}
+            """, [_today()] + [delta[f] for f in USAGE_FIELDS])
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα εγγραφής api usage: {e}")
+
+def usage_today() -> dict:
+    """Σύνολα ημέρας για το /api-usage, από τη βάση (όλα τα processes)"""
+    date = _today()
+    try:
+        conn = _conn()
+        totals = _read_usage(conn, date)
+        reserved = conn.execute("SELECT COALESCE(SUM(seconds), 0) FROM quota_reservations "
+                                "WHERE date = ? AND expires_at >= ?", (date, time.time())).fetchone()[0]
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα ανάγνωσης api usage: {e}")
+        totals, reserved = dict.fromkeys(USAGE_FIELDS, 0), 0
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    # Εκτίμηση για τις κλήσεις που τρέχουν αυτή τη στιγμή
+    totals["reserved_seconds"] = float(reserved)
+    return totals
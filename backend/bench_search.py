@@ -0,0 +1,124 @@
+"""
+Benchmark: FTS5 bm25() (db.search_news) vs το παλιό +10/+5/+2 scoring του ai_search
+Χρήση: python bench_search.py [αριθμός άρθρων]
+
+Το corpus γράφεται σε προσωρινή βάση (δεν αγγίζει το data/news.db). Το
+news_fts ενημερώνεται από τα triggers του news σε κάθε INSERT/DELETE, οπότε
+μετράμε και το κόστος της incremental ενημέρωσης ενός άρθρου.
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import itertools
+import db
+
+TOPICS = ["Φωτοβολταϊκά", "Μπαταρίες", "Αντλίες", "Νομοθεσία", "Επιδοτήσεις", "Smart_Σπίτια"]
+VOCAB = ("φωτοβολταϊκά φωτοβολταϊκών net metering αυτοπαραγωγή μπαταρία μπαταρίες αποθήκευση "
+         "αντλία αντλίας θερμότητας θέρμανση φεκ νόμος νόμου κανονισμός απόφαση επιχορήγηση "
+         "επιδότηση επιδοτήσεις πρόγραμμα προγράμματος εσπα έξυπνο σπίτι αισθητήρες ενέργεια "
+         "ρεύμα τιμές προμηθευτές ΡΑΕ υπουργείο παράταση προθεσμία αιτήσεις νοικοκυριά "
+         "επιχειρήσεις δίκτυο ΔΕΔΔΗΕ σύνδεση ισχύς kW στέγη πάνελ inverter αγορά χονδρική λιανική").split()
+QUERIES = ["φωτοβολταϊκά στέγη", "επιδότηση αντλίας θερμότητας", "νέος νόμος net billing",
+           "μπαταρίες αποθήκευσης νοικοκυριά", "παράταση προγράμματος εξοικονομώ"]
+TOP_K = 50
+
+def make_corpus(n: int, seed: int = 42) -> list:
+    """Συνθετικό corpus με Zipf κατανομή λέξεων (λίγες συχνές, πολλές σπάνιες)"""
+    rnd = random.Random(seed)
+    filler = [f"λ{i}ξη" for i in range(20000)]
+    vocab = VOCAB + filler
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    rnd.shuffle(weights)
+    cum_weights = list(itertools.accumulate(weights))
+    corpus = []
+    for i in range(n):
+        corpus.append({
+            "title": " ".join(rnd.choices(vocab, cum_weights=cum_weights, k=rnd.randint(5, 12))),
+            "summary": " ".join(rnd.choices(vocab, cum_weights=cum_weights, k=rnd.randint(20, 80))),
+            "topic": rnd.choice(TOPICS),
+            "url": f"https://bench.local/{i}",
+            "published_ts": 1_700_000_000 + i * 60,
+        })
+    return corpus
+
+def legacy_scores(keywords: list, topics: list, items: list) -> list:
+    """Το scoring του ai_search.filter_results_by_relevance πριν το FTS5 (για σύγκριση)"""
+    scored_items = []
+    for item in items:
+        score = 0
+        title = (item.get("title", "") or "").lower()
+        topic = item.get("topic", "")
+        summary = (item.get("summary", "") or "").lower()
+        if topic and topic in topics:
+            score += 10
+        for kw in keywords:
+            if kw in title:
+                score += 5
+        for kw in keywords:
+            if kw in summary:
+                score += 2
+        if score > 0:
+            scored_items.append((score, item))
+    scored_items.sort(key=lambda x: x[0], reverse=True)
+    return scored_items[:TOP_K]
+
+def _insert(conn, docs: list):
+    conn.executemany("INSERT INTO news (title, url, topic, summary, published_ts) VALUES (?, ?, ?, ?, ?)",
+                     [(d["title"], d["url"], d["topic"], d["summary"], d["published_ts"]) for d in docs])
+
+def run(n: int):
+    print("=" * 60)
+    print(f"SEARCH BENCHMARK ({n} άρθρα)")
+    print("=" * 60)
+
+    corpus = make_corpus(n)
+    tmp = tempfile.mkdtemp(prefix="bench_search_")
+    db.DATA_DIR = tmp
+    db.NEWS_DB = os.path.join(tmp, "news.db")
+    db.SOURCES_DB = os.path.join(tmp, "sources.db")
+    db.PROMPTS_DB = os.path.join(tmp, "prompts.db")
+    db.init_all()
+    conn = db.get_connection(db.NEWS_DB)
+
+    start = time.perf_counter()
+    with conn:
+        _insert(conn, corpus)
+    print(f"Ingest + FTS5 index (triggers): {time.perf_counter() - start:.2f}s")
+
+    extra = {"title": "νέο άρθρο φωτοβολταϊκά", "summary": "παράταση", "topic": "Φωτοβολταϊκά",
+             "url": "https://bench.local/extra", "published_ts": 1_800_000_000}
+    start = time.perf_counter()
+    with conn:
+        _insert(conn, [extra])
+        conn.execute("DELETE FROM news WHERE url = ?", (extra["url"],))
+    print(f"Incremental add+remove: {(time.perf_counter() - start) * 1000:.3f}ms")
+
+    # Το παλιό path διάβαζε τα άρθρα από τη βάση και τα βαθμολογούσε στη Python
+    start = time.perf_counter()
+    rows = db.fetch_news(limit=n)
+    load = time.perf_counter() - start
+    print(f"Φόρτωση {len(rows)} άρθρων για το legacy scorer: {load:.2f}s")
+
+    legacy_total = fts_total = 0.0
+    for q in QUERIES:
+        start = time.perf_counter()
+        legacy_scores([q.lower()] + q.lower().split(), ["Φωτοβολταϊκά"], rows)
+        legacy_total += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = db.search_news([q], topics=["Φωτοβολταϊκά"], limit=TOP_K)
+        fts_total += time.perf_counter() - start
+        print(f"  '{q}': {result['total']} matches")
+
+    print(f"Legacy scorer: {legacy_total / len(QUERIES) * 1000:.1f}ms/query (full scan + sort, χωρίς τη φόρτωση)")
+    print(f"FTS5 bm25() top-{TOP_K}: {fts_total / len(QUERIES) * 1000:.1f}ms/query (postings + LIMIT sorter)")
+    print("=" * 60)
+    db.close_connections()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
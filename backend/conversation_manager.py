@@ -3,17 +3,22 @@ AI Conversation Manager με Memory και Logging
 Αποθηκεύει όλες τις συνομιλίες, AI calls και ratings για dataset building
 """
 
-import sqlite3
 import os
 import json
 from datetime import datetime
 from typing import List, Dict, Optional
+from db import get_connection
 
 CONV_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "conversations.db")
 
+_conv_db_ready = False
+
 def init_conversation_db():
-    """Δημιουργία πίνακα συνομιλιών και AI logs"""
-    conn = sqlite3.connect(CONV_DB)
+    """Δημιουργία πίνακα συνομιλιών και AI logs (μία φορά ανά process)"""
+    global _conv_db_ready
+    if _conv_db_ready:
+        return
+    conn = get_connection(CONV_DB)
     cur = conn.cursor()
 
     # Conversation history table
@@ -49,7 +54,7 @@ def init_conversation_db():
     """)
 
     conn.commit()
-    conn.close()
+    _conv_db_ready = True
 
 def get_session_id() -> str:
     """Δημιουργία ή ανάκτηση session ID (για την τρέχουσα συνεδρία)"""
@@ -72,7 +77,7 @@ def get_conversation_history(session_id: str = None, limit: int = 10) -> List[Di
     if session_id is None:
         session_id = get_session_id()
 
-    conn = sqlite3.connect(CONV_DB)
+    conn = get_connection(CONV_DB)
     cur = conn.cursor()
 
     cur.execute("""
@@ -84,7 +89,6 @@ def get_conversation_history(session_id: str = None, limit: int = 10) -> List[Di
     """, (session_id, limit))
 
     rows = cur.fetchall()
-    conn.close()
 
     # Αντιστροφή (πιο παλιά πρώτα) και μετατροπή σε OpenAI format
     history = []
@@ -111,7 +115,7 @@ def save_conversation(
     if session_id is None:
         session_id = get_session_id()
 
-    conn = sqlite3.connect(CONV_DB)
+    conn = get_connection(CONV_DB)
     cur = conn.cursor()
 
     cur.execute("""
@@ -121,7 +125,6 @@ def save_conversation(
 
     conv_id = cur.lastrowid
     conn.commit()
-    conn.close()
 
     return conv_id
 
@@ -135,15 +138,16 @@ def log_ai_api_call(
     error_message: str = None
 ):
     """Log AI API call για cost tracking και analytics"""
+    from api_quota import model_prices
+
     init_conversation_db()
 
-    # Cost calculation (GPT-4o-mini rates)
-    # Input: $0.150 / 1M tokens
-    # Output: $0.600 / 1M tokens
-    cost_usd = (prompt_tokens * 0.150 / 1_000_000) + (completion_tokens * 0.600 / 1_000_000)
+    # Cost calculation με τις τιμές του μοντέλου (USD / 1M tokens)
+    price_in, price_out = model_prices(model)
+    cost_usd = (prompt_tokens * price_in / 1_000_000) + (completion_tokens * price_out / 1_000_000)
     total_tokens = prompt_tokens + completion_tokens
 
-    conn = sqlite3.connect(CONV_DB)
+    conn = get_connection(CONV_DB)
     cur = conn.cursor()
 
     cur.execute("""
@@ -155,13 +159,12 @@ def log_ai_api_call(
           cost_usd, latency_ms, datetime.now().isoformat(), success, error_message))
 
     conn.commit()
-    conn.close()
 
 def rate_conversation(conversation_id: int, rating: int, feedback: str = None):
     """Προσθήκη rating σε συνομιλία (1-5 stars)"""
     init_conversation_db()
 
-    conn = sqlite3.connect(CONV_DB)
+    conn = get_connection(CONV_DB)
     cur = conn.cursor()
 
     cur.execute("""
@@ -171,7 +174,6 @@ def rate_conversation(conversation_id: int, rating: int, feedback: str = None):
     """, (rating, feedback, conversation_id))
 
     conn.commit()
-    conn.close()
 
 def get_dataset_export(min_rating: int = None) -> List[Dict]:
     """
@@ -185,7 +187,7 @@ def get_dataset_export(min_rating: int = None) -> List[Dict]:
     """
     init_conversation_db()
 
-    conn = sqlite3.connect(CONV_DB)
+    conn = get_connection(CONV_DB)
     cur = conn.cursor()
 
     query = "SELECT user_message, ai_response, rating FROM conversations"
@@ -197,7 +199,6 @@ def get_dataset_export(min_rating: int = None) -> List[Dict]:
 
     cur.execute(query, params)
     rows = cur.fetchall()
-    conn.close()
 
     dataset = []
     for user_msg, ai_msg, rating in rows:
@@ -215,7 +216,7 @@ def get_analytics() -> Dict:
     """Επιστρέφει analytics για AI usage"""
     init_conversation_db()
 
-    conn = sqlite3.connect(CONV_DB)
+    conn = get_connection(CONV_DB)
     cur = conn.cursor()
 
     # Total conversations
@@ -242,7 +243,6 @@ def get_analytics() -> Dict:
     """)
     ratings = dict(cur.fetchall())
 
-    conn.close()
 
     return {
         "total_conversations": total_convs,
@@ -1,5 +1,8 @@
 
-import os, sqlite3
+import os, sqlite3, threading
+from utils import canonicalize_url, parse_date_to_epoch, now_epoch, fold_text, normalize_text, tokenize
+from near_dup import (simhash_bands, hamming_distance, to_signed, from_signed,
+                      NEAR_DUP_MAX_DISTANCE)
 
 BASE = os.path.dirname(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE, "data")
@@ -7,6 +10,50 @@ NEWS_DB = os.path.join(DATA_DIR, "news.db")
 SOURCES_DB = os.path.join(DATA_DIR, "sources.db")
 PROMPTS_DB = os.path.join(DATA_DIR, "prompts.db")
 
+# Ρυθμίσεις SQLite για κάθε pooled connection
+SQLITE_BUSY_TIMEOUT_MS = 30000
+SQLITE_CACHE_SIZE_KB = 64 * 1024          # page cache ανά connection
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024      # memory-mapped I/O
+SQLITE_CACHED_STATEMENTS = 256            # prepared statements cache ανά connection
+
+_local = threading.local()
+
+def get_connection(path: str) -> sqlite3.Connection:
+    """
+    Επιστρέφει το pooled connection του τρέχοντος thread για τη βάση `path`
+
+    Κάθε thread κρατάει ένα ανοιχτό connection ανά αρχείο (δεν γίνεται close
+    μετά από κάθε query). Η βάση γυρνάει σε WAL ώστε readers και ο writer του
+    scraper να μη μπλοκάρουν ο ένας τον άλλο. Για writes χρησιμοποίησε
+    `with conn:` ώστε να γίνεται commit ή rollback αυτόματα.
+
+    Κάθε connection που γράφει στο news πρέπει να ανοίγει από εδώ, γιατί τα
+    FTS triggers καλούν τη Python function fold_text.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                               cached_statements=SQLITE_CACHED_STATEMENTS)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # Χρησιμοποιείται από τα triggers του news_fts (accent folding)
+        conn.create_function("fold_text", 1, fold_text, deterministic=True)
+        conns[path] = conn
+    return conn
+
+def close_connections():
+    """Κλείνει τα connections του τρέχοντος thread (π.χ. στο shutdown)"""
+    for conn in getattr(_local, "conns", {}).values():
+        conn.close()
+    _local.conns = {}
+
 def init_all():
     os.makedirs(DATA_DIR, exist_ok=True)
     for path, schema in [
@@ -19,15 +66,41 @@ def init_all():
             source TEXT,
             topic TEXT,
             summary TEXT,
-            saved INTEGER DEFAULT 0
+            saved INTEGER DEFAULT 0,
+            simhash INTEGER,
+            cluster_id INTEGER,
+            published_ts INTEGER,
+            content TEXT,
+            summary_engine TEXT
         );
+        CREATE TABLE IF NOT EXISTS news_lsh (
+            band INTEGER,
+            key INTEGER,
+            news_id INTEGER,
+            PRIMARY KEY (band, key, news_id)
+        ) WITHOUT ROWID;
         """),
         (SOURCES_DB, """
         CREATE TABLE IF NOT EXISTS sources (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             url TEXT UNIQUE,
             type TEXT,
-            last_check TEXT
+            last_check TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT,
+            last_poll_at INTEGER,
+            rate_ewma REAL,
+            poll_interval INTEGER,
+            next_poll_at INTEGER,
+            consecutive_failures INTEGER DEFAULT 0,
+            open_until INTEGER,
+            latency_ms REAL,
+            last_error TEXT,
+            last_error_at INTEGER,
+            seen_guids TEXT,
+            newest_published_ts INTEGER,
+            watermark_backlog INTEGER DEFAULT 0
         );
         """),
         (PROMPTS_DB, """
@@ -38,74 +111,461 @@ def init_all():
         );
         """),
     ]:
-        conn = sqlite3.connect(path)
-        cur = conn.cursor()
-        cur.executescript(schema)
+        conn = get_connection(path)
+        conn.executescript(schema)
         conn.commit()
-        conn.close()
+    migrate_news_table()
+    migrate_sources_table()
 
-def save_prompt(prompt: str):
-    conn = sqlite3.connect(PROMPTS_DB)
+def ensure_columns(conn, table: str, columns: dict):
+    """Προσθέτει (ALTER TABLE) όσες στήλες λείπουν από παλιότερες βάσεις"""
     cur = conn.cursor()
-    from datetime import datetime
-    cur.execute("INSERT INTO prompts (ts,prompt) VALUES (?,?)",
-                (datetime.now().isoformat(timespec="seconds"), prompt))
+    cur.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cur.fetchall()}
+    for name, decl in columns.items():
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
     conn.commit()
-    conn.close()
 
-def news_exists(url: str) -> bool:
-    conn = sqlite3.connect(NEWS_DB)
+# Στήλες που προστέθηκαν στον πίνακα news μετά την αρχική έκδοση
+NEWS_EXTRA_COLUMNS = {
+    "simhash": "INTEGER",      # SimHash τίτλου + περιεχομένου (near_dup.py)
+    "cluster_id": "INTEGER",   # id του canonical άρθρου αν είναι αναδημοσίευση
+    "published_ts": "INTEGER", # parsed news.date σε UTC epoch seconds
+    "content": "TEXT",         # extracted κείμενο άρθρου (για full-text search)
+    "summary_engine": "TEXT",  # llm / local: ποιο engine έγραψε την περίληψη
+}
+
+NEWS_INDEXES = {
+    "idx_news_cluster": "news(cluster_id)",
+    "idx_news_published": "news(published_ts)",
+    "idx_news_saved_published": "news(saved, published_ts)",
+    "idx_news_topic_published": "news(topic, published_ts)",
+    "idx_news_source_published": "news(source, published_ts)",
+}
+
+def migrate_news_table():
+    conn = get_connection(NEWS_DB)
+    ensure_columns(conn, "news", NEWS_EXTRA_COLUMNS)
+    backfill_published_ts()
+    with conn:
+        for name, target in NEWS_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    ensure_news_fts()
+
+# Contentless FTS5 index: αποθηκεύει μόνο tokens από fold_text (χωρίς τόνους,
+# lowercase, σ αντί ς), γιατί ο unicode61 tokenizer δεν αφαιρεί ελληνικούς τόνους.
+NEWS_FTS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS news_fts_insert AFTER INSERT ON news BEGIN
+    INSERT INTO news_fts (rowid, title, summary, content)
+    VALUES (new.id, fold_text(new.title), fold_text(new.summary), fold_text(new.content));
+END;
+CREATE TRIGGER IF NOT EXISTS news_fts_delete AFTER DELETE ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, summary, content)
+    VALUES ('delete', old.id, fold_text(old.title), fold_text(old.summary), fold_text(old.content));
+END;
+CREATE TRIGGER IF NOT EXISTS news_fts_update AFTER UPDATE OF title, summary, content ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, summary, content)
+    VALUES ('delete', old.id, fold_text(old.title), fold_text(old.summary), fold_text(old.content));
+    INSERT INTO news_fts (rowid, title, summary, content)
+    VALUES (new.id, fold_text(new.title), fold_text(new.summary), fold_text(new.content));
+END;
+"""
+
+def ensure_news_fts():
+    """Δημιουργεί το news_fts + triggers και το γεμίζει μία φορά από τα υπάρχοντα άρθρα"""
+    conn = get_connection(NEWS_DB)
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='news_fts'")
+    exists = cur.fetchone() is not None
+    with conn:
+        if not exists:
+            conn.execute("""
+                CREATE VIRTUAL TABLE news_fts USING fts5(
+                    title, summary, content,
+                    content='', tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            conn.execute("""
+                INSERT INTO news_fts (rowid, title, summary, content)
+                SELECT id, fold_text(title), fold_text(summary), fold_text(content) FROM news
+            """)
+    conn.executescript(NEWS_FTS_TRIGGERS)
+
+def backfill_published_ts(batch_size: int = 5000):
+    """Συμπληρώνει το published_ts σε παλιές εγγραφές από το raw news.date"""
+    conn = get_connection(NEWS_DB)
     cur = conn.cursor()
+    last_id = 0
+    total = 0
+    while True:
+        cur.execute("SELECT id,date FROM news WHERE id > ? AND published_ts IS NULL ORDER BY id LIMIT ?",
+                    (last_id, batch_size))
+        rows = cur.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        # Αν η ημερομηνία δεν αναγνωρίζεται, κρατάμε τη σειρά εισαγωγής (0 = πολύ παλιό)
+        with conn:
+            conn.executemany("UPDATE news SET published_ts=? WHERE id=?",
+                             [(parse_date_to_epoch(date) or 0, news_id) for news_id, date in rows])
+        total += len(rows)
+    if total:
+        print(f"[INFO] Backfill published_ts για {total} άρθρα")
+
+# Στήλες που προστέθηκαν στον πίνακα sources μετά την αρχική έκδοση
+SOURCES_EXTRA_COLUMNS = {
+    "etag": "TEXT",
+    "last_modified": "TEXT",
+    "content_hash": "TEXT",
+    # Adaptive polling (polling.py)
+    "last_poll_at": "INTEGER",  # epoch του τελευταίου poll
+    "rate_ewma": "REAL",        # εκτιμώμενα νέα άρθρα ανά ώρα
+    "poll_interval": "INTEGER", # δευτερόλεπτα μέχρι το επόμενο poll
+    "next_poll_at": "INTEGER",  # epoch του επόμενου poll
+    # Circuit breaker (source_health.py)
+    "consecutive_failures": "INTEGER DEFAULT 0",
+    "open_until": "INTEGER",    # epoch μέχρι το οποίο η πηγή παραλείπεται
+    "latency_ms": "REAL",       # EWMA διάρκειας fetch
+    "last_error": "TEXT",
+    "last_error_at": "INTEGER",
+    # Watermark για incremental parsing (watermark.py)
+    "seen_guids": "TEXT",       # JSON list με GUIDs/links που έχουμε δει, νεότερα πρώτα
+    "newest_published_ts": "INTEGER",
+    "watermark_backlog": "INTEGER DEFAULT 0",  # 1 αν το τελευταίο fetch κόπηκε στο όριο entries
+}
+
+def migrate_sources_table():
+    ensure_columns(get_connection(SOURCES_DB), "sources", SOURCES_EXTRA_COLUMNS)
+
+def save_prompt(prompt: str):
+    conn = get_connection(PROMPTS_DB)
+    from datetime import datetime
+    with conn:
+        conn.execute("INSERT INTO prompts (ts,prompt) VALUES (?,?)",
+                     (datetime.now().isoformat(timespec="seconds"), prompt))
+
+def filter_new_urls(urls: list) -> set:
+    """
+    Batched έλεγχος: ποια από τα URLs ΔΕΝ υπάρχουν ήδη στη βάση
+
+    Τα URLs συγκρίνονται σε κανονική μορφή (canonicalize_url). Ελέγχεται και η
+    αρχική μορφή για εγγραφές που αποθηκεύτηκαν πριν το canonicalization.
+
+    Returns:
+        Set με τα canonical URLs που είναι νέα
+    """
+    canonical = {}
+    for u in urls:
+        c = canonicalize_url(u)
+        if c:
+            canonical.setdefault(c, set()).update({c, u})
+    if not canonical:
+        return set()
+
+    lookup = list({v for variants in canonical.values() for v in variants})
+    known = set()
+    cur = get_connection(NEWS_DB).cursor()
+    # Chunks για να μείνουμε κάτω από το όριο παραμέτρων του SQLite
+    for i in range(0, len(lookup), 500):
+        chunk = lookup[i:i + 500]
+        cur.execute(f"SELECT url FROM news WHERE url IN ({','.join('?' * len(chunk))})", chunk)
+        known.update(r[0] for r in cur.fetchall())
+    return {c for c, variants in canonical.items() if not variants & known}
+
+def news_exists(url: str) -> bool:
+    cur = get_connection(NEWS_DB).cursor()
     cur.execute("SELECT 1 FROM news WHERE url=?", (url,))
-    res = cur.fetchone() is not None
-    conn.close()
-    return res
+    return cur.fetchone() is not None
 
-def save_news_if_new(item: dict) -> bool:
-    if news_exists(item.get("url","")):
-        return False
-    conn = sqlite3.connect(NEWS_DB)
+_NEWS_INSERT = """
+    INSERT OR IGNORE INTO news (title,url,date,source,topic,summary,summary_engine,saved,simhash,published_ts,content,cluster_id)
+    VALUES (?,?,?,?,?,?,?,0,?,?,?,{cluster})
+"""
+
+def ingest_news(items: list) -> list:
+    """
+    Bulk ingest άρθρων με INSERT OR IGNORE + executemany σε ΕΝΑ transaction
+
+    Τα URLs αποθηκεύονται σε canonical μορφή. Ένα item με "duplicate_of" (URL
+    του canonical άρθρου της ιστορίας) παίρνει cluster_id από εκείνο, ακόμα κι
+    αν το canonical εισάγεται στο ίδιο batch.
+
+    Returns:
+        List με τα items που εισήχθησαν πραγματικά (με "id" και canonical "url")
+    """
+    rows = []
+    for item in items:
+        url = canonicalize_url(item.get("url", ""))
+        if url:
+            rows.append(dict(item, url=url))
+    # Πιάνει και εγγραφές με την αρχική (μη canonical) μορφή του URL
+    new_urls = filter_new_urls([r["url"] for r in rows])
+    rows = [r for r in rows if r["url"] in new_urls]
+    if not rows:
+        return []
+
+    ingest_ts = now_epoch()
+
+    def params(r, *extra):
+        fingerprint = r.get("simhash")
+        published_ts = parse_date_to_epoch(r.get("date")) or ingest_ts
+        return (r.get("title"), r["url"], r.get("date"), r.get("source"), r.get("topic"),
+                r.get("summary"), r.get("summary_engine") if r.get("summary") else None,
+                to_signed(fingerprint) if fingerprint is not None else None,
+                published_ts, r.get("content") or None) + extra
+
+    originals = [r for r in rows if not r.get("duplicate_of")]
+    copies = [r for r in rows if r.get("duplicate_of")]
+
+    conn = get_connection(NEWS_DB)
     cur = conn.cursor()
-    cur.execute("INSERT INTO news (title,url,date,source,topic,summary,saved) VALUES (?,?,?,?,?,?,?)",
-                (item.get("title"), item.get("url"), item.get("date"), item.get("source"),
-                 item.get("topic"), item.get("summary"), 0))
-    conn.commit()
-    conn.close()
-    return True
+    # IMMEDIATE: κανένας άλλος writer ανάμεσα στο MAX(id) και στα inserts
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM news")
+        last_id = cur.fetchone()[0]
+        cur.executemany(_NEWS_INSERT.format(cluster="?"),
+                        [params(r, r.get("cluster_id")) for r in originals])
+        cur.executemany(_NEWS_INSERT.format(cluster="(SELECT COALESCE(cluster_id, id) FROM news WHERE url = ?)"),
+                        [params(r, canonicalize_url(r["duplicate_of"])) for r in copies])
+        cur.execute("SELECT id,url FROM news WHERE id > ?", (last_id,))
+        ids = {url: news_id for news_id, url in cur.fetchall()}
+
+        inserted = []
+        for r in originals + copies:
+            news_id = ids.pop(r["url"], None)
+            if news_id is not None:
+                inserted.append(dict(r, id=news_id))
+        cur.executemany("INSERT OR IGNORE INTO news_lsh (band,key,news_id) VALUES (?,?,?)",
+                        [(band, key, r["id"])
+                         for r in inserted if r.get("simhash") is not None
+                         for band, key in enumerate(simhash_bands(r["simhash"]))])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return inserted
+
+def save_news_if_new(item: dict) -> bool:
+    return bool(ingest_news([item]))
+
+def find_near_duplicate(fingerprint: int):
+    """
+    Ψάχνει στο LSH index για ήδη αποθηκευμένη αναδημοσίευση του ίδιου άρθρου
+
+    Returns:
+        dict με id/url/summary/summary_engine του canonical άρθρου της ιστορίας, ή None
+    """
+    if fingerprint is None:
+        return None
+    cur = get_connection(NEWS_DB).cursor()
+    best, best_distance = None, NEAR_DUP_MAX_DISTANCE + 1
+    for band, key in enumerate(simhash_bands(fingerprint)):
+        cur.execute("""
+            SELECT n.id, n.simhash, n.cluster_id FROM news_lsh l
+            JOIN news n ON n.id = l.news_id
+            WHERE l.band = ? AND l.key = ?
+        """, (band, key))
+        for news_id, stored, cluster_id in cur.fetchall():
+            distance = hamming_distance(fingerprint, from_signed(stored))
+            if distance < best_distance:
+                best, best_distance = cluster_id or news_id, distance
+    row = None
+    if best is not None:
+        cur.execute("SELECT id,url,summary,summary_engine FROM news WHERE id=?", (best,))
+        row = cur.fetchone()
+    if not row:
+        return None
+    return {"id": row[0], "url": row[1], "summary": row[2], "summary_engine": row[3]}
 
 def mark_saved(url: str):
-    conn = sqlite3.connect(NEWS_DB)
-    cur = conn.cursor()
-    cur.execute("UPDATE news SET saved=1 WHERE url=?", (url,))
-    conn.commit()
-    conn.close()
+    conn = get_connection(NEWS_DB)
+    with conn:
+        conn.execute("UPDATE news SET saved=1 WHERE url IN (?,?)", (url, canonicalize_url(url)))
+
+def _attach_duplicates(cur, items: list):
+    """Προσθέτει σε κάθε canonical άρθρο τις αναδημοσιεύσεις του"""
+    by_id = {it["id"]: it for it in items}
+    for it in items:
+        it["duplicates"] = []
+    ids = list(by_id)
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cur.execute(f"SELECT cluster_id,title,url,source FROM news WHERE cluster_id IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                    chunk)
+        for cluster_id, title, url, source in cur.fetchall():
+            by_id[cluster_id]["duplicates"].append({"title": title, "url": url, "source": source})
+
+NEWS_COLUMNS = "title,url,date,source,topic,summary,saved,id,cluster_id,published_ts,summary_engine"
+
+def _news_row(r) -> dict:
+    return {
+        "title": r[0], "url": r[1], "date": r[2], "source": r[3],
+        "topic": r[4], "summary": r[5], "saved": bool(r[6]),
+        "id": r[7], "cluster_id": r[8] or r[7], "published_ts": r[9],
+        "summary_engine": r[10]
+    }
+
+def encode_cursor(item: dict) -> str:
+    """Cursor της επόμενης σελίδας από το τελευταίο άρθρο της τρέχουσας"""
+    return f"{item['published_ts']}_{item['id']}"
 
-def fetch_news(limit: int = 200):
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Returns:
+        (published_ts, id) ή ValueError αν το cursor δεν είναι έγκυρο
+    """
+    ts, _, news_id = (cursor or "").partition("_")
+    return int(ts), int(news_id)
+
+def _news_conditions(group_duplicates: bool = False, since_ts: int = None, until_ts: int = None,
+                     topic: str = None, source: str = None, saved: bool = None) -> tuple:
+    """WHERE conditions και params των φίλτρων του fetch_news"""
+    conditions, params = [], []
+    if group_duplicates:
+        conditions.append("cluster_id IS NULL")
+    if since_ts is not None:
+        conditions.append("published_ts >= ?")
+        params.append(since_ts)
+    if until_ts is not None:
+        conditions.append("published_ts < ?")
+        params.append(until_ts)
+    if topic:
+        conditions.append("topic = ?")
+        params.append(topic)
+    if source:
+        conditions.append("source = ?")
+        params.append(source)
+    if saved is not None:
+        conditions.append("saved = ?")
+        params.append(1 if saved else 0)
+    return conditions, params
+
+def fetch_news(limit: int = 200, group_duplicates: bool = False, since_ts: int = None,
+               until_ts: int = None, topic: str = None, source: str = None,
+               saved: bool = None, cursor: tuple = None):
+    """
+    Args:
+        limit: Μέγιστος αριθμός άρθρων
+        group_duplicates: Αν True, επιστρέφει μόνο ένα άρθρο ανά ιστορία με
+            τις αναδημοσιεύσεις του στο πεδίο "duplicates"
+        since_ts: Μόνο άρθρα με published_ts >= since_ts (UTC epoch)
+        until_ts: Μόνο άρθρα με published_ts < until_ts (UTC epoch)
+        topic: Μόνο άρθρα του συγκεκριμένου topic
+        source: Μόνο άρθρα της συγκεκριμένης πηγής
+        saved: True/False για σημαντικά/μη σημαντικά, None για όλα
+        cursor: (published_ts, id) του τελευταίου άρθρου της προηγούμενης
+            σελίδας (keyset pagination, σταθερό κόστος ανά σελίδα)
+    """
     try:
-        conn = sqlite3.connect(NEWS_DB)
-        cur = conn.cursor()
-        cur.execute("SELECT title,url,date,source,topic,summary,saved FROM news ORDER BY date DESC LIMIT ?", (limit,))
-        rows = cur.fetchall()
-        conn.close()
-        return [{
-            "title": r[0], "url": r[1], "date": r[2], "source": r[3],
-            "topic": r[4], "summary": r[5], "saved": bool(r[6])
-        } for r in rows]
+        cur = get_connection(NEWS_DB).cursor()
+        conditions, params = _news_conditions(group_duplicates, since_ts, until_ts, topic, source, saved)
+        if cursor is not None:
+            conditions.append("(published_ts, id) < (?, ?)")
+            params.extend(cursor)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        cur.execute(f"SELECT {NEWS_COLUMNS} FROM news {where} "
+                    "ORDER BY published_ts DESC, id DESC LIMIT ?", params + [limit])
+        items = [_news_row(r) for r in cur.fetchall()]
+        if group_duplicates:
+            _attach_duplicates(cur, items)
+        return items
     except Exception as e:
         print(f"[ERROR] Σφάλμα κατά την ανάκτηση ειδήσεων: {e}")
         return []
 
-def fetch_saved():
+def fetch_news_page(limit: int = 50, cursor: str = None, **filters) -> dict:
+    """
+    Μία σελίδα ειδήσεων με keyset pagination
+
+    Args:
+        limit: Μέγεθος σελίδας
+        cursor: Το next_cursor της προηγούμενης σελίδας (None για την πρώτη)
+        **filters: Τα φίλτρα του fetch_news (topic, source, saved, since_ts, ...)
+
+    Returns:
+        dict με keys: news, next_cursor (None αν δεν υπάρχουν άλλα άρθρα)
+    """
+    # Ένα επιπλέον άρθρο για να ξέρουμε αν υπάρχει επόμενη σελίδα
+    items = fetch_news(limit=limit + 1, cursor=decode_cursor(cursor) if cursor else None, **filters)
+    next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return {"news": items[:limit], "next_cursor": next_cursor}
+
+# Βάρη bm25() για τις στήλες του news_fts: title, summary, content
+FTS_WEIGHTS = (10.0, 3.0, 1.0)
+# Πολλαπλασιαστής του score όταν το topic του άρθρου ταιριάζει με το query
+FTS_TOPIC_BOOST = 1.5
+# Λέξεις μέχρι τόσους χαρακτήρες ψάχνονται ακριβώς και όχι ως prefix
+FTS_MIN_PREFIX = 2
+
+def build_fts_query(terms: list) -> str:
+    """
+    Μετατρέπει ελεύθερο κείμενο σε FTS5 MATCH expression
+
+    Κάθε λέξη γίνεται prefix query στο stem της (utils.stem_token, χωρίς την
+    κατάληξη κλίσης), ώστε π.χ. "φωτοβολταϊκών" να βρίσκει και "φωτοβολταϊκά"
+    και "επιδοτήσεις" το "επιδότηση". Πολύ μικρές λέξεις (π.χ. "σε", "pv")
+    ψάχνονται ακριβώς, γιατί ως prefix θα ταίριαζαν σε μεγάλο μέρος του
+    αρχείου. Οι λέξεις ενώνονται με OR και τη σειρά την αποφασίζει το bm25.
+    """
+    tokens = []
+    for term in terms:
+        for word, stem in zip(normalize_text(term).split(), tokenize(term)):
+            token = f'"{stem}"*' if len(word) > FTS_MIN_PREFIX else f'"{word}"'
+            if token not in tokens:
+                tokens.append(token)
+    return " OR ".join(tokens)
+
+def search_news(terms: list, topics: list = None, limit: int = 50) -> dict:
+    """
+    Full-text αναζήτηση σε όλο το αρχείο μέσω news_fts
+
+    Args:
+        terms: Query και keywords (ελεύθερο κείμενο, με ή χωρίς τόνους)
+        topics: Topics που παίρνουν boost στη σειρά κατάταξης
+        limit: Μέγιστος αριθμός αποτελεσμάτων
+
+    Returns:
+        {"total": πλήθος matches, "results": [άρθρα ταξινομημένα κατά σχετικότητα]}
+    """
+    match = build_fts_query(terms)
+    if not match:
+        return {"total": 0, "results": []}
+    topics = [t for t in (topics or []) if t]
+    boost = ""
+    params = list(FTS_WEIGHTS) + [match]
+    if topics:
+        boost = f" * (CASE WHEN n.topic IN ({','.join('?' * len(topics))}) THEN {FTS_TOPIC_BOOST} ELSE 1.0 END)"
+        params = list(FTS_WEIGHTS) + topics + [match]
     try:
-        conn = sqlite3.connect(NEWS_DB)
-        cur = conn.cursor()
-        cur.execute("SELECT title,url,date,source,topic,summary,saved FROM news WHERE saved=1 ORDER BY date DESC")
+        cur = get_connection(NEWS_DB).cursor()
+        cur.execute("SELECT count(*) FROM news_fts WHERE news_fts MATCH ?", (match,))
+        total = cur.fetchone()[0]
+        # bm25() επιστρέφει αρνητικά scores: μικρότερο = πιο σχετικό
+        cur.execute(f"""
+            SELECT n.title, n.url, n.date, n.source, n.topic, n.summary, n.saved, n.id, n.cluster_id,
+                   n.published_ts, n.summary_engine, bm25(news_fts, ?, ?, ?){boost} AS score
+            FROM news_fts JOIN news n ON n.id = news_fts.rowid
+            WHERE news_fts MATCH ?
+            ORDER BY score LIMIT ?
+        """, params + [limit])
         rows = cur.fetchall()
-        conn.close()
-        return [{
-            "title": r[0], "url": r[1], "date": r[2], "source": r[3],
-            "topic": r[4], "summary": r[5], "saved": bool(r[6])
-        } for r in rows]
     except Exception as e:
-        print(f"[ERROR] Σφάλμα κατά την ανάκτηση αποθηκευμένων: {e}")
-        return []
+        print(f"[ERROR] Σφάλμα full-text αναζήτησης: {e}")
+        return {"total": 0, "results": []}
+    return {"total": total, "results": [
+        {**_news_row(r), "score": round(-r[11], 4)} for r in rows
+    ]}
+
+def count_news(**filters) -> int:
+    """
+    Πλήθος άρθρων με τα φίλτρα του fetch_news (topic, source, saved, since_ts, ...)
+    """
+    try:
+        conditions, params = _news_conditions(**filters)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return get_connection(NEWS_DB).execute(f"SELECT COUNT(*) FROM news {where}", params).fetchone()[0]
+    except Exception as e:
+        print(f"[ERROR] Σφάλμα κατά την καταμέτρηση ειδήσεων: {e}")
+        return 0
@@ -0,0 +1,358 @@
+"""
+Background jobs για τις μακροχρόνιες εργασίες (scraping, smart search, AI discovery)
+
+Τα endpoints δεν εκτελούν τη δουλειά μέσα στο event loop του uvicorn: τη
+βάζουν σε ουρά με submit_job και επιστρέφουν αμέσως το job id. Οι workers
+είναι ένα thread pool (JOB_WORKERS) ανά process.
+
+Η κατάσταση κάθε job (status, progress, μερικά αποτελέσματα, αίτημα
+ακύρωσης) γράφεται στο data/jobs.db, οπότε με πολλά uvicorn workers το
+GET /jobs/{id} και η ακύρωση δουλεύουν από οποιονδήποτε worker, όχι μόνο
+από αυτόν που εκτελεί το job.
+
+Δεν τρέχουν ταυτόχρονα δύο jobs με το ίδιο (kind, key), ούτε σε διαφορετικά
+processes: το submit_job ελέγχει και γράφει σε BEGIN IMMEDIATE transaction
+και επιστρέφει το job που ήδη τρέχει (ακόμα κι αν έχει ζητηθεί η ακύρωσή
+του και δεν έχει σταματήσει ακόμα). Κάθε process ανανεώνει το heartbeat_at
+των jobs του κάθε JOB_HEARTBEAT_SECONDS· ενεργά jobs χωρίς heartbeat για
+JOB_STALE_SECONDS ανήκουν σε process που πέθανε και σημειώνονται failed.
+
+Η ακύρωση είναι cooperative: ένα job στην ουρά δεν ξεκινάει ποτέ, ενώ ένα
+job που τρέχει ελέγχει το job.cancelled στα ενδιάμεσα βήματά του και
+σταματάει κρατώντας ό,τι έχει ήδη αποθηκεύσει. Το αίτημα ακύρωσης από άλλο
+process φτάνει στο job με το επόμενο heartbeat.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from db import get_connection
+from leader import holder_id
+from utils import now_epoch
+
+JOBS_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Πόσα ολοκληρωμένα jobs κρατιούνται για το GET /jobs
+JOB_HISTORY = 100
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "30"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+JOB_COLUMNS = ("id, kind, key, description, status, cancel_requested, progress, partial, "
+               "result, error, created_at, started_at, finished_at, heartbeat_at")
+
+class Job:
+    """
+    Ένα background job
+
+    Στο process που το εκτελεί, report/add_partial ενημερώνουν και τη βάση.
+    Αλλού (get_job, list_jobs, διπλότυπο submit) είναι στιγμιότυπο της βάσης.
+    """
+
+    def __init__(self, kind: str, key: str = None, description: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.description = description
+        self.status = QUEUED
+        self.progress = {"done": 0, "total": None, "message": ""}
+        self.partial = {}
+        self.result = None
+        self.error = None
+        self.created_at = now_epoch()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._future = None
+        self._heartbeat_at = None
+
+    @classmethod
+    def _from_row(cls, row) -> "Job":
+        job = cls.__new__(cls)
+        (job.id, job.kind, job.key, job.description, job.status, cancel_requested,
+         progress, partial, result, job.error, job.created_at, job.started_at, job.finished_at,
+         job._heartbeat_at) = row
+        job.progress = json.loads(progress) if progress else {}
+        job.partial = json.loads(partial) if partial else {}
+        job.result = json.loads(result) if result else None
+        job._cancel = threading.Event()
+        if cancel_requested:
+            job._cancel.set()
+        job._future = None
+        return job
+
+    @property
+    def cancelled(self) -> bool:
+        """True όταν έχει ζητηθεί ακύρωση (το job σταματάει στο επόμενο βήμα)"""
+        return self._cancel.is_set()
+
+    def report(self, done: int = None, total: int = None, message: str = None):
+        """Ενημέρωση του progress από τη συνάρτηση του job"""
+        with _jobs_lock:
+            if done is not None:
+                self.progress["done"] = done
+            if total is not None:
+                self.progress["total"] = total
+            if message is not None:
+                self.progress["message"] = message
+            progress = json.dumps(self.progress, ensure_ascii=False)
+        _update(self.id, progress=progress)
+
+    def add_partial(self, name: str, value):
+        """Μερικό αποτέλεσμα, ορατό στο GET /jobs/{id} πριν τελειώσει το job"""
+        with _jobs_lock:
+            self.partial[name] = value
+            partial = json.dumps(self.partial, ensure_ascii=False, default=str)
+        _update(self.id, partial=partial)
+
+    def to_dict(self) -> dict:
+        with _jobs_lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "key": self.key,
+                "description": self.description,
+                "status": self.status,
+                "cancel_requested": self.cancelled,
+                "progress": dict(self.progress),
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+# Τα jobs που εκτελεί αυτό το process (id -> Job), για το heartbeat και την ακύρωση
+_local_jobs = {}
+_jobs_lock = threading.Lock()
+_executor = None
+_heartbeat_started = False
+_table_ready = False
+
+def _conn():
+    global _table_ready
+    if not _table_ready:
+        # Πριν από το connect: η SQLite δεν δημιουργεί τον φάκελο
+        os.makedirs(os.path.dirname(JOBS_DB), exist_ok=True)
+    conn = get_connection(JOBS_DB)
+    if not _table_ready:
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    key TEXT,
+                    description TEXT,
+                    status TEXT NOT NULL,
+                    cancel_requested INTEGER DEFAULT 0,
+                    progress TEXT,
+                    partial TEXT,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    heartbeat_at REAL,
+                    created_at INTEGER,
+                    started_at INTEGER,
+                    finished_at INTEGER
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs(status, kind)")
+        _table_ready = True
+    return conn
+
+def _update(job_id: str, **fields):
+    """UPDATE των πεδίων ενός job (σφάλματα βάσης δεν σταματάνε το job)"""
+    try:
+        conn = _conn()
+        with conn:
+            conn.execute(f"UPDATE jobs SET {', '.join(f'{f} = ?' for f in fields)} WHERE id = ?",
+                         list(fields.values()) + [job_id])
+    except Exception as e:
+        print(f"[WARNING] Αδυναμία ενημέρωσης job {job_id}: {e}")
+
+def _reap(conn):
+    """Ενεργά jobs χωρίς πρόσφατο heartbeat: το process τους δεν υπάρχει πια"""
+    conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?) AND heartbeat_at < ?",
+                 (FAILED, "Το worker process του job τερμάτισε", now_epoch(), *ACTIVE_STATES,
+                  time.time() - JOB_STALE_SECONDS))
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+        return _executor
+
+def _heartbeat():
+    """Ανανεώνει το heartbeat των τοπικών jobs και φέρνει αιτήματα ακύρωσης από άλλα processes"""
+    while True:
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+        with _jobs_lock:
+            if not _local_jobs:
+                continue
+        try:
+            conn = _conn()
+            with conn:
+                conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                             (time.time(), holder_id(), *ACTIVE_STATES))
+            cancelled = [r[0] for r in conn.execute(
+                "SELECT id FROM jobs WHERE owner = ? AND cancel_requested = 1 AND status IN (?, ?)",
+                (holder_id(), *ACTIVE_STATES))]
+        except Exception as e:
+            print(f"[WARNING] Σφάλμα heartbeat jobs: {e}")
+            continue
+        with _jobs_lock:
+            for job_id in cancelled:
+                job = _local_jobs.get(job_id)
+                if job is not None:
+                    job._cancel.set()
+
+def _ensure_heartbeat():
+    global _heartbeat_started
+    if not _heartbeat_started:
+        _heartbeat_started = True
+        threading.Thread(target=_heartbeat, name="jobs-heartbeat", daemon=True).start()
+
+def _run(job: Job, func, args, kwargs):
+    try:
+        # Conditional: ένα job που ακυρώθηκε στην ουρά (από οποιοδήποτε process) δεν ξεκινάει
+        conn = _conn()
+        with conn:
+            started = conn.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+                                   (RUNNING, now_epoch(), job.id, QUEUED)).rowcount == 1
+    except Exception as e:
+        print(f"[ERROR] Job {job.id} ({job.kind}) δεν ξεκίνησε: {e}")
+        started = False
+    with _jobs_lock:
+        if not started or job.cancelled:
+            _local_jobs.pop(job.id, None)
+            job.status, job.finished_at = CANCELLED, now_epoch()
+        else:
+            job.status, job.started_at = RUNNING, now_epoch()
+    if job.status == CANCELLED:
+        _update(job.id, status=CANCELLED, finished_at=job.finished_at)
+        return
+    print(f"[INFO] Job {job.id} ({job.kind}) ξεκίνησε")
+    try:
+        result = func(job, *args, **kwargs)
+        status, error = (CANCELLED if job.cancelled else DONE), None
+    except Exception as e:
+        print(f"[ERROR] Job {job.id} ({job.kind}) απέτυχε: {e}")
+        result, status, error = None, FAILED, str(e)
+    with _jobs_lock:
+        job.result, job.status, job.error, job.finished_at = result, status, error, now_epoch()
+        _local_jobs.pop(job.id, None)
+    _update(job.id, status=status, error=error, finished_at=job.finished_at,
+            result=json.dumps(result, ensure_ascii=False, default=str) if result is not None else None)
+    print(f"[INFO] Job {job.id} ({job.kind}): {status}")
+
+def _prune(conn):
+    """Κρατάει τα ενεργά jobs και τα JOB_HISTORY πιο πρόσφατα ολοκληρωμένα"""
+    conn.execute("""
+        DELETE FROM jobs WHERE status NOT IN (?, ?) AND id NOT IN (
+            SELECT id FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at DESC LIMIT ?
+        )
+    """, (*ACTIVE_STATES, *ACTIVE_STATES, JOB_HISTORY))
+
+def submit_job(kind: str, func, *args, key: str = None, description: str = "", **kwargs) -> tuple:
+    """
+    Βάζει μια εργασία στην ουρά
+
+    Args:
+        kind: Τύπος job (π.χ. "scrape", "smart_scrape", "search")
+        func: Καλείται ως func(job, *args, **kwargs) σε worker thread
+        key: Μαζί με το kind ορίζει ποια jobs θεωρούνται ίδια
+        description: Κείμενο για το UI
+
+    Returns:
+        (job, created): created=False αν υπήρχε ήδη ενεργό ίδιο job (σε
+        οποιοδήποτε process)
+    """
+    executor = _get_executor()
+    conn = _conn()
+    job = Job(kind, key, description)
+    try:
+        # BEGIN IMMEDIATE: έλεγχος και εγγραφή χωρίς άλλον writer ανάμεσα
+        conn.execute("BEGIN IMMEDIATE")
+        _reap(conn)
+        row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE kind = ? AND key IS ? AND status IN (?, ?) "
+                           "ORDER BY created_at LIMIT 1", (kind, key, *ACTIVE_STATES)).fetchone()
+        if row is None:
+            conn.execute("""
+                INSERT INTO jobs(id, kind, key, description, status, progress, partial,
+                                 owner, heartbeat_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (job.id, kind, key, description, QUEUED, json.dumps(job.progress), "{}",
+                  holder_id(), time.time(), job.created_at))
+            _prune(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if row is not None:
+        return Job._from_row(row), False
+
+    with _jobs_lock:
+        _local_jobs[job.id] = job
+    job._future = executor.submit(_run, job, func, args, kwargs)
+    _ensure_heartbeat()
+    return job, True
+
+def get_job(job_id: str):
+    """Το job από τη βάση (από οποιοδήποτε process), ή None"""
+    conn = _conn()
+    row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = Job._from_row(row)
+    if job.status in ACTIVE_STATES and (job._heartbeat_at or 0) < time.time() - JOB_STALE_SECONDS:
+        with conn:
+            _reap(conn)
+        return get_job(job_id)
+    return job
+
+def list_jobs(limit: int = 50) -> list:
+    """Τα πιο πρόσφατα jobs, νεότερα πρώτα"""
+    conn = _conn()
+    with conn:
+        _reap(conn)
+    rows = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ?",
+                        (limit,)).fetchall()
+    return [Job._from_row(row).to_dict() for row in rows]
+
+def cancel_job(job_id: str) -> bool:
+    """
+    Ακύρωση job: αν είναι στην ουρά δεν θα ξεκινήσει, αν τρέχει
+    σταματάει στο επόμενο βήμα του
+
+    Returns:
+        False αν το job δεν υπάρχει ή έχει ήδη τελειώσει
+    """
+    conn = _conn()
+    with conn:
+        if conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN (?, ?)",
+                        (job_id, *ACTIVE_STATES)).rowcount == 0:
+            return False
+        # Ένα job στην ουρά ακυρώνεται αμέσως, όποιο process κι αν το έχει
+        conn.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                     (CANCELLED, now_epoch(), job_id, QUEUED))
+    with _jobs_lock:
+        job = _local_jobs.get(job_id)
+        if job is not None:
+            job._cancel.set()
+    return True
+
+def shutdown_jobs():
+    """Ακύρωση όλων των ενεργών jobs αυτού του process στο shutdown του server"""
+    with _jobs_lock:
+        active = list(_local_jobs)
+    for job_id in active:
+        cancel_job(job_id)
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,145 @@
+"""
+Keyword matching για topics με Aho-Corasick
+
+Όλα τα keywords ενός πίνακα μεταγλωττίζονται μία φορά σε ένα αυτόματο και
+κάθε κείμενο διαβάζεται σε ένα πέρασμα, ανεξάρτητα από το πλήθος των
+keywords. Keywords και κείμενο περνούν από fold_text, οπότε αρκεί μία
+γραφή ανά keyword (τόνοι, κεφαλαία και τελικό σίγμα δεν μετράνε).
+
+Κάθε keyword ταιριάζει μόνο σε ολόκληρες λέξεις. Τα λατινικά ακριβώς, ώστε
+σύντομα keywords όπως "pv", "law" ή "grant" να μη βρίσκονται μέσα σε άλλες
+λέξεις ("lawn", "granted"). Στα ελληνικά η τελευταία λέξη του keyword
+ψάχνεται με το stem της (utils.stem_token) στην αρχή λέξης, και η λέξη του
+κειμένου γίνεται δεκτή μόνο αν έχει το ίδιο stem: το "επιδότηση" ταιριάζει
+στο "επιδοτήσεων", αλλά το "εσπα" όχι στο "έσπασε" ούτε το "πρόγραμμα" στο
+"προγραμματισμένο".
+"""
+
+from utils import fold_text, stem_token
+
+# Κοινός πίνακας για scraper.guess_topic και ai_search.classify_query_keyword.
+# Η σειρά των topics είναι και η προτεραιότητά τους στο first().
+TOPIC_KEYWORDS = {
+    "Φωτοβολταϊκά": [
+        "φωτοβολταϊκά", "pv", "solar", "ηλιακά", "net metering", "net billing",
+        "αυτοπαραγωγή", "πάνελ", "panels",
+    ],
+    "Μπαταρίες": [
+        "μπαταρία", "μπαταρίες", "battery", "batteries", "αποθήκευση", "storage",
+        "ενεργειακή αποθήκευση",
+    ],
+    "Αντλίες": [
+        "αντλία", "αντλίες", "αντλία θερμότητας", "heat pump", "θερμότητα",
+        "θέρμανση", "ψύξη",
+    ],
+    "Νομοθεσία": [
+        "νόμος", "νομοθεσία", "φεκ", "κανονισμός", "απόφαση", "ρυθμιστικό",
+        "πλαίσιο", "law", "regulation", "legislation",
+    ],
+    "Επιδοτήσεις": [
+        "επιδότηση", "επιδοτήσεις", "επιχορήγηση", "πρόγραμμα", "εσπα", "espa",
+        "χρηματοδότηση", "subsidy", "grant", "funding",
+    ],
+    "Smart_Σπίτια": [
+        "smart", "έξυπνο", "iot", "αυτοματισμός", "αισθητήρες", "έξυπνο σπίτι",
+        "smart home", "automation", "sensors",
+    ],
+}
+
+class KeywordMatcher:
+    """Aho-Corasick αυτόματο για ένα πίνακα label -> keywords"""
+
+    def __init__(self, keywords: dict):
+        self.labels = list(keywords)
+        self._patterns = []   # (label, pattern του αυτομάτου, stem της τελευταίας λέξης ή None για λατινικά)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]      # indices στο self._patterns που τελειώνουν σε κάθε κατάσταση
+
+        seen = set()
+        for label, words in keywords.items():
+            for word in words:
+                parts = fold_text(word).split()
+                if not parts:
+                    continue
+                stem = None if " ".join(parts).isascii() else stem_token(parts[-1])
+                pattern = " ".join(parts[:-1] + [stem or parts[-1]])
+                if (label, pattern) not in seen:
+                    seen.add((label, pattern))
+                    self._add(pattern, len(self._patterns))
+                    self._patterns.append((label, pattern, stem))
+        self._link()
+
+    def _add(self, word: str, pattern: int):
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern)
+
+    def _link(self):
+        """Failure links με BFS (κάθε κατάσταση κληρονομεί τα outputs του fail της)"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def matches(self, text: str) -> dict:
+        """
+        Returns:
+            dict label -> πλήθος διαφορετικών keywords που βρέθηκαν,
+            με τη σειρά του πίνακα
+        """
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        text = fold_text(text)
+        found = set()
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern in out[state]:
+                if pattern in found:
+                    continue
+                _, word, stem = patterns[pattern]
+                start = end - len(word)
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    if stem is None:
+                        continue
+                    # Ελληνικά: η λέξη συνεχίζει, δεκτή μόνο αν είναι κλίση του keyword
+                    word_end = end
+                    while word_end < len(text) and text[word_end].isalnum():
+                        word_end += 1
+                    if stem_token(text[end - len(stem):word_end]) != stem:
+                        continue
+                found.add(pattern)
+
+        counts = {}
+        for pattern in sorted(found):
+            label = self._patterns[pattern][0]
+            counts[label] = counts.get(label, 0) + 1
+        return {label: counts[label] for label in self.labels if label in counts}
+
+    def first(self, text: str) -> str:
+        """Το πρώτο label του πίνακα με τουλάχιστον ένα keyword ("" αν κανένα)"""
+        return next(iter(self.matches(text)), "")
+
+    def best(self, text: str) -> str:
+        """Το label με τα περισσότερα keywords (ισοπαλία: σειρά πίνακα, "" αν κανένα)"""
+        counts = self.matches(text)
+        return max(counts, key=counts.get) if counts else ""
+
+TOPIC_MATCHER = KeywordMatcher(TOPIC_KEYWORDS)
@@ -0,0 +1,142 @@
+"""
+Leader election ανάμεσα σε πολλά worker processes του ίδιου μηχανήματος
+
+Με uvicorn/gunicorn --workers N κάθε process τρέχει το lifespan, οπότε
+εργασίες που πρέπει να γίνονται μία φορά (scheduler) χρειάζονται έναν
+ιδιοκτήτη. Ο ιδιοκτήτης κρατάει ένα lease (γραμμή στο data/leader.db) και
+το ανανεώνει κάθε LEADER_LEASE_SECONDS / 3. Αν το process πεθάνει, το lease
+λήγει και το αναλαμβάνει κάποιος από τους υπόλοιπους workers μέσα σε
+περίπου LEADER_LEASE_SECONDS. Η απόκτηση/ανανέωση είναι ένα atomic UPSERT
+στη SQLite, οπότε δουλεύει ίδια σε Windows και Linux.
+"""
+
+import os
+import uuid
+import time
+import socket
+import threading
+from db import get_connection
+
+LEADER_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "leader.db")
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "30"))
+
+_holder_ids = {}
+_table_ready = False
+
+def holder_id() -> str:
+    """
+    Μοναδικό id αυτού του process (το pid μόνο του μπορεί να ξαναχρησιμοποιηθεί)
+
+    Υπολογίζεται ανά pid και όχι στο import, γιατί με fork (π.χ. gunicorn
+    --preload) όλοι οι workers θα κληρονομούσαν το ίδιο id.
+    """
+    pid = os.getpid()
+    if pid not in _holder_ids:
+        _holder_ids[pid] = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:6]}"
+    return _holder_ids[pid]
+
+def _conn():
+    global _table_ready
+    if not _table_ready:
+        # Πριν από το connect: η SQLite δεν δημιουργεί τον φάκελο
+        os.makedirs(os.path.dirname(LEADER_DB), exist_ok=True)
+    conn = get_connection(LEADER_DB)
+    if not _table_ready:
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+        _table_ready = True
+    return conn
+
+def try_acquire(name: str, holder: str = None, lease_seconds: float = None) -> bool:
+    """
+    Απόκτηση ή ανανέωση του lease `name`
+
+    Returns:
+        True αν ο holder κρατάει το lease (το είχε ήδη ή είχε λήξει)
+    """
+    now = time.time()
+    holder = holder or holder_id()
+    conn = _conn()
+    with conn:
+        cur = conn.execute("""
+            INSERT INTO leases(name, holder, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+            WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+        """, (name, holder, now + (lease_seconds or LEADER_LEASE_SECONDS), now))
+    return cur.rowcount == 1
+
+def release(name: str, holder: str = None):
+    """Παραίτηση από το lease, ώστε να το πάρει αμέσως άλλος worker"""
+    conn = _conn()
+    with conn:
+        conn.execute("DELETE FROM leases WHERE name=? AND holder=?", (name, holder or holder_id()))
+
+class LeaderElector:
+    """
+    Background thread που διεκδικεί/ανανεώνει ένα lease και καλεί
+    on_elected / on_demoted όταν αλλάζει ο ρόλος αυτού του process
+    """
+
+    def __init__(self, name: str, on_elected, on_demoted, lease_seconds: float = None):
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lease_seconds = lease_seconds or LEADER_LEASE_SECONDS
+        self.is_leader = False
+        self._expires_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name=f"leader-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._tick()
+            self._stop.wait(self.lease_seconds / 3)
+
+    def _tick(self):
+        start = time.time()
+        try:
+            leader = try_acquire(self.name, lease_seconds=self.lease_seconds)
+            if leader:
+                self._expires_at = start + self.lease_seconds
+        except Exception as e:
+            print(f"[WARNING] Σφάλμα ανανέωσης lease '{self.name}': {e}")
+            # Χωρίς ανανέωση παραμένουμε leader μόνο όσο δεν έχει λήξει το lease
+            leader = self.is_leader and time.time() < self._expires_at
+
+        if leader and not self.is_leader:
+            self.is_leader = True
+            print(f"[INFO] Leader για '{self.name}': {holder_id()}")
+            self._call(self.on_elected)
+        elif not leader and self.is_leader:
+            self.is_leader = False
+            print(f"[WARNING] Χάθηκε το lease '{self.name}'")
+            self._call(self.on_demoted)
+
+    def _call(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"[ERROR] Σφάλμα στο callback του leader '{self.name}': {e}")
+
+    def stop(self):
+        """Σταματάει το thread και αφήνει το lease (αν το κρατούσε)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self.is_leader:
+            self.is_leader = False
+            self._call(self.on_demoted)
+            try:
+                release(self.name)
+            except Exception as e:
+                print(f"[WARNING] Σφάλμα απελευθέρωσης lease '{self.name}': {e}")
@@ -0,0 +1,212 @@
+"""
+Κοινό gateway για όλες τις κλήσεις LLM
+
+Ένας OpenAI client ανά process με pooled httpx.Client (keep-alive, HTTP/2
+όταν είναι εγκατεστημένο το h2), ώστε τα ai_* modules να μη πληρώνουν νέο
+TLS handshake σε κάθε κλήση. Το OPENAI_BASE_URL επιτρέπει τη χρήση
+οποιουδήποτε OpenAI-compatible server (π.χ. τοπικού fake server για tests).
+
+Όλες οι κλήσεις περνάνε από κοινό rate limiter (token buckets για requests
+και tokens ανά λεπτό) με retry και jittered backoff στα 429, οπότε τα
+modules δεν χρειάζονται δικά τους time.sleep() για rate limiting.
+"""
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "") or None
+AI_MODEL = os.getenv("AI_MODEL", "gpt-4o-mini")
+# Μέγιστες ταυτόχρονες κλήσεις προς τον provider (και μέγεθος του connection pool)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+# Όρια του provider (requests / tokens ανά λεπτό)
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_TPM = int(os.getenv("LLM_TPM", "200000"))
+# Retries σε 429 / σφάλματα δικτύου / 5xx με exponential backoff και jitter
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = 1.0
+LLM_BACKOFF_MAX = 30.0
+
+_client = None
+_http_client = None
+_client_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: χωρητικότητα `rate` ανά λεπτό, συνεχές refill.
+    Το acquire() μπλοκάρει μέχρι να υπάρχουν αρκετά tokens.
+    """
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0):
+        # Αιτήματα μεγαλύτερα από τη χωρητικότητα περιμένουν γεμάτο bucket
+        amount = min(amount, self.capacity)
+        with self.cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                self.cond.wait((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """Διόρθωση μετά την κλήση (πραγματικά tokens αντί για την εκτίμηση)"""
+        with self.cond:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+            self.cond.notify_all()
+
+_request_bucket = TokenBucket(LLM_RPM)
+_token_bucket = TokenBucket(LLM_TPM)
+
+def estimate_tokens(text: str) -> int:
+    """Συντηρητική εκτίμηση tokens (τα ελληνικά βγάζουν ~2-3 χαρακτήρες ανά token)"""
+    return len(text or "") // 2 + 1
+
+def is_enabled() -> bool:
+    """True αν υπάρχει API key (ή base URL τοπικού server)"""
+    return bool(OPENAI_API_KEY.strip() or OPENAI_BASE_URL)
+
+def _http2_available() -> bool:
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("[WARNING] Το πακέτο h2 δεν είναι εγκατεστημένο, χρήση HTTP/1.1")
+        return False
+
+def get_client():
+    """
+    Returns:
+        Τον κοινό OpenAI client (δημιουργείται μία φορά) ή None αν το AI
+        δεν είναι διαθέσιμο
+    """
+    global _client, _http_client
+    if _client is not None or not is_enabled():
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            try:
+                import httpx
+                from openai import OpenAI
+
+                # trust_env=False: αγνοούμε τα HTTP(S)_PROXY που σπάνε τον OpenAI client
+                _http_client = httpx.Client(
+                    http2=_http2_available(),
+                    trust_env=False,
+                    timeout=LLM_TIMEOUT,
+                    limits=httpx.Limits(max_connections=LLM_MAX_CONCURRENCY,
+                                        max_keepalive_connections=LLM_MAX_CONCURRENCY),
+                )
+                # Τα retries γίνονται στο chat() ώστε να σέβονται τον rate limiter
+                _client = OpenAI(api_key=OPENAI_API_KEY or "local", base_url=OPENAI_BASE_URL,
+                                 http_client=_http_client, max_retries=0)
+            except Exception as e:
+                print(f"[ERROR] Αδυναμία δημιουργίας OpenAI client: {e}")
+    return _client
+
+def _retry_delay(attempt: int, error) -> float:
+    """Retry-After του provider αν υπάρχει, αλλιώς exponential backoff με full jitter"""
+    response = getattr(error, "response", None)
+    try:
+        retry_after = float(response.headers.get("retry-after"))
+        return min(LLM_BACKOFF_MAX, retry_after) + random.uniform(0, LLM_BACKOFF_BASE)
+    except (AttributeError, TypeError, ValueError):
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+def chat(messages: list, model: str = None, **kwargs):
+    """
+    Chat completion μέσω του κοινού client
+
+    Πριν από κάθε κλήση δεσμεύονται ένα request και τα εκτιμώμενα tokens
+    (prompt + max_tokens) από τους rate limiters. Σε 429, timeout ή 5xx
+    γίνεται retry με jittered backoff έως LLM_MAX_RETRIES φορές.
+
+    Args:
+        messages: Τα μηνύματα σε OpenAI format
+        model: Το μοντέλο (default AI_MODEL)
+        **kwargs: temperature, max_tokens, response_format κλπ.
+
+    Returns:
+        Το response του OpenAI SDK. Πετάει exception αν το AI δεν είναι
+        διαθέσιμο ή αποτύχει η κλήση.
+    """
+    import openai
+
+    client = get_client()
+    if client is None:
+        raise RuntimeError("LLM gateway is not configured (OPENAI_API_KEY)")
+
+    estimated = sum(estimate_tokens(m.get("content")) for m in messages) + (kwargs.get("max_tokens") or 256)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        _request_bucket.acquire()
+        _token_bucket.acquire(estimated)
+        try:
+            with _slots:
+                resp = client.chat.completions.create(model=model or AI_MODEL, messages=messages, **kwargs)
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            delay = _retry_delay(attempt, e)
+            print(f"[WARNING] LLM {type(e).__name__}, retry σε {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        usage = getattr(resp, "usage", None)
+        if usage is not None and usage.total_tokens:
+            _token_bucket.adjust(usage.total_tokens - estimated)
+        return resp
+
+def chat_text(prompt: str, **kwargs) -> str:
+    """Ένα user μήνυμα, επιστρέφει μόνο το κείμενο της απάντησης"""
+    resp = chat([{"role": "user", "content": prompt}], **kwargs)
+    return (resp.choices[0].message.content or "").strip()
+
+def chat_text_many(prompts: list, **kwargs) -> list:
+    """
+    Πολλά ανεξάρτητα prompts ταυτόχρονα (έως LLM_MAX_CONCURRENCY σε πτήση)
+
+    Returns:
+        List με τις απαντήσεις στην ίδια σειρά (None όπου απέτυχε η κλήση)
+    """
+    def one(prompt):
+        try:
+            return chat_text(prompt, **kwargs)
+        except Exception as e:
+            print(f"[WARNING] Σφάλμα LLM κλήσης: {e}")
+            return None
+
+    if not prompts:
+        return []
+    with ThreadPoolExecutor(min(len(prompts), LLM_MAX_CONCURRENCY), thread_name_prefix="llm") as pool:
+        return list(pool.map(one, prompts))
+
+def close():
+    """Κλείνει το connection pool (στο shutdown του server)"""
+    global _client, _http_client
+    with _client_lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client = _http_client = None
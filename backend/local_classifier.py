@@ -0,0 +1,313 @@
+"""
+Τοπικός classifier για topic και relevance (χωρίς δίκτυο)
+
+Logistic regression σε hashed character n-grams (3-5) του fold_text, σε
+NumPy. Εκπαιδεύεται από δεδομένα που ήδη υπάρχουν στη βάση:
+- topic: το topic κάθε αποθηκευμένου άρθρου
+- importance: news.saved (θετικά) και τα ratings των SEARCH συνομιλιών
+  (rating >= 4 θετικά, <= 2 αρνητικά)
+
+Η relevance ενός αποτελέσματος για ένα query είναι η πιθανότητα να έχουν
+το ίδιο topic, που η importance του αποτελέσματος μπορεί μόνο να αυξήσει.
+Το κοινό topic είναι πολύ χονδρικό σήμα για να απορρίψει ένα αποτέλεσμα:
+ο classifier μόνο επιβεβαιώνει σχετικά αποτελέσματα και όλα τα υπόλοιπα
+(χαμηλή συμφωνία ή confidence κάτω από LOCAL_CLASSIFIER_MIN_CONFIDENCE)
+πηγαίνουν στο LLM.
+
+Retrain και report ακρίβειας/latency:
+    python local_classifier.py
+"""
+
+import os
+import sys
+import time
+import zlib
+import random
+import threading
+import numpy as np
+from utils import fold_text
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "local_classifier.npz")
+LOCAL_CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("LOCAL_CLASSIFIER_MIN_CONFIDENCE", "0.8"))
+# Μικρότερο πλήθος παραδειγμάτων ανά topic: τα σπάνια topics αγνοούνται
+MIN_TOPIC_SAMPLES = 10
+
+HASH_DIM = 2 ** 18
+NGRAM_SIZES = (3, 4, 5)
+EPOCHS = 5
+LEARNING_RATE = 0.5
+L2 = 1e-6
+# Τα μη αποθηκευμένα άρθρα δεν είναι σίγουρα αδιάφορα: μικρότερο βάρος
+UNSAVED_WEIGHT = 0.3
+RELEVANCE_TOPIC_WEIGHT = 0.7
+# Κάτω από αυτή τη συμφωνία topic η relevance δεν αποφασίζεται τοπικά
+RELEVANCE_MIN_AGREEMENT = 0.6
+
+def featurize(text: str) -> tuple:
+    """
+    Hashed char n-grams του κειμένου
+
+    Returns:
+        (indices, values): sparse διάνυσμα με log(1+tf), κανονικοποιημένο L2
+    """
+    padded = f" {' '.join(fold_text(text or '').split())} "
+    grams = [padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashed = np.fromiter((zlib.crc32(g.encode("utf-8")) % HASH_DIM for g in grams), dtype=np.int64, count=len(grams))
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = np.log1p(counts).astype(np.float32)
+    return indices, values / np.linalg.norm(values)
+
+class HashedLogReg:
+    """Multinomial logistic regression σε sparse hashed features (SGD)"""
+
+    def __init__(self, classes: list, weights: np.ndarray = None, bias: np.ndarray = None):
+        self.classes = list(classes)
+        self.weights = weights if weights is not None else np.zeros((HASH_DIM, len(self.classes)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(self.classes), dtype=np.float32)
+
+    def _proba(self, indices, values) -> np.ndarray:
+        logits = values @ self.weights[indices] + self.bias
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def fit(self, samples: list, labels: list, sample_weights: list = None, seed: int = 42):
+        """samples: List από featurize(), labels: στοιχεία του self.classes"""
+        targets = [self.classes.index(label) for label in labels]
+        sample_weights = sample_weights or [1.0] * len(samples)
+        order = list(range(len(samples)))
+        rnd = random.Random(seed)
+        for epoch in range(EPOCHS):
+            rnd.shuffle(order)
+            lr = LEARNING_RATE / (1 + epoch)
+            for i in order:
+                indices, values = samples[i]
+                grad = self._proba(indices, values)
+                grad[targets[i]] -= 1.0
+                grad *= lr * sample_weights[i]
+                self.weights[indices] -= np.outer(values, grad) + lr * L2 * self.weights[indices]
+                self.bias -= grad
+        return self
+
+    def predict_proba(self, text: str) -> dict:
+        indices, values = featurize(text)
+        return dict(zip(self.classes, self._proba(indices, values).tolist()))
+
+def _news_rows():
+    from db import get_connection, NEWS_DB
+    cur = get_connection(NEWS_DB).cursor()
+    cur.execute("SELECT title, summary, topic, saved FROM news WHERE cluster_id IS NULL")
+    return cur.fetchall()
+
+def _rated_searches():
+    """(query, rating) από τις SEARCH συνομιλίες με rating"""
+    from conversation_manager import init_conversation_db, get_connection, CONV_DB
+    init_conversation_db()
+    cur = get_connection(CONV_DB).cursor()
+    cur.execute("SELECT ai_action, rating FROM conversations WHERE rating IS NOT NULL AND ai_action LIKE 'SEARCH:%'")
+    return [(action.split(":", 1)[1].strip(), rating) for action, rating in cur.fetchall()]
+
+def load_training_data() -> dict:
+    """
+    Returns:
+        {"topic": [(text, topic)], "importance": [(text, label, weight)]}
+    """
+    topic_data, importance_data = [], []
+    for title, summary, topic, saved in _news_rows():
+        text = f"{title or ''} {summary or ''}"
+        if topic:
+            topic_data.append((text, topic))
+        importance_data.append((text, int(bool(saved)), 1.0 if saved else UNSAVED_WEIGHT))
+    for query, rating in _rated_searches():
+        if rating >= 4:
+            importance_data.append((query, 1, 1.0))
+        elif rating <= 2:
+            importance_data.append((query, 0, 1.0))
+
+    counts = {}
+    for _, topic in topic_data:
+        counts[topic] = counts.get(topic, 0) + 1
+    topic_data = [(text, topic) for text, topic in topic_data if counts[topic] >= MIN_TOPIC_SAMPLES]
+    return {"topic": topic_data, "importance": importance_data}
+
+def _split(data: list, holdout: float = 0.2, seed: int = 42) -> tuple:
+    data = list(data)
+    random.Random(seed).shuffle(data)
+    cut = int(len(data) * (1 - holdout))
+    return data[:cut], data[cut:]
+
+def _evaluate(model: HashedLogReg, data: list) -> float:
+    if not data:
+        return None
+    correct = 0
+    for text, label, *_ in data:
+        proba = model.predict_proba(text)
+        correct += max(proba, key=proba.get) == label
+    return round(correct / len(data), 3)
+
+def train(save: bool = True) -> dict:
+    """
+    Εκπαίδευση από τη βάση, αξιολόγηση σε 20% holdout, αποθήκευση και reload
+
+    Returns:
+        Report με πλήθος δειγμάτων, accuracy, majority baseline και latency
+    """
+    start = time.perf_counter()
+    data = load_training_data()
+    report = {"topic": None, "importance": None}
+    models = {}
+
+    if len({topic for _, topic in data["topic"]}) >= 2:
+        train_set, test_set = _split(data["topic"])
+        classes = sorted({topic for _, topic in data["topic"]})
+        model = HashedLogReg(classes).fit([featurize(t) for t, _ in train_set], [l for _, l in train_set])
+        majority = max(classes, key=[l for _, l in test_set].count) if test_set else None
+        report["topic"] = {
+            "samples": len(data["topic"]), "classes": len(classes),
+            "accuracy": _evaluate(model, test_set),
+            "baseline": round(sum(l == majority for _, l in test_set) / len(test_set), 3) if test_set else None,
+        }
+        models["topic"] = HashedLogReg(classes).fit([featurize(t) for t, _ in data["topic"]],
+                                                    [l for _, l in data["topic"]])
+
+    if len({label for _, label, _ in data["importance"]}) == 2:
+        train_set, test_set = _split(data["importance"])
+        model = HashedLogReg([0, 1]).fit([featurize(t) for t, _, _ in train_set],
+                                         [l for _, l, _ in train_set], [w for _, _, w in train_set])
+        # Τα περισσότερα άρθρα δεν είναι αποθηκευμένα: χωρίς τη majority
+        # baseline η accuracy δεν λέει τίποτα
+        majority = int(sum(l for _, l, _ in test_set) * 2 > len(test_set)) if test_set else None
+        report["importance"] = {
+            "samples": len(data["importance"]),
+            "positives": sum(l for _, l, _ in data["importance"]),
+            "accuracy": _evaluate(model, test_set),
+            "baseline": round(sum(l == majority for _, l, _ in test_set) / len(test_set), 3) if test_set else None,
+        }
+        models["importance"] = HashedLogReg([0, 1]).fit([featurize(t) for t, _, _ in data["importance"]],
+                                                        [l for _, l, _ in data["importance"]],
+                                                        [w for _, _, w in data["importance"]])
+
+    report["train_seconds"] = round(time.perf_counter() - start, 2)
+    if models:
+        report["latency_us"] = _latency_us(models)
+        if save:
+            save_models(models)
+    return report
+
+def _latency_us(models: dict, runs: int = 200) -> float:
+    text = "Νέο πρόγραμμα επιδότησης για φωτοβολταϊκά σε στέγες κατοικιών"
+    start = time.perf_counter()
+    for _ in range(runs):
+        for model in models.values():
+            model.predict_proba(text)
+    return round((time.perf_counter() - start) / runs * 1e6, 1)
+
+def save_models(models: dict):
+    global _models
+    arrays = {}
+    for name, model in models.items():
+        # Μόνο οι γραμμές με μη μηδενικά βάρη (τα hashed features είναι αραιά)
+        rows = np.flatnonzero(np.abs(model.weights).sum(axis=1))
+        arrays[f"{name}_rows"] = rows
+        arrays[f"{name}_weights"] = model.weights[rows]
+        arrays[f"{name}_bias"] = model.bias
+        arrays[f"{name}_classes"] = np.array([str(c) for c in model.classes])
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    np.savez_compressed(MODEL_PATH, **arrays)
+    with _models_lock:
+        _models = models
+
+_models = None
+_models_lock = threading.Lock()
+
+def get_models() -> dict:
+    """Τα εκπαιδευμένα μοντέλα (φορτώνονται μία φορά), {} αν δεν υπάρχει εκπαίδευση"""
+    global _models
+    if _models is not None:
+        return _models
+    with _models_lock:
+        if _models is None:
+            models = {}
+            if os.path.exists(MODEL_PATH):
+                try:
+                    data = np.load(MODEL_PATH)
+                    for name in ("topic", "importance"):
+                        if f"{name}_rows" not in data:
+                            continue
+                        classes = data[f"{name}_classes"].tolist()
+                        if name == "importance":
+                            classes = [int(c) for c in classes]
+                        weights = np.zeros((HASH_DIM, len(classes)), dtype=np.float32)
+                        weights[data[f"{name}_rows"]] = data[f"{name}_weights"]
+                        models[name] = HashedLogReg(classes, weights, data[f"{name}_bias"])
+                except Exception as e:
+                    print(f"[WARNING] Αδυναμία φόρτωσης local classifier: {e}")
+            _models = models
+    return _models
+
+def classify_topic(text: str):
+    """
+    Returns:
+        (topic, confidence) ή None αν δεν υπάρχει εκπαιδευμένο μοντέλο
+    """
+    model = get_models().get("topic")
+    if model is None:
+        return None
+    proba = model.predict_proba(text)
+    topic = max(proba, key=proba.get)
+    return topic, proba[topic]
+
+def score_relevance(query: str, text: str):
+    """
+    Relevance (0-1) του κειμένου για το query: πιθανότητα κοινού topic,
+    που η importance του κειμένου μπορεί μόνο να αυξήσει
+
+    Returns:
+        (score, confidence) ή None αν δεν υπάρχει εκπαιδευμένο topic μοντέλο.
+        Με συμφωνία topic κάτω από RELEVANCE_MIN_AGREEMENT το confidence είναι
+        0, ώστε ο caller να ρωτήσει το LLM αντί να απορρίψει το αποτέλεσμα.
+    """
+    models = get_models()
+    topic_model = models.get("topic")
+    if topic_model is None:
+        return None
+    query_proba = topic_model.predict_proba(query)
+    text_proba = topic_model.predict_proba(text)
+    agreement = sum(query_proba[t] * text_proba[t] for t in topic_model.classes)
+    # Σίγουροι μόνο όταν και τα δύο κείμενα έχουν σαφές και κοινό topic
+    confidence = min(max(query_proba.values()), max(text_proba.values()))
+    if agreement < RELEVANCE_MIN_AGREEMENT:
+        confidence = 0.0
+
+    importance_model = models.get("importance")
+    if importance_model is None:
+        return agreement, confidence
+    importance = importance_model.predict_proba(text)[1]
+    return max(agreement, RELEVANCE_TOPIC_WEIGHT * agreement + (1 - RELEVANCE_TOPIC_WEIGHT) * importance), confidence
+
+def print_report(report: dict):
+    print("=" * 60)
+    print("LOCAL CLASSIFIER")
+    print("=" * 60)
+    topic, importance = report.get("topic"), report.get("importance")
+    if topic:
+        print(f"Topic: {topic['samples']} δείγματα, {topic['classes']} κατηγορίες, "
+              f"accuracy {topic['accuracy']} (baseline {topic['baseline']})")
+    else:
+        print("Topic: δεν υπάρχουν αρκετά δεδομένα (>= 2 topics με "
+              f"{MIN_TOPIC_SAMPLES}+ άρθρα)")
+    if importance:
+        print(f"Importance: {importance['samples']} δείγματα, {importance['positives']} θετικά, "
+              f"accuracy {importance['accuracy']} (baseline {importance['baseline']})")
+    else:
+        print("Importance: δεν υπάρχουν αρκετά δεδομένα (χρειάζονται σημαντικά άρθρα)")
+    print(f"Training: {report['train_seconds']}s")
+    if report.get("latency_us") is not None:
+        print(f"Latency: {report['latency_us']}µs ανά κείμενο (όλα τα μοντέλα)")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(__file__))
+    print_report(train())
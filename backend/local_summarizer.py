@@ -0,0 +1,99 @@
+"""
+Τοπικός extractive summarizer (TextRank) χωρίς δίκτυο και χωρίς API key
+
+Οι προτάσεις γίνονται TF-IDF διανύσματα (utils.tokenize, οπότε δουλεύει με
+ελληνικά με ή χωρίς τόνους), ο πίνακας ομοιότητας συνημιτόνου είναι ο γράφος
+και το PageRank με power iteration διαλέγει τις πιο κεντρικές προτάσεις.
+Οι προτάσεις που μοιάζουν με τον τίτλο παίρνουν προτεραιότητα.
+"""
+
+import re
+import numpy as np
+from utils import tokenize
+
+LOCAL_SUMMARY_SENTENCES = 3
+LOCAL_MAX_SENTENCES = 200       # όριο για τον n x n πίνακα ομοιότητας
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 50
+TEXTRANK_TOLERANCE = 1e-6
+
+# Τέλος πρότασης: . ! ? ; (ελληνικό ερωτηματικό) και … ακολουθούμενα από κενό
+_SENTENCE_END = re.compile(r"(?<=[.!?;\u037e…])\s+")
+_MIN_SENTENCE_TOKENS = 4
+
+def split_sentences(text: str) -> list:
+    sentences = []
+    for part in _SENTENCE_END.split(" ".join((text or "").split())):
+        part = part.strip()
+        if len(part) > 20:
+            sentences.append(part)
+    return sentences[:LOCAL_MAX_SENTENCES]
+
+def _tfidf(token_lists: list, vocab: dict) -> np.ndarray:
+    matrix = np.zeros((len(token_lists), len(vocab)))
+    for row, tokens in enumerate(token_lists):
+        for token in tokens:
+            matrix[row, vocab[token]] += 1
+    df = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(token_lists)) / (1 + df)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+def textrank(similarity: np.ndarray, personalization: np.ndarray = None) -> np.ndarray:
+    """
+    PageRank σε σταθμισμένο γράφο
+
+    Args:
+        similarity: n x n πίνακας βαρών (η διαγώνιος αγνοείται)
+        personalization: Κατανομή teleport (default ομοιόμορφη)
+
+    Returns:
+        Score ανά κόμβο (άθροισμα 1)
+    """
+    n = similarity.shape[0]
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0)
+    out = weights.sum(axis=1, keepdims=True)
+    # Προτάσεις χωρίς ακμές μοιράζουν το βάρος τους ομοιόμορφα
+    transition = np.where(out > 0, weights / np.where(out > 0, out, 1), 1.0 / n)
+    teleport = np.full(n, 1.0 / n) if personalization is None else personalization / personalization.sum()
+    scores = np.full(n, 1.0 / n)
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = (1 - TEXTRANK_DAMPING) * teleport + TEXTRANK_DAMPING * transition.T @ scores
+        if np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+def summarize_local(title: str, content: str, max_sentences: int = LOCAL_SUMMARY_SENTENCES):
+    """
+    Extractive περίληψη: οι max_sentences πιο κεντρικές προτάσεις στη σειρά του κειμένου
+
+    Returns:
+        Η περίληψη ή None αν δεν υπάρχει αρκετό κείμενο
+    """
+    sentences = split_sentences(content)
+    token_lists = [tokenize(s) for s in sentences]
+    kept = [(s, t) for s, t in zip(sentences, token_lists) if len(t) >= _MIN_SENTENCE_TOKENS]
+    if not kept:
+        return None
+    if len(kept) <= max_sentences:
+        return " ".join(s for s, _ in kept)
+
+    sentences, token_lists = zip(*kept)
+    title_tokens = tokenize(title or "")
+    vocab = {}
+    for tokens in list(token_lists) + [title_tokens]:
+        for token in tokens:
+            vocab.setdefault(token, len(vocab))
+
+    vectors = _tfidf(list(token_lists) + [title_tokens], vocab)
+    sentence_vectors, title_vector = vectors[:-1], vectors[-1]
+    similarity = sentence_vectors @ sentence_vectors.T
+    # Teleport προς τις προτάσεις που μοιάζουν με τον τίτλο
+    personalization = 1.0 + sentence_vectors @ title_vector
+
+    scores = textrank(similarity, personalization)
+    best = sorted(np.argsort(-scores)[:max_sentences])
+    return " ".join(sentences[i] for i in best)
@@ -2,7 +2,7 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from scheduler import start_scheduler
+from scheduler import start_scheduler, stop_scheduler
 from agent_core import handle_prompt
 from db import init_all
 
@@ -12,7 +12,12 @@ async def lifespan(app: FastAPI):
     init_all()
     start_scheduler()
     yield
-    # Shutdown (αν χρειαστεί στο μέλλον)
+    # Shutdown
+    import llm_gateway
+    from jobs import shutdown_jobs
+    stop_scheduler()
+    shutdown_jobs()
+    llm_gateway.close()
 
 app = FastAPI(title="Energy Agent Dashboard (GR)", lifespan=lifespan)
 
@@ -24,7 +29,9 @@ app.add_middleware(
 )
 
 @app.post("/prompt")
-async def run_prompt(data: dict):
+def run_prompt(data: dict):
+    # Sync endpoint: το AI parsing τρέχει στο threadpool του FastAPI και όχι στο
+    # event loop, η αναζήτηση (SEARCH) γίνεται background job (βλ. agent_core)
     prompt = data.get("prompt", "")
     result = handle_prompt(prompt)
 
@@ -52,78 +59,140 @@ async def remove_source_api(data: dict):
     url = data.get("url", "").strip()
     return {"result": remove_source(url)}
 
+# Μέγιστο μέγεθος σελίδας για /news και /saved
+NEWS_PAGE_MAX = 200
+
+def _date_range(date_from: str, date_to: str):
+    """(since_ts, until_ts) από ISO ημερομηνίες, ή None αν κάποια δεν είναι έγκυρη"""
+    from utils import parse_date_to_epoch
+
+    since_ts = parse_date_to_epoch(date_from) if date_from else None
+    until_ts = parse_date_to_epoch(date_to) if date_to else None
+    if (date_from and since_ts is None) or (date_to and until_ts is None):
+        return None
+    # Σκέτη ημερομηνία στο date_to: συμπεριλαμβάνεται όλη η ημέρα
+    if date_to and len(date_to.strip()) == 10 and not date_to.strip().isdigit():
+        until_ts += 86400
+    return since_ts, until_ts
+
+def _news_page(limit: int, cursor: str, date_from: str, date_to: str, **filters) -> dict:
+    """Κοινή υλοποίηση των /news και /saved (keyset pagination + φίλτρα)"""
+    from db import fetch_news_page
+
+    dates = _date_range(date_from, date_to)
+    if dates is None:
+        return {"error": "Μη έγκυρη ημερομηνία", "news": [], "next_cursor": None}
+    since_ts, until_ts = dates
+
+    try:
+        return fetch_news_page(limit=max(1, min(limit, NEWS_PAGE_MAX)), cursor=cursor,
+                               since_ts=since_ts, until_ts=until_ts, **filters)
+    except ValueError:
+        return {"error": "Μη έγκυρο cursor", "news": [], "next_cursor": None}
+
 @app.get("/news")
-async def list_news():
-    from db import fetch_news
-    return {"news": fetch_news()}
+async def list_news(limit: int = 50, cursor: str = None, topic: str = None, source: str = None,
+                    saved: bool = None, date_from: str = None, date_to: str = None,
+                    group_duplicates: bool = False):
+    """
+    Λίστα ειδήσεων, νεότερες πρώτα, σε σελίδες των `limit` άρθρων.
+
+    Για την επόμενη σελίδα στέλνεται το `next_cursor` της απάντησης ως
+    `cursor`. Φίλτρα: topic, source, saved, date_from/date_to (ISO ημερομηνίες).
+    Με group_duplicates=true επιστρέφεται ένα άρθρο ανά ιστορία και οι
+    αναδημοσιεύσεις του στο πεδίο "duplicates".
+    """
+    return _news_page(limit, cursor, date_from, date_to, topic=topic, source=source,
+                      saved=saved, group_duplicates=group_duplicates)
 
 @app.get("/saved")
-async def list_saved():
-    from db import fetch_saved
-    return {"news": fetch_saved()}
+async def list_saved(limit: int = 50, cursor: str = None, topic: str = None, source: str = None,
+                     date_from: str = None, date_to: str = None):
+    """Σημαντικά άρθρα, με τα ίδια φίλτρα και pagination όπως το /news"""
+    return _news_page(limit, cursor, date_from, date_to, topic=topic, source=source, saved=True)
+
+@app.get("/news/count")
+async def news_count(topic: str = None, source: str = None, saved: bool = None,
+                     date_from: str = None, date_to: str = None):
+    """Πλήθος ειδήσεων με τα φίλτρα του /news (π.χ. saved=true για τα σημαντικά)"""
+    from db import count_news
+
+    dates = _date_range(date_from, date_to)
+    if dates is None:
+        return {"error": "Μη έγκυρη ημερομηνία", "count": 0}
+    return {"count": count_news(since_ts=dates[0], until_ts=dates[1], topic=topic,
+                                source=source, saved=saved)}
+
+def _job_response(job, created: bool, started_message: str) -> dict:
+    """Απάντηση των endpoints που ξεκινούν background job"""
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "duplicate": not created,
+        "message": started_message if created else "Η ίδια εργασία εκτελείται ήδη."
+    }
 
 @app.post("/scrape/manual")
 async def manual_scrape():
     """
-    Manual scraping όλων των πηγών.
+    Manual scraping όλων των πηγών ως background job (βλ. GET /jobs/{id}).
     ΠΡΟΣΟΧΗ: Θα χρεώσει το OpenAI API για AI summarization!
     """
-    from scraper import run_scraping
-    try:
-        total_new = run_scraping()
-        return {
-            "success": True,
-            "new_articles": total_new,
-            "message": f"Scraping ολοκληρώθηκε. Βρέθηκαν {total_new} νέα άρθρα."
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": f"Σφάλμα κατά το scraping: {str(e)}"
-        }
+    from jobs import submit_job
+    from scraper import scrape_job
+
+    # Ίδιο (kind, key) με το poll job του polling.py: αν τρέχει ήδη scraping
+    # επιστρέφεται αυτό, αντί να διαβαστούν και να χρεωθούν οι ίδιες πηγές δύο φορές
+    job, created = submit_job("scrape", scrape_job, description="Manual scraping")
+    return _job_response(job, created, "Το scraping ξεκίνησε.")
+
+def _smart_scrape_job(job, topics: list, max_per_topic: int) -> dict:
+    from smart_search import search_by_topics, save_search_results_to_db
+
+    # Ένα topic τη φορά: progress, μερικά αποτελέσματα και ακύρωση ανάμεσα στα topics
+    total_saved = 0
+    results_by_topic = {}
+    for done, topic in enumerate(topics):
+        if job.cancelled:
+            break
+        job.report(done, len(topics), f"Αναζήτηση για {topic}")
+        for topic_name, results in search_by_topics([topic], max_per_topic).items():
+            saved = save_search_results_to_db(results, topic=topic_name)
+            total_saved += saved
+            results_by_topic[topic_name] = len(results)
+            print(f"[INFO] Topic '{topic_name}': Αποθηκεύτηκαν {saved}/{len(results)} άρθρα")
+        job.add_partial("results_by_topic", dict(results_by_topic))
+        job.add_partial("total_articles", total_saved)
+        job.report(done + 1, message="")
+
+    return {
+        "total_articles": total_saved,
+        "results_by_topic": results_by_topic,
+        "message": f"Smart scraping ολοκληρώθηκε. Βρέθηκαν {total_saved} νέα άρθρα σε {len(results_by_topic)} topics."
+    }
 
 @app.post("/scrape/smart")
 async def smart_scrape(data: dict):
     """
-    Smart scraping με predefined topics ή custom keywords.
+    Smart scraping με predefined topics ή custom keywords, ως background job.
     ΠΡΟΣΟΧΗ: Θα χρεώσει το OpenAI API για AI filtering και summarization!
     """
-    from smart_search import search_by_topics, save_search_results_to_db, SMART_TOPICS
-
-    try:
-        # Αν δίνονται topics, χρησιμοποιούμε αυτά, αλλιώς όλα
-        topics = data.get("topics", None)  # π.χ. ["Φωτοβολταϊκά", "Αντλίες Θερμότητας"]
-        max_per_topic = data.get("max_per_topic", 5)
-
-        if topics is None:
-            # Χρησιμοποιούμε όλα τα predefined topics
-            topics = list(SMART_TOPICS.keys())
-
-        print(f"[INFO] Smart scraping για topics: {topics}")
-
-        # Κάνουμε smart search για κάθε topic
-        all_results = search_by_topics(topics, max_per_topic)
+    from jobs import submit_job
+    from smart_search import SMART_TOPICS
 
-        # Αποθηκεύουμε όλα τα αποτελέσματα
-        total_saved = 0
-        for topic, results in all_results.items():
-            saved = save_search_results_to_db(results, topic=topic)
-            total_saved += saved
-            print(f"[INFO] Topic '{topic}': Αποθηκεύτηκαν {saved}/{len(results)} άρθρα")
+    # Αν δίνονται topics, χρησιμοποιούμε αυτά, αλλιώς όλα
+    topics = data.get("topics", None)  # π.χ. ["Φωτοβολταϊκά", "Αντλίες Θερμότητας"]
+    max_per_topic = data.get("max_per_topic", 5)
+    if topics is None:
+        topics = list(SMART_TOPICS.keys())
 
-        return {
-            "success": True,
-            "total_articles": total_saved,
-            "results_by_topic": {topic: len(results) for topic, results in all_results.items()},
-            "message": f"Smart scraping ολοκληρώθηκε. Βρέθηκαν {total_saved} νέα άρθρα σε {len(all_results)} topics."
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": f"Σφάλμα κατά το smart scraping: {str(e)}"
-        }
+    print(f"[INFO] Smart scraping για topics: {topics}")
+    # Ίδιο job μόνο για ίδια topics και max_per_topic
+    key = f"{'|'.join(sorted(topics))}:{max_per_topic}"
+    job, created = submit_job("smart_scrape", _smart_scrape_job, topics, max_per_topic, key=key,
+                              description=f"Smart scraping: {', '.join(topics)}")
+    return _job_response(job, created, "Το smart scraping ξεκίνησε.")
 
 @app.get("/scrape/topics")
 async def get_smart_topics():
@@ -134,37 +203,30 @@ async def get_smart_topics():
         "details": SMART_TOPICS
     }
 
+def _ai_discovery_job(job, max_queries: int) -> dict:
+    from ai_topic_discovery import run_ai_topic_discovery_and_search
+
+    results = run_ai_topic_discovery_and_search(max_queries=max_queries, job=job)
+    return {
+        "trending_topics": results.get("trending_topics", []),
+        "new_queries": results.get("new_queries", []),
+        "total_articles_found": results.get("total_articles_found", 0),
+        "message": f"AI Discovery ολοκληρώθηκε. Βρέθηκαν {results.get('total_articles_found', 0)} νέα άρθρα."
+    }
+
 @app.post("/scrape/ai-discovery")
 async def ai_topic_discovery(data: dict):
     """
-    AI-Powered Topic Discovery & Smart Search
+    AI-Powered Topic Discovery & Smart Search, ως background job
     Χρησιμοποιεί AI για να ανακαλύψει trending topics και να κάνει automatic search
     ΠΡΟΣΟΧΗ: Θα χρεώσει το OpenAI API!
     """
-    from ai_topic_discovery import run_ai_topic_discovery_and_search
-
-    try:
-        max_queries = data.get("max_queries", 5)
+    from jobs import submit_job
 
-        print(f"[INFO] Starting AI topic discovery with max_queries={max_queries}")
-
-        # Run AI discovery
-        results = run_ai_topic_discovery_and_search(max_queries=max_queries)
-
-        return {
-            "success": True,
-            "trending_topics": results.get("trending_topics", []),
-            "new_queries": results.get("new_queries", []),
-            "total_articles_found": results.get("total_articles_found", 0),
-            "message": f"AI Discovery ολοκληρώθηκε. Βρέθηκαν {results.get('total_articles_found', 0)} νέα άρθρα."
-        }
-    except Exception as e:
-        print(f"[ERROR] AI discovery failed: {e}")
-        return {
-            "success": False,
-            "error": str(e),
-            "message": f"Σφάλμα κατά το AI discovery: {str(e)}"
-        }
+    max_queries = data.get("max_queries", 5)
+    print(f"[INFO] Starting AI topic discovery with max_queries={max_queries}")
+    job, created = submit_job("ai_discovery", _ai_discovery_job, max_queries, description="AI topic discovery")
+    return _job_response(job, created, "Το AI discovery ξεκίνησε.")
 
 @app.get("/scrape/trending-topics")
 async def get_trending_topics():
@@ -225,11 +287,36 @@ async def generate_smart_queries(data: dict):
             "queries": []
         }
 
+@app.get("/jobs")
+async def jobs_list(limit: int = 50):
+    """Τα πιο πρόσφατα background jobs"""
+    from jobs import list_jobs
+    return {"jobs": list_jobs(limit=max(1, min(limit, 100)))}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status, progress, μερικά αποτελέσματα και αποτέλεσμα ενός job"""
+    from jobs import get_job
+    job = get_job(job_id)
+    if job is None:
+        return {"error": "Δεν βρέθηκε job", "job": None}
+    return {"job": job.to_dict()}
+
+@app.post("/jobs/{job_id}/cancel")
+async def job_cancel(job_id: str):
+    """Ακύρωση job (σταματάει στο επόμενο βήμα του, όσα έχουν αποθηκευτεί μένουν)"""
+    from jobs import cancel_job
+    if not cancel_job(job_id):
+        return {"success": False, "error": "Το job δεν βρέθηκε ή έχει ήδη τελειώσει"}
+    return {"success": True}
+
 @app.get("/api-usage")
 async def get_api_usage():
     """Επιστρέφει τη χρήση του AI summarizer για σήμερα"""
-    from ai_summarizer import check_api_quota, MAX_DAILY_SECONDS
-    used_seconds = check_api_quota()
+    from api_quota import usage_today, MAX_DAILY_SECONDS
+    from summary_cache import cache_stats
+    usage = usage_today()
+    used_seconds = usage["seconds"]
     remaining_seconds = max(0, MAX_DAILY_SECONDS - used_seconds)
     return {
         "max_daily_seconds": MAX_DAILY_SECONDS,
@@ -238,14 +325,22 @@ async def get_api_usage():
         "used_minutes": round(used_seconds / 60, 2),
         "remaining_seconds": round(remaining_seconds, 2),
         "remaining_minutes": round(remaining_seconds / 60, 2),
-        "quota_exceeded": used_seconds >= MAX_DAILY_SECONDS
+        "quota_exceeded": used_seconds >= MAX_DAILY_SECONDS,
+        "calls": usage["calls"],
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+        "cost_usd": usage["cost_usd"],
+        "reserved_seconds": round(usage["reserved_seconds"], 2),
+        "summary_cache": cache_stats()
     }
 
 @app.post("/search/smart")
-async def smart_search(data: dict):
-    """AI-powered smart search με φιλτράρισμα"""
-    from db import fetch_news
-    from ai_search import filter_results_by_relevance, classify_query_with_ai
+def smart_search(data: dict):
+    """AI-powered smart search σε όλο το αρχείο (FTS5 index, ranked με bm25)"""
+    # Sync endpoint: η ανάλυση του query (LLM ή τοπικός classifier) τρέχει
+    # στο threadpool του FastAPI και δεν μπλοκάρει το event loop
+    from db import search_news
+    from ai_search import classify_query_with_ai
 
     query = data.get("query", "").strip()
     if not query:
@@ -254,18 +349,16 @@ async def smart_search(data: dict):
     # Ανάλυση query
     query_analysis = classify_query_with_ai(query)
 
-    # Fetch όλα τα νέα
-    all_news = fetch_news()
-
-    # Φιλτράρισμα με AI
-    filtered_news = filter_results_by_relevance(query, all_news)
+    # Full-text αναζήτηση με το query και τα keywords της ανάλυσης
+    terms = [query] + list(query_analysis.get("keywords", []))
+    found = search_news(terms, topics=query_analysis.get("topics", []), limit=50)
 
     return {
         "query": query,
         "analysis": query_analysis,
-        "total_results": len(all_news),
-        "filtered_results": len(filtered_news),
-        "results": filtered_news[:50]  # Top 50
+        "total_results": found["total"],
+        "filtered_results": len(found["results"]),
+        "results": found["results"]  # Top 50
     }
 
 @app.get("/search/status")
@@ -463,6 +556,21 @@ async def export_conversations_dataset(min_rating: int = None):
     except Exception as e:
         return {"error": str(e), "dataset": []}
 
+def _retrain_job(job) -> dict:
+    from local_classifier import train
+
+    job.report(0, 1, "Εκπαίδευση μοντέλων")
+    report = train()
+    return {"report": report, "message": "Η εκπαίδευση του τοπικού classifier ολοκληρώθηκε."}
+
+@app.post("/classifier/retrain")
+async def retrain_classifier():
+    """Επανεκπαίδευση του τοπικού topic/relevance classifier από τη βάση, ως background job"""
+    from jobs import submit_job
+
+    job, created = submit_job("classifier_retrain", _retrain_job, description="Local classifier retrain")
+    return _job_response(job, created, "Η εκπαίδευση του classifier ξεκίνησε.")
+
 if __name__ == "__main__":
     import uvicorn
     print("=" * 60)
@@ -470,6 +578,6 @@ if __name__ == "__main__":
     print("=" * 60)
     print("Server: http://localhost:8000")
     print("Frontend: Open frontend/index.html in browser")
-    print("Scheduler: Active (08:00 & 20:00)")
+    print("Scheduler: Active (adaptive polling ανά πηγή)")
     print("\nPress CTRL+C to stop\n")
     uvicorn.run(app, host="0.0.0.0", port=8000)
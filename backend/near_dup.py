@@ -0,0 +1,89 @@
+"""
+Near-duplicate ανίχνευση άρθρων με SimHash
+
+Το ίδιο δελτίο τύπου αναδημοσιεύεται από πολλά portals με μικρές αλλαγές.
+Κάθε άρθρο παίρνει ένα 64-bit SimHash πάνω σε shingles του κανονικοποιημένου
+τίτλου και περιεχομένου. Για γρήγορη αναζήτηση το fingerprint σπάει σε
+NEAR_DUP_BANDS κομμάτια (LSH banding): δύο fingerprints με απόσταση Hamming
+μικρότερη από το πλήθος των bands έχουν σίγουρα τουλάχιστον ένα κοινό band.
+"""
+
+import os
+import hashlib
+from utils import normalize_text
+
+SIMHASH_BITS = 64
+NEAR_DUP_BANDS = 4
+BAND_BITS = SIMHASH_BITS // NEAR_DUP_BANDS
+# Μέγιστη απόσταση Hamming για να θεωρηθούν δύο άρθρα ίδια ιστορία
+NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "3"))
+# Κάτω από τόσες λέξεις το fingerprint δεν είναι αξιόπιστο
+MIN_TOKENS = 8
+SHINGLE_SIZE = 3
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+def compute_simhash(title: str, content: str = ""):
+    """
+    Υπολογίζει SimHash για τίτλο + περιεχόμενο
+
+    Returns:
+        64-bit int, ή None αν το κείμενο είναι πολύ μικρό για αξιόπιστη σύγκριση
+    """
+    tokens = normalize_text(f"{title or ''} {content or ''}").split()
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for i in range(len(tokens) - SHINGLE_SIZE + 1):
+        h = _hash64(" ".join(tokens[i:i + SHINGLE_SIZE]))
+        for bit in range(SIMHASH_BITS):
+            if h >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def simhash_bands(fingerprint: int) -> list:
+    """Τα NEAR_DUP_BANDS κομμάτια του fingerprint (keys για το LSH index)"""
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (i * BAND_BITS)) & mask for i in range(NEAR_DUP_BANDS)]
+
+def to_signed(fingerprint: int) -> int:
+    """Το SQLite INTEGER είναι signed 64-bit"""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+def from_signed(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+class SimHashIndex:
+    """In-memory LSH index για τα άρθρα ενός run που δεν έχουν αποθηκευτεί ακόμα"""
+
+    def __init__(self, max_distance: int = NEAR_DUP_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._buckets = {}
+        self._fingerprints = {}
+
+    def add(self, key, fingerprint: int):
+        self._fingerprints[key] = fingerprint
+        for band, value in enumerate(simhash_bands(fingerprint)):
+            self._buckets.setdefault((band, value), []).append(key)
+
+    def find(self, fingerprint: int):
+        """Επιστρέφει το key του πλησιέστερου near-duplicate ή None"""
+        best, best_distance = None, self.max_distance + 1
+        for band, value in enumerate(simhash_bands(fingerprint)):
+            for key in self._buckets.get((band, value), ()):
+                distance = hamming_distance(fingerprint, self._fingerprints[key])
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        return best
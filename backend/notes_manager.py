@@ -2,16 +2,21 @@
 Notes Manager - Σημειωματάριο με κατηγορίες και tags
 """
 
-import sqlite3
 from datetime import datetime
 import os
+from db import get_connection
 
 # Database path
 NOTES_DB = os.path.join(os.path.dirname(__file__), "..", "data", "notes.db")
 
+_notes_table_ready = False
+
 def init_notes_table():
-    """Δημιουργία πίνακα notes αν δεν υπάρχει"""
-    conn = sqlite3.connect(NOTES_DB)
+    """Δημιουργία πίνακα notes αν δεν υπάρχει (μία φορά ανά process)"""
+    global _notes_table_ready
+    if _notes_table_ready:
+        return
+    conn = get_connection(NOTES_DB)
     cur = conn.cursor()
 
     # Notes table
@@ -29,7 +34,7 @@ def init_notes_table():
     """)
 
     conn.commit()
-    conn.close()
+    _notes_table_ready = True
 
 def add_note(title: str, content: str = "", category: str = "", tags: list = None) -> dict:
     """
@@ -49,7 +54,7 @@ def add_note(title: str, content: str = "", category: str = "", tags: list = Non
 
     try:
         init_notes_table()
-        conn = sqlite3.connect(NOTES_DB)
+        conn = get_connection(NOTES_DB)
         cur = conn.cursor()
 
         now = datetime.now().isoformat()
@@ -62,7 +67,6 @@ def add_note(title: str, content: str = "", category: str = "", tags: list = Non
 
         note_id = cur.lastrowid
         conn.commit()
-        conn.close()
 
         return {
             "id": note_id,
@@ -91,7 +95,7 @@ def get_all_notes(category: str = None, tag: str = None, pinned_only: bool = Fal
     """
     try:
         init_notes_table()
-        conn = sqlite3.connect(NOTES_DB)
+        conn = get_connection(NOTES_DB)
         cur = conn.cursor()
 
         query = "SELECT id, title, content, category, tags, created_at, updated_at, pinned FROM notes WHERE 1=1"
@@ -112,7 +116,6 @@ def get_all_notes(category: str = None, tag: str = None, pinned_only: bool = Fal
 
         cur.execute(query, params)
         rows = cur.fetchall()
-        conn.close()
 
         notes = []
         for row in rows:
@@ -136,13 +139,12 @@ def update_note(note_id: int, title: str = None, content: str = None,
                 category: str = None, tags: list = None) -> dict:
     """Ενημέρωση υπάρχουσας σημείωσης"""
     try:
-        conn = sqlite3.connect(NOTES_DB)
+        conn = get_connection(NOTES_DB)
         cur = conn.cursor()
 
         # Έλεγχος αν υπάρχει
         cur.execute("SELECT id FROM notes WHERE id = ?", (note_id,))
         if not cur.fetchone():
-            conn.close()
             return {"error": "Η σημείωση δεν βρέθηκε"}
 
         updates = []
@@ -173,7 +175,6 @@ def update_note(note_id: int, title: str = None, content: str = None,
             cur.execute(query, params)
             conn.commit()
 
-        conn.close()
         return {"success": True, "id": note_id}
     except Exception as e:
         return {"error": f"Σφάλμα κατά την ενημέρωση: {str(e)}"}
@@ -181,17 +182,15 @@ def update_note(note_id: int, title: str = None, content: str = None,
 def delete_note(note_id: int) -> dict:
     """Διαγραφή σημείωσης"""
     try:
-        conn = sqlite3.connect(NOTES_DB)
+        conn = get_connection(NOTES_DB)
         cur = conn.cursor()
 
         cur.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        conn.commit()
 
         if cur.rowcount == 0:
-            conn.close()
             return {"error": "Η σημείωση δεν βρέθηκε"}
 
-        conn.commit()
-        conn.close()
         return {"success": True, "id": note_id}
     except Exception as e:
         return {"error": f"Σφάλμα κατά τη διαγραφή: {str(e)}"}
@@ -199,20 +198,18 @@ def delete_note(note_id: int) -> dict:
 def toggle_pin(note_id: int) -> dict:
     """Toggle pin status"""
     try:
-        conn = sqlite3.connect(NOTES_DB)
+        conn = get_connection(NOTES_DB)
         cur = conn.cursor()
 
         cur.execute("SELECT pinned FROM notes WHERE id = ?", (note_id,))
         row = cur.fetchone()
 
         if not row:
-            conn.close()
             return {"error": "Η σημείωση δεν βρέθηκε"}
 
         new_pinned = 0 if row[0] else 1
         cur.execute("UPDATE notes SET pinned = ? WHERE id = ?", (new_pinned, note_id))
         conn.commit()
-        conn.close()
 
         return {"success": True, "id": note_id, "pinned": bool(new_pinned)}
     except Exception as e:
@@ -221,11 +218,10 @@ def toggle_pin(note_id: int) -> dict:
 def get_categories() -> list:
     """Επιστρέφει όλες τις μοναδικές κατηγορίες"""
     try:
-        conn = sqlite3.connect(NOTES_DB)
+        conn = get_connection(NOTES_DB)
         cur = conn.cursor()
         cur.execute("SELECT DISTINCT category FROM notes WHERE category != '' ORDER BY category")
         categories = [row[0] for row in cur.fetchall()]
-        conn.close()
         return categories
     except Exception:
         return []
@@ -233,14 +229,13 @@ def get_categories() -> list:
 def get_all_tags() -> list:
     """Επιστρέφει όλα τα μοναδικά tags"""
     try:
-        conn = sqlite3.connect(NOTES_DB)
+        conn = get_connection(NOTES_DB)
         cur = conn.cursor()
         cur.execute("SELECT tags FROM notes WHERE tags != ''")
         all_tags = set()
         for row in cur.fetchall():
             if row[0]:
                 all_tags.update(row[0].split(","))
-        conn.close()
         return sorted(list(all_tags))
     except Exception:
         return []
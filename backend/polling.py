@@ -0,0 +1,125 @@
+"""
+Adaptive polling ανά πηγή
+
+Κάθε πηγή έχει δικό της ρυθμό δημοσίευσης (EWMA των νέων άρθρων ανά ώρα
+από τα προηγούμενα polls) και δικό της next_poll_at: μια πηγή που βγάζει
+πολλά άρθρα ελέγχεται συχνά, μια νεκρή πηγή σπάνια, πάντα μέσα στα όρια
+POLL_MIN_INTERVAL_MINUTES / POLL_MAX_INTERVAL_HOURS. Ο scheduler καλεί το
+poll_due_sources κάθε POLL_TICK_SECONDS: οι πηγές μπαίνουν σε heap με
+κλειδί το next_poll_at και όσες έχουν λήξει γίνονται ένα scraping job.
+Ένα μικρό jitter στο interval απλώνει τα polls μέσα στη μέρα αντί για
+δύο κορυφές φόρτου.
+"""
+
+import os
+import heapq
+import random
+from db import get_connection, SOURCES_DB, NEWS_DB
+from utils import now_epoch
+
+POLL_MIN_INTERVAL_MINUTES = float(os.getenv("POLL_MIN_INTERVAL_MINUTES", "15"))
+POLL_MAX_INTERVAL_HOURS = float(os.getenv("POLL_MAX_INTERVAL_HOURS", "24"))
+POLL_TICK_SECONDS = int(os.getenv("POLL_TICK_SECONDS", "60"))
+# Interval μέχρι να υπάρξει πρώτη μέτρηση ρυθμού για μια νέα πηγή
+POLL_INITIAL_INTERVAL_HOURS = float(os.getenv("POLL_INITIAL_INTERVAL_HOURS", "1"))
+# Στόχος: περίπου τόσα νέα άρθρα ανά poll
+POLL_TARGET_NEW_ITEMS = float(os.getenv("POLL_TARGET_NEW_ITEMS", "2"))
+# Βάρος της τελευταίας μέτρησης στο EWMA του ρυθμού
+POLL_RATE_ALPHA = 0.3
+POLL_JITTER = 0.1
+# Παράθυρο ιστορικού για την αρχική εκτίμηση ρυθμού μιας πηγής
+POLL_HISTORY_DAYS = 7
+
+def poll_interval(rate_per_hour: float) -> float:
+    """
+    Δευτερόλεπτα μέχρι το επόμενο poll για δεδομένο ρυθμό δημοσίευσης
+
+    Args:
+        rate_per_hour: Εκτιμώμενα νέα άρθρα ανά ώρα (EWMA)
+    """
+    low, high = POLL_MIN_INTERVAL_MINUTES * 60, POLL_MAX_INTERVAL_HOURS * 3600
+    if rate_per_hour <= 0:
+        return high
+    return min(high, max(low, POLL_TARGET_NEW_ITEMS / rate_per_hour * 3600))
+
+def _history_rate(url: str, now: int) -> float:
+    """Άρθρα ανά ώρα της πηγής τις τελευταίες POLL_HISTORY_DAYS ημέρες (από το news)"""
+    since = now - POLL_HISTORY_DAYS * 86400
+    try:
+        row = get_connection(NEWS_DB).execute(
+            "SELECT COUNT(*) FROM news WHERE source=? AND published_ts >= ?", (url, since)).fetchone()
+    except Exception:
+        return 0.0
+    return row[0] / (POLL_HISTORY_DAYS * 24)
+
+def record_poll(url: str, new_items: int, now: int = None):
+    """
+    Ενημέρωση ρυθμού και next_poll_at μιας πηγής μετά από ένα poll
+
+    Args:
+        url: Η πηγή
+        new_items: Πόσα άρθρα που δεν υπήρχαν στη βάση βρέθηκαν
+    """
+    now = now or now_epoch()
+    conn = get_connection(SOURCES_DB)
+    row = conn.execute("SELECT last_poll_at, rate_ewma FROM sources WHERE url=?", (url,)).fetchone()
+    if row is None:
+        return
+    last_poll_at, rate = row
+
+    if last_poll_at and now > last_poll_at:
+        # Ελάχιστο διάστημα αναφοράς: ένα χειροκίνητο scraping λίγα δευτερόλεπτα
+        # μετά από ένα poll θα έδινε αλλιώς ρυθμό χιλιάδων άρθρων ανά ώρα
+        elapsed = max(now - last_poll_at, POLL_MIN_INTERVAL_MINUTES * 60)
+        observed = new_items / (elapsed / 3600)
+        if rate is None:
+            rate = _history_rate(url, now) or observed
+        rate = POLL_RATE_ALPHA * observed + (1 - POLL_RATE_ALPHA) * rate
+    elif rate is None:
+        # Πρώτο poll: χωρίς διάστημα αναφοράς, εκτίμηση από το ιστορικό της πηγής
+        rate = _history_rate(url, now) or None
+
+    interval = poll_interval(rate) if rate is not None else POLL_INITIAL_INTERVAL_HOURS * 3600
+    interval *= random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+    with conn:
+        conn.execute("""
+            UPDATE sources SET last_poll_at = ?, rate_ewma = ?, poll_interval = ?, next_poll_at = ?
+            WHERE url = ?
+        """, (now, rate, round(interval), now + round(interval), url))
+
+def due_sources(now: int = None) -> list:
+    """
+    Οι πηγές που πρέπει να ελεγχθούν τώρα, με τη σειρά του next_poll_at
+
+    Returns:
+        List από (url, type). Πηγές χωρίς next_poll_at (νέες) είναι πάντα due,
+        πηγές με ανοιχτό circuit (source_health.py) όχι πριν από το open_until.
+    """
+    now = now or now_epoch()
+    rows = get_connection(SOURCES_DB).execute("SELECT next_poll_at, open_until, url, type FROM sources").fetchall()
+    heap = [(max(next_poll_at or 0, open_until or 0), url, typ or "unknown")
+            for next_poll_at, open_until, url, typ in rows]
+    heapq.heapify(heap)
+    due = []
+    while heap and heap[0][0] <= now:
+        _, url, typ = heapq.heappop(heap)
+        due.append((url, typ))
+    return due
+
+def poll_due_sources():
+    """Scheduler tick: ένα scraping job για όσες πηγές έχουν λήξει"""
+    from jobs import submit_job
+    from scraper import scrape_job
+
+    due = due_sources()
+    if not due:
+        return None
+    # Ίδιο (kind, key) με το /scrape/manual: δύο scraping jobs μαζί θα έβλεπαν
+    # τα ίδια νέα URLs (filter_new_urls πριν από το ingest) και θα τα έστελναν
+    # δύο φορές για summarization. Αν τρέχει ήδη scraping, οι πηγές μένουν
+    # due για το επόμενο tick.
+    job, created = submit_job("scrape", scrape_job, due,
+                              description=f"Adaptive polling: {len(due)} πηγές")
+    if created:
+        print(f"[INFO] Adaptive polling: {len(due)} πηγές (job {job.id})")
+    return job
@@ -1,15 +1,46 @@
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from scraper import run_scraping
+from leader import LeaderElector
+from polling import poll_due_sources, POLL_TICK_SECONDS
 
 _scheduler = None
+_elector = None
 
-def start_scheduler():
+def _start_jobs():
+    """Καλείται μόνο στο process που κρατάει το lease του scheduler"""
     global _scheduler
     if _scheduler:
         return
     _scheduler = BackgroundScheduler()
-    # Run twice daily (08:00 and 20:00)
-    _scheduler.add_job(run_scraping, "cron", hour="8,20", id="scraper_job")
+    # Adaptive polling: κάθε tick γίνεται scraping μόνο των πηγών που έχουν λήξει
+    # (βλ. polling.py), αντί για όλες τις πηγές στις 08:00 και 20:00
+    _scheduler.add_job(poll_due_sources, "interval", seconds=POLL_TICK_SECONDS, id="poll_job",
+                       max_instances=1, coalesce=True)
     _scheduler.start()
-    print("Scheduler activated (08:00 & 20:00).")
+    print(f"Scheduler activated (adaptive polling, tick {POLL_TICK_SECONDS}s).")
+
+def _stop_jobs():
+    global _scheduler
+    if _scheduler:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+        print("Scheduler stopped.")
+
+def start_scheduler():
+    """
+    Με πολλά worker processes μόνο ένα τρέχει τον scheduler: αυτό που
+    κρατάει το lease "scheduler" (βλ. leader.py). Αν πεθάνει, κάποιο από
+    τα υπόλοιπα τον αναλαμβάνει όταν λήξει το lease.
+    """
+    global _elector
+    if _elector:
+        return
+    _elector = LeaderElector("scheduler", on_elected=_start_jobs, on_demoted=_stop_jobs)
+    _elector.start()
+
+def stop_scheduler():
+    """Shutdown: σταματάει τον scheduler και αφήνει το lease στους άλλους workers"""
+    global _elector
+    if _elector:
+        _elector.stop()
+        _elector = None
@@ -1,37 +1,62 @@
 
 import os
-import sqlite3
+import time
+import calendar
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 import feedparser, requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import save_news_if_new, SOURCES_DB
-from ai_summarizer import summarize_article
+from db import ingest_news, filter_new_urls, find_near_duplicate, get_connection, SOURCES_DB
+from ai_summarizer import summarize_articles, SUMMARY_BATCH_SIZE
+from sources_manager import get_source_state, update_source_state, mark_source_checked
+from utils import canonicalize_url, parse_date_to_epoch
+from near_dup import compute_simhash, SimHashIndex
+from polling import record_poll
+from source_health import record_success, record_failure, open_circuits
+from watermark import load_watermark, save_watermark, select_entries
+from keyword_matcher import TOPIC_MATCHER
 
 load_dotenv()
 
 # Configuration: Fetch article content or use snippets only
 FETCH_ARTICLE_CONTENT = os.getenv("FETCH_ARTICLE_CONTENT", "true").lower() == "true"
-
-TOPIC_KEYWORDS = {
-    "Φωτοβολταϊκά": ["φωτοβολταϊκά", "net metering", "net billing", "αυτοπαραγωγή"],
-    "Μπαταρίες": ["μπαταρία", "αποθήκευση", "storage"],
-    "Αντλίες": ["αντλία θερμότητας","θέρμανση","θερμότητα"],
-    "Νομοθεσία": ["φεκ","νόμος","κανονισμός","απόφαση"],
-    "Επιδοτήσεις": ["επιχορήγηση","πρόγραμμα","επιδοτηση","εσπα"],
-    "Smart_Σπίτια": ["smart","iot","έξυπνο σπίτι","αισθητήρες"],
-}
+# Αν το feed έχει ήδη τόσους χαρακτήρες κειμένου (content:encoded ή summary),
+# δεν κατεβαίνει η σελίδα του άρθρου
+EMBEDDED_CONTENT_MIN_CHARS = int(os.getenv("EMBEDDED_CONTENT_MIN_CHARS", "600"))
+ARTICLE_MAX_CHARS = 2000
+# Links ανά fetch μιας HTML πηγής (σταθερό όριο, βλ. fetch_html)
+HTML_MAX_LINKS = 20
+
+# Concurrency limits ανά στάδιο του scraping pipeline
+SCRAPE_FEED_WORKERS = int(os.getenv("SCRAPE_FEED_WORKERS", "16"))
+SCRAPE_ARTICLE_WORKERS = int(os.getenv("SCRAPE_ARTICLE_WORKERS", "16"))
+SCRAPE_SUMMARY_WORKERS = int(os.getenv("SCRAPE_SUMMARY_WORKERS", "4"))
+# Timeout (δευτερόλεπτα) για τη λήψη μιας πηγής
+SOURCE_FETCH_TIMEOUT = float(os.getenv("SOURCE_FETCH_TIMEOUT", "10"))
+# Πόσα άρθρα γράφονται στη βάση ανά transaction
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
 
 def guess_topic(title: str) -> str:
-    t = (title or "").lower()
-    for topic, kws in TOPIC_KEYWORDS.items():
-        for kw in kws:
-            if kw in t:
-                return topic
-    return ""
-
-def fetch_article_content(url: str, max_chars: int = 2000) -> str:
+    return TOPIC_MATCHER.first(title)
+
+def clean_text(text: str) -> str:
+    """Αφαίρεση extra whitespace (κενές γραμμές, πολλαπλά κενά)"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines
+             for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+def html_to_text(html: str) -> str:
+    """Κείμενο από HTML fragment (π.χ. content:encoded ενός feed)"""
+    if "<" not in html:
+        return clean_text(html)
+    return clean_text(BeautifulSoup(html, "html.parser").get_text("\n"))
+
+def fetch_article_content(url: str, max_chars: int = ARTICLE_MAX_CHARS) -> str:
     """
     Fetch το πραγματικό περιεχόμενο του άρθρου από το URL
 
@@ -69,13 +94,7 @@ def fetch_article_content(url: str, max_chars: int = 2000) -> str:
             return ""
 
         # Πάρε το κείμενο
-        text = main_content.get_text()
-
-        # Καθαρισμός: αφαίρεση extra whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines
-                 for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+        text = clean_text(main_content.get_text())
 
         # Κράτα τους πρώτους max_chars χαρακτήρες
         return text[:max_chars]
@@ -84,129 +103,436 @@ def fetch_article_content(url: str, max_chars: int = 2000) -> str:
         return ""
 
 def iter_sources():
-    conn = sqlite3.connect(SOURCES_DB)
-    cur = conn.cursor()
+    cur = get_connection(SOURCES_DB).cursor()
     cur.execute("SELECT url,type FROM sources")
     rows = cur.fetchall()
-    conn.close()
     for url, typ in rows:
         yield url, (typ or "unknown")
 
+def conditional_get(url: str, timeout: float = None, force: bool = False):
+    """
+    HTTP GET με If-None-Match / If-Modified-Since βάσει της τελευταίας λήψης
+
+    Οι νέοι validators δεν αποθηκεύονται εδώ: επιστρέφονται μαζί με το
+    response και ο caller τους αποθηκεύει (update_source_state) αφού γραφτούν
+    στη βάση τα άρθρα της λήψης.
+
+    Args:
+        force: Λήψη και επεξεργασία ακόμα κι αν η πηγή δεν άλλαξε (π.χ. όταν
+               έχουν μείνει entries από προηγούμενο fetch, βλ. watermark.py)
+
+    Returns:
+        (response, validators) με validators dict από etag, last_modified και
+        content_hash, ή (None, None) αν η πηγή δεν άλλαξε (304 ή ίδιο content hash)
+    """
+    state = {} if force else get_source_state(url)
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    r = requests.get(url, timeout=timeout or SOURCE_FETCH_TIMEOUT, headers=headers)
+    if r.status_code == 304:
+        mark_source_checked(url)
+        print(f"[INFO] Αμετάβλητη πηγή (304): {url}")
+        return None, None
+    r.raise_for_status()
+
+    validators = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "content_hash": hashlib.sha256(r.content).hexdigest(),
+    }
+    if validators["content_hash"] == state.get("content_hash"):
+        # Ίδιο σώμα με την τελευταία ολοκληρωμένη λήψη: οι νέοι validators
+        # μπορούν να αποθηκευτούν αμέσως
+        update_source_state(url, **validators)
+        print(f"[INFO] Αμετάβλητη πηγή (ίδιο περιεχόμενο): {url}")
+        return None, None
+    return r, validators
+
+def entry_content(e) -> str:
+    """
+    Το πλήρες κείμενο που έχει ήδη ένα feed entry: content:encoded (Atom
+    content) αν υπάρχει, αλλιώς summary/description. Κρατάμε το μεγαλύτερο,
+    γιατί πολλά feeds βάζουν στο summary μόνο μια περίληψη.
+    """
+    candidates = [c.get("value", "") for c in e.get("content", []) or []]
+    candidates.append(e.get("summary", "") or "")
+    texts = [html_to_text(c) for c in candidates if c and c.strip()]
+    return max(texts, key=len, default="")
+
+def _entry_guid(e) -> str:
+    return (e.get("id") or e.get("link") or "").strip()
+
+def _entry_published(e):
+    parsed = e.get("published_parsed") or e.get("updated_parsed")
+    return calendar.timegm(parsed) if parsed else None
+
+def _source_state(validators: dict, selected: list, truncated: bool) -> dict:
+    """
+    Ό,τι αποθηκεύεται για την πηγή αφού γραφτούν τα άρθρα της: validators
+    (βλ. conditional_get) και watermark (βλ. watermark.save_watermark)
+
+    Args:
+        selected: List από (entry, guid, published_ts) όλων των entries που
+                  διαβάστηκαν, και όσων απορρίφθηκαν (π.χ. χωρίς τίτλο), ώστε
+                  να μη μετράνε ξανά στο όριο του επόμενου poll
+    """
+    return {
+        "validators": validators,
+        "guids": [guid for _, guid, _ in selected if guid],
+        "newest_ts": max((ts for _, _, ts in selected if ts), default=None),
+        "backlog": truncated,
+    }
+
 def fetch_rss(url):
-    try:
-        feed = feedparser.parse(url)
-        items = []
-        for e in feed.entries[:20]:
-            title = e.get("title", "").strip()
-            link = e.get("link", "").strip()
-            if not title or not link:
-                continue
-            date = e.get("published", "") or e.get("updated", "") or datetime.now().isoformat(timespec="seconds")
-            items.append({"title": title, "url": link, "date": date})
-        return items
-    except Exception as e:
-        print(f"[ERROR] Σφάλμα RSS fetch από {url}: {e}")
-        return []
+    """
+    Returns:
+        (items, state) με state το αποτέλεσμα του _source_state, ή None αν η
+        πηγή δεν άλλαξε
+    """
+    watermark = load_watermark(url)
+    r, validators = conditional_get(url, force=watermark.get("backlog", False))
+    if r is None:
+        return [], None
+    feed = feedparser.parse(r.content, response_headers={
+        "content-location": url,
+        "content-type": r.headers.get("Content-Type", ""),
+    })
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"Μη έγκυρο feed: {feed.get('bozo_exception')}")
+    items = []
+    # Μόνο τα entries μετά το watermark της πηγής (βλ. watermark.py)
+    selected, truncated = select_entries(feed.entries, _entry_guid, _entry_published, watermark, url)
+    for e, guid, published_ts in selected:
+        title = e.get("title", "").strip()
+        link = e.get("link", "").strip()
+        if not title or not link:
+            continue
+        date = e.get("published", "") or e.get("updated", "") or datetime.now().isoformat(timespec="seconds")
+        items.append({"title": title, "url": link, "date": date, "content": entry_content(e),
+                      "guid": guid, "published_ts": published_ts})
+    return items, _source_state(validators, selected, truncated)
 
 def fetch_html(url):
     items = []
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        for a in soup.select("a"):
-            title = (a.get_text() or "").strip()
-            href = a.get("href") or ""
-            if not title or not href or len(title) < 8:
-                continue
-            if href.startswith("/"):
-                from urllib.parse import urljoin
-                href = urljoin(url, href)
-            items.append({"title": title, "url": href, "date": datetime.now().isoformat(timespec="seconds")})
-            if len(items) >= 20:
-                break
-    except Exception:
-        pass
-    return items
+    # Τα links μιας σελίδας δεν έχουν σειρά ούτε ημερομηνίες: χωρίς watermark
+    # και backlog, μόνο τα πρώτα HTML_MAX_LINKS (αλλιώς κάθε poll θα έφερνε
+    # σταδιακά όλα τα links πλοήγησης και κατηγοριών ως "νέα" άρθρα)
+    r, validators = conditional_get(url)
+    if r is None:
+        return items, None
+    soup = BeautifulSoup(r.text, "html.parser")
+    for a in soup.select("a"):
+        title = (a.get_text() or "").strip()
+        href = a.get("href") or ""
+        if not title or not href or len(title) < 8:
+            continue
+        if href.startswith("/"):
+            from urllib.parse import urljoin
+            href = urljoin(url, href)
+        items.append({"title": title, "url": href, "date": datetime.now().isoformat(timespec="seconds")})
+        if len(items) >= HTML_MAX_LINKS:
+            break
+    return items, _source_state(validators, [], False)
 
 def fetch_api(url):
     items = []
+    watermark = load_watermark(url)
+    r, validators = conditional_get(url, force=watermark.get("backlog", False))
+    if r is None:
+        return items, None
+    data = r.json()
+    if isinstance(data, list):
+        seq = data
+    elif isinstance(data, dict):
+        seq = data.get("results") or data.get("data") or []
+        if isinstance(seq, dict):
+            seq = [seq]
+    else:
+        seq = []
+    seq = [obj for obj in seq if isinstance(obj, dict)]
+    guid = lambda obj: str(obj.get("id") or obj.get("url") or obj.get("link") or "")
+    published = lambda obj: parse_date_to_epoch(obj.get("date") or obj.get("updated_at") or obj.get("published_at"))
+    selected, truncated = select_entries(seq, guid, published, watermark, url)
+    for obj, obj_guid, published_ts in selected:
+        title = str(obj.get("title") or obj.get("name") or obj.get("subject") or "")[:200]
+        link = obj.get("url") or obj.get("link") or ""
+        date = obj.get("date") or obj.get("updated_at") or obj.get("published_at") or datetime.now().isoformat(timespec="seconds")
+        body = obj.get("content") or obj.get("body") or obj.get("description") or ""
+        if title:
+            items.append({"title": title, "url": link, "date": date,
+                          "content": html_to_text(body) if isinstance(body, str) else "",
+                          "guid": obj_guid, "published_ts": published_ts})
+    return items, _source_state(validators, selected, truncated)
+
+def fetch_source(url: str, typ: str) -> tuple:
+    """
+    Επιλογή fetcher ανάλογα με τον τύπο της πηγής. Επιστρέφει (items, state)
+
+    Τα σφάλματα (timeout, HTTP, μη έγκυρο feed/JSON) περνάνε στον caller,
+    ώστε να μετρηθούν από τον circuit breaker (βλ. _fetch_feed).
+    """
+    if "rss" in typ.lower():
+        return fetch_rss(url)
+    if "api" in typ.lower():
+        return fetch_api(url)
+    return fetch_html(url)
+
+def _fetch_feed(url: str, typ: str) -> tuple:
+    """Stage 1: fetch πηγής με καταγραφή latency/σφαλμάτων (τρέχει στο feed pool)"""
+    start = time.time()
     try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        if isinstance(data, list):
-            seq = data[:20]
-        elif isinstance(data, dict):
-            seq = data.get("results") or data.get("data") or []
-            if isinstance(seq, dict):
-                seq = [seq]
-            seq = seq[:20]
-        else:
-            seq = []
-        for obj in seq:
-            title = str(obj.get("title") or obj.get("name") or obj.get("subject") or "")[:200]
-            link = obj.get("url") or obj.get("link") or ""
-            date = obj.get("date") or obj.get("updated_at") or obj.get("published_at") or datetime.now().isoformat(timespec="seconds")
-            if title:
-                items.append({"title": title, "url": link, "date": date})
-    except Exception:
-        pass
-    return items
-
-def run_scraping():
+        result = fetch_source(url, typ)
+    except Exception as e:
+        record_failure(url, f"{type(e).__name__}: {e}", time.time() - start)
+        raise
+    record_success(url, time.time() - start)
+    return result
+
+def _fetch_item_content(it: dict) -> str:
+    """
+    Stage 2: fetch περιεχομένου άρθρου (τρέχει στο article pool)
+
+    Αν το feed έχει ήδη τουλάχιστον EMBEDDED_CONTENT_MIN_CHARS χαρακτήρες
+    κειμένου, χρησιμοποιούνται αυτοί χωρίς HTTP request και parsing της
+    σελίδας. Το μικρότερο embedded κείμενο μένει ως fallback αν αποτύχει
+    (ή είναι απενεργοποιημένο) το fetch της σελίδας.
+    """
+    embedded = (it.get("content") or "")[:ARTICLE_MAX_CHARS]
+    article_url = it.get("url", "")
+    if len(embedded) >= EMBEDDED_CONTENT_MIN_CHARS or not FETCH_ARTICLE_CONTENT or not article_url:
+        return embedded
+    article_content = fetch_article_content(article_url)
+    print(f"[INFO] Fetched {len(article_content)} chars από {article_url[:50]}...")
+    return article_content if len(article_content) > len(embedded) else embedded
+
+def run_scraping(job=None, sources: list = None):
+    """
+    Scraping όλων των πηγών με bounded concurrency.
+
+    Το pipeline έχει τρία στάδια, το καθένα με δικό του thread pool:
+    feed fetch (SCRAPE_FEED_WORKERS), article fetch (SCRAPE_ARTICLE_WORKERS)
+    και AI summarization (SCRAPE_SUMMARY_WORKERS). Το main thread μόνο
+    μοιράζει δουλειά και γράφει στη βάση, ώστε να υπάρχει ένας writer.
+
+    Οι περιλήψεις ζητούνται σε batches πολλών άρθρων ανά κλήση (βλ.
+    ai_summarizer.summarize_articles). Αναδημοσιεύσεις του ίδιου άρθρου
+    (near-duplicates, βλ. near_dup.py) δεν περνάνε από AI summarization:
+    παίρνουν την περίληψη του canonical άρθρου.
+
+    Οι validators (ETag/Last-Modified/hash) και το watermark μιας πηγής
+    αποθηκεύονται μόνο όταν έχουν γραφτεί στη βάση όλα τα άρθρα της. Μετά από
+    ακύρωση ή αποτυχία αποθήκευσης η πηγή ξαναδιαβάζεται ολόκληρη στο επόμενο
+    poll (το filter_new_urls κρατάει εκτός όσα πρόλαβαν να αποθηκευτούν).
+
+    Κάθε πηγή που ελέγχεται καταγράφει πόσα νέα άρθρα βρέθηκαν, ώστε το
+    adaptive polling (polling.py) να υπολογίσει το επόμενο poll της, και
+    latency/σφάλματα για τον circuit breaker (source_health.py). Πηγές με
+    ανοιχτό circuit παραλείπονται.
+
+    Args:
+        job: Προαιρετικό jobs.Job για progress (πηγές που ολοκληρώθηκαν) και
+             ακύρωση (ό,τι έχει ήδη συλλεχθεί αποθηκεύεται)
+        sources: List από (url, type) για scraping μόνο αυτών (default όλες)
+
+    Returns:
+        Πλήθος νέων άρθρων που αποθηκεύτηκαν
+    """
     print("[INFO] Έναρξη scraping...")
     total_new = 0
+    # Τα άρθρα γράφονται στη βάση σε batches (ένα commit ανά INGEST_BATCH_SIZE)
+    to_ingest = []
+    # url πηγής -> άρθρα της που δεν έχουν φτάσει ακόμα στο save()
+    outstanding = Counter()
+    # Πηγές με άρθρα σε batch που απέτυχε να αποθηκευτεί
+    failed_sources = set()
+
+    def flush():
+        nonlocal total_new
+        if not to_ingest:
+            return
+        try:
+            total_new += len(ingest_news(to_ingest))
+        except Exception as e:
+            print(f"[WARNING] Σφάλμα κατά την αποθήκευση άρθρων: {e}")
+            failed_sources.update(item["source"] for item in to_ingest)
+        to_ingest.clear()
+
+    def save(item):
+        outstanding[item["source"]] -= 1
+        to_ingest.append(item)
+        if len(to_ingest) >= INGEST_BATCH_SIZE:
+            flush()
+
     try:
-        for url, typ in iter_sources():
-            try:
-                if "rss" in typ.lower():
-                    items = fetch_rss(url)
-                elif "api" in typ.lower():
-                    items = fetch_api(url)
-                else:
-                    items = fetch_html(url)
-
-                for it in items:
-                    try:
-                        title = it.get("title","")
-                        article_url = it.get("url","")
-                        if not title:
+        with ThreadPoolExecutor(SCRAPE_FEED_WORKERS, thread_name_prefix="feed") as feed_pool, \
+             ThreadPoolExecutor(SCRAPE_ARTICLE_WORKERS, thread_name_prefix="article") as article_pool, \
+             ThreadPoolExecutor(SCRAPE_SUMMARY_WORKERS, thread_name_prefix="summary") as summary_pool:
+
+            # future -> (stage, context)
+            pending = {}
+            # URLs που έχουν ήδη μπει στο pipeline σε αυτό το run (από οποιαδήποτε πηγή)
+            seen_urls = set()
+            # Canonical άρθρα αυτού του run που δεν έχουν αποθηκευτεί ακόμα
+            run_index = SimHashIndex()
+            run_originals = {}
+            duplicates = []
+            # Άρθρα που περιμένουν AI summary (στέλνονται ανά SUMMARY_BATCH_SIZE)
+            to_summarize = []
+            # url πηγής -> state (validators και watermark, βλ. _source_state),
+            # αποθηκεύεται αφού γραφτούν τα άρθρα της πηγής
+            fetched = {}
+            # Πηγές με ανοιχτό circuit (συνεχόμενες αποτυχίες) παραλείπονται
+            circuits_open, skipped = open_circuits(), 0
+            for url, typ in (sources if sources is not None else iter_sources()):
+                if url in circuits_open:
+                    skipped += 1
+                    continue
+                pending[feed_pool.submit(_fetch_feed, url, typ)] = ("feed", url)
+            if skipped:
+                print(f"[INFO] Παραλείπονται {skipped} πηγές με ανοιχτό circuit")
+            total_feeds, feeds_done = len(pending), 0
+            if job:
+                job.report(0, total_feeds, "Λήψη πηγών")
+
+            while pending:
+                if job and job.cancelled:
+                    print("[INFO] Ακύρωση scraping, αποθηκεύονται όσα άρθρα έχουν ολοκληρωθεί")
+                    for fut in pending:
+                        fut.cancel()
+                    # Τα canonical τους μπορεί να μην έχουν αποθηκευτεί
+                    duplicates.clear()
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage, ctx = pending.pop(fut)
+
+                    if stage == "feed":
+                        feeds_done += 1
+                        if job:
+                            job.report(feeds_done, message=f"{feeds_done}/{total_feeds} πηγές")
+                        try:
+                            items, state = fut.result()
+                        except Exception as e:
+                            # Το πότε θα ξαναδοκιμαστεί η πηγή το αποφασίζει μόνο ο
+                            # circuit breaker (βλ. _fetch_feed), όχι το adaptive polling
+                            print(f"[WARNING] Σφάλμα κατά το scraping πηγής {ctx}: {e}")
                             continue
-
-                        topic = guess_topic(title)
-
-                        # Fetch το πραγματικό περιεχόμενο του άρθρου για καλύτερη AI ανάλυση
-                        # (αν είναι enabled στο .env)
-                        article_content = ""
-                        if FETCH_ARTICLE_CONTENT and article_url:
-                            article_content = fetch_article_content(article_url)
-                            print(f"[INFO] Fetched {len(article_content)} chars από {article_url[:50]}...")
-
-                        # AI summarization με το πραγματικό content (αν υπάρχει)
-                        summary = summarize_article(title, article_content) or ""
-                        item = {
-                            "title": title,
-                            "url": it.get("url",""),
-                            "date": it.get("date",""),
-                            "source": url,
-                            "topic": topic,
-                            "summary": summary
-                        }
-                        if save_news_if_new(item):
-                            total_new += 1
-                    except Exception as e:
-                        print(f"[WARNING] Σφάλμα κατά την αποθήκευση άρθρου: {e}")
-                        continue
-            except Exception as e:
-                print(f"[WARNING] Σφάλμα κατά το scraping πηγής {url}: {e}")
-                continue
+                        if state is not None:
+                            fetched[ctx] = state
+                        # Ένα batched lookup ανά πηγή, πριν από οποιοδήποτε HTTP/LLM κόστος
+                        for it in items:
+                            it["url"] = canonicalize_url(it.get("url", ""))
+                        new_urls = filter_new_urls([it["url"] for it in items]) - seen_urls
+                        try:
+                            record_poll(ctx, len(new_urls))
+                        except Exception as e:
+                            print(f"[WARNING] Αδυναμία ενημέρωσης polling για {ctx}: {e}")
+                        for it in items:
+                            title = it.get("title", "")
+                            if not title or it["url"] not in new_urls:
+                                continue
+                            new_urls.discard(it["url"])
+                            seen_urls.add(it["url"])
+                            item = {
+                                "title": title,
+                                "url": it["url"],
+                                "date": it.get("date", ""),
+                                "source": ctx,
+                                "topic": guess_topic(title),
+                                "summary": ""
+                            }
+                            outstanding[ctx] += 1
+                            pending[article_pool.submit(_fetch_item_content, it)] = ("content", item)
+
+                    elif stage == "content":
+                        try:
+                            article_content = fut.result()
+                        except Exception as e:
+                            print(f"[WARNING] Σφάλμα κατά το fetch άρθρου: {e}")
+                            article_content = ""
+
+                        ctx["content"] = article_content
+                        fingerprint = compute_simhash(ctx["title"], article_content)
+                        ctx["simhash"] = fingerprint
+                        if fingerprint is not None:
+                            original_url = run_index.find(fingerprint)
+                            if original_url:
+                                # Το canonical είναι ακόμα στο pipeline, αποθήκευση στο τέλος
+                                ctx["duplicate_of"] = original_url
+                                duplicates.append(ctx)
+                                continue
+                            canonical = find_near_duplicate(fingerprint)
+                            if canonical:
+                                print(f"[INFO] Αναδημοσίευση του {canonical['url'][:50]}: {ctx['url'][:50]}")
+                                ctx["cluster_id"] = canonical["id"]
+                                ctx["summary"] = canonical["summary"] or ""
+                                ctx["summary_engine"] = canonical["summary_engine"]
+                                save(ctx)
+                                continue
+                            run_index.add(ctx["url"], fingerprint)
+                            run_originals[ctx["url"]] = ctx
+
+                        # AI summarization με το πραγματικό content (αν υπάρχει), σε batches
+                        to_summarize.append(ctx)
+
+                    elif stage == "summary":
+                        try:
+                            summaries = fut.result()
+                        except Exception as e:
+                            print(f"[WARNING] Σφάλμα AI summarization: {e}")
+                            summaries = [(None, None)] * len(ctx)
+                        for item, (summary, engine) in zip(ctx, summaries):
+                            item["summary"] = summary or ""
+                            item["summary_engine"] = engine
+                            save(item)
+
+                # Batch γεμάτο ή δεν έρχονται άλλα άρθρα από feeds/fetches
+                upstream = any(stage != "summary" for stage, _ in pending.values())
+                while to_summarize and (len(to_summarize) >= SUMMARY_BATCH_SIZE or not upstream):
+                    batch = to_summarize[:SUMMARY_BATCH_SIZE]
+                    del to_summarize[:SUMMARY_BATCH_SIZE]
+                    pending[summary_pool.submit(
+                        summarize_articles, [(c["title"], c["content"]) for c in batch], True)] = ("summary", batch)
+
+            # Το ingest_news συνδέει κάθε αναδημοσίευση με το canonical μέσω duplicate_of
+            for ctx in duplicates:
+                original = run_originals[ctx["duplicate_of"]]
+                ctx["summary"] = original["summary"]
+                ctx["summary_engine"] = original.get("summary_engine")
+                save(ctx)
+            flush()
+
+            # Validators και watermark μόνο για πηγές με όλα τα άρθρα στη βάση
+            incomplete = 0
+            for url, state in fetched.items():
+                if outstanding[url] > 0 or url in failed_sources:
+                    incomplete += 1
+                    continue
+                update_source_state(url, **state["validators"])
+                try:
+                    save_watermark(url, state["guids"], state["newest_ts"], state["backlog"])
+                except Exception as e:
+                    print(f"[WARNING] Αδυναμία ενημέρωσης watermark για {url}: {e}")
+            if incomplete:
+                print(f"[INFO] {incomplete} πηγές με άρθρα που δεν αποθηκεύτηκαν θα ξαναδιαβαστούν στο επόμενο poll")
 
         print(f"[OK] Scraping ολοκληρώθηκε. Νέα αντικείμενα: {total_new}")
     except Exception as e:
         print(f"[ERROR] Κρίσιμο σφάλμα στο scraping: {e}")
     return total_new
 
+def scrape_job(job, sources: list = None) -> dict:
+    """Το run_scraping ως background job (βλ. jobs.py), για το /scrape/manual και τον scheduler"""
+    total_new = run_scraping(job=job, sources=sources)
+    return {
+        "new_articles": total_new,
+        "message": f"Scraping ολοκληρώθηκε. Βρέθηκαν {total_new} νέα άρθρα."
+    }
+
 def search_on_demand(query: str) -> int:
     """
     Κάνει ΕΞΥΠΝΗ αναζήτηση στο web με AI filtering και αποθηκεύει τα αποτελέσματα.
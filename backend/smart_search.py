@@ -1,11 +1,13 @@
 
-import os
 import time
+import threading
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
-from ai_summarizer import summarize_article
+from ai_summarizer import summarize_articles
 
 # Predefined search topics με keywords
 SMART_TOPICS = {
@@ -153,60 +155,119 @@ def duckduckgo_search(query: str, num_results: int = 10) -> list:
 
     return results
 
-def ai_filter_relevance(query: str, results: list, min_relevance: float = 0.6) -> list:
-    """
-    Χρησιμοποιεί AI για να φιλτράρει τα αποτελέσματα με βάση τη σχετικότητα.
-    """
-    api_key = os.getenv("OPENAI_API_KEY") or ""
-    if not api_key or not results:
-        return results
+# Batch relevance scoring: όλα τα αποτελέσματα ενός query σε ένα JSON request
+RELEVANCE_PROMPT = """Βαθμολόγησε πόσο σχετικό είναι κάθε αποτέλεσμα με το query "{query}"
+σε κλίμακα 0.0 (άσχετο) έως 1.0 (απόλυτα σχετικό).
+Απάντησε ΜΟΝΟ σε JSON: {{"scores": [{{"id": <id αποτελέσματος>, "relevance": 0.0}}]}}
 
-    try:
-        from openai import OpenAI
-        import httpx
-
-        http_client = httpx.Client(proxies=None, timeout=30.0)
-        client = OpenAI(api_key=api_key, http_client=http_client)
+{results}"""
+RELEVANCE_BATCH_SIZE = 20
+RELEVANCE_CACHE_MAX = 5000
 
-        filtered = []
-
-        for result in results:
-            try:
-                # Ρωτάμε το AI αν το αποτέλεσμα είναι σχετικό
-                prompt = f"""Είναι αυτό το άρθρο σχετικό με το query "{query}";
+# (query, url) -> relevance, LRU
+_relevance_cache = OrderedDict()
+_relevance_lock = threading.Lock()
 
-Τίτλος: {result.get('title', '')}
-Περιγραφή: {result.get('snippet', '')}
+def _relevance_key(query: str, url: str) -> tuple:
+    from utils import canonicalize_url, normalize_text
+    return normalize_text(query), canonicalize_url(url or "")
 
-Απάντησε ΜΟΝΟ με "ΝΑΙ" ή "ΟΧΙ"."""
-
-                resp = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=10,
-                    temperature=0
-                )
+def _score_batch(query: str, batch: list) -> dict:
+    """
+    Args:
+        batch: List από (id, result)
 
-                answer = resp.choices[0].message.content.strip().upper()
+    Returns:
+        dict id -> relevance για όσα αποτελέσματα βαθμολόγησε το μοντέλο
+    """
+    import json
+    import llm_gateway
 
-                if "ΝΑΙ" in answer or "YES" in answer:
-                    filtered.append(result)
+    listing = "\n\n".join(f"[id={i}]\nΤίτλος: {r.get('title', '')}\nΠεριγραφή: {r.get('snippet', '')}"
+                           for i, r in batch)
+    scores = {}
+    try:
+        resp = llm_gateway.chat(
+            [{"role": "user", "content": RELEVANCE_PROMPT.format(query=query, results=listing)}],
+            max_tokens=20 * len(batch) + 20,
+            temperature=0,
+            response_format={"type": "json_object"},
+        )
+        wanted = {i for i, _ in batch}
+        for entry in json.loads(resp.choices[0].message.content).get("scores", []):
+            try:
+                i, score = int(entry.get("id")), float(entry.get("relevance"))
+            except (TypeError, ValueError, AttributeError):
+                continue
+            if i in wanted:
+                scores[i] = min(1.0, max(0.0, score))
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα AI relevance scoring: {e}")
+    return scores
 
-                time.sleep(0.2)  # Rate limiting
+def ai_score_relevance(query: str, results: list) -> list:
+    """
+    Relevance score (0-1) για κάθε αποτέλεσμα, με cache ανά (query, url).
+    Πρώτα ο τοπικός classifier (local_classifier.py) και μόνο όσα έχουν
+    confidence κάτω από LOCAL_CLASSIFIER_MIN_CONFIDENCE πάνε στο LLM, με ένα
+    request ανά RELEVANCE_BATCH_SIZE αποτελέσματα
 
-            except Exception as e:
-                print(f"[WARNING] Σφάλμα AI filtering: {e}")
-                # Αν αποτύχει το AI, κρατάμε το αποτέλεσμα
-                filtered.append(result)
-                continue
+    Returns:
+        List με τα scores στην ίδια σειρά (None όπου το AI δεν απάντησε)
+    """
+    import llm_gateway
+    from local_classifier import score_relevance, LOCAL_CLASSIFIER_MIN_CONFIDENCE
+
+    keys = [_relevance_key(query, r.get('url')) for r in results]
+    with _relevance_lock:
+        scores = [_relevance_cache.get(key) for key in keys]
+        for key, score in zip(keys, scores):
+            if score is not None:
+                _relevance_cache.move_to_end(key)
+
+    for i, score in enumerate(scores):
+        if score is not None:
+            continue
+        local = score_relevance(query, f"{results[i].get('title', '')} {results[i].get('snippet', '')}")
+        if local and local[1] >= LOCAL_CLASSIFIER_MIN_CONFIDENCE:
+            scores[i] = round(local[0], 3)
+            with _relevance_lock:
+                _relevance_cache[keys[i]] = scores[i]
+                if len(_relevance_cache) > RELEVANCE_CACHE_MAX:
+                    _relevance_cache.popitem(last=False)
+
+    missing = [(i, results[i]) for i, score in enumerate(scores) if score is None]
+    if not missing or not llm_gateway.is_enabled():
+        return scores
+
+    batches = [missing[i:i + RELEVANCE_BATCH_SIZE] for i in range(0, len(missing), RELEVANCE_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=min(len(batches), llm_gateway.LLM_MAX_CONCURRENCY)) as pool:
+        for batch_scores in pool.map(lambda batch: _score_batch(query, batch), batches):
+            with _relevance_lock:
+                for i, score in batch_scores.items():
+                    scores[i] = score
+                    _relevance_cache[keys[i]] = score
+                while len(_relevance_cache) > RELEVANCE_CACHE_MAX:
+                    _relevance_cache.popitem(last=False)
+    return scores
 
-        http_client.close()
-        return filtered
+def ai_filter_relevance(query: str, results: list, min_relevance: float = 0.6) -> list:
+    """
+    Χρησιμοποιεί AI για να φιλτράρει τα αποτελέσματα με βάση τη σχετικότητα.
 
-    except Exception as e:
-        print(f"[ERROR] Σφάλμα AI filtering: {e}")
+    Κάθε αποτέλεσμα παίρνει πεδίο "relevance" και κρατιούνται όσα έχουν
+    relevance >= min_relevance. Αν αποτύχει το AI για κάποιο αποτέλεσμα,
+    το αποτέλεσμα κρατιέται.
+    """
+    if not results:
         return results
 
+    filtered = []
+    for result, score in zip(results, ai_score_relevance(query, results)):
+        if score is None or score >= min_relevance:
+            filtered.append(dict(result, relevance=score))
+    return filtered
+
 def smart_web_search(query: str, max_results: int = 10, use_ai_filter: bool = True) -> list:
     """
     Έξυπνη αναζήτηση στο web με AI filtering.
@@ -262,13 +323,13 @@ def search_by_topics(topics: list = None, max_per_topic: int = 5) -> dict:
             print(f"[INFO] Keyword: {keyword}")
             results = smart_web_search(keyword, max_results=3, use_ai_filter=True)
             topic_results.extend(results)
-            time.sleep(1)  # Rate limiting
 
         # Αφαιρούμε duplicates (με βάση το URL)
+        from utils import canonicalize_url
         seen_urls = set()
         unique_results = []
         for r in topic_results:
-            url = r.get('url', '')
+            url = canonicalize_url(r.get('url', ''))
             if url and url not in seen_urls:
                 seen_urls.add(url)
                 unique_results.append(r)
@@ -288,19 +349,29 @@ def save_search_results_to_db(results: list, query: str = "", topic: str = "", f
         topic: Το topic (optional)
         fetch_content: Αν True, κάνει fetch το πραγματικό content για καλύτερη AI ανάλυση
     """
-    from db import save_news_if_new
+    from db import ingest_news, filter_new_urls, find_near_duplicate
     from scraper import fetch_article_content
+    from utils import canonicalize_url
+    from near_dup import compute_simhash, SimHashIndex
 
-    saved_count = 0
+    items = []
+    # Αναδημοσιεύσεις μέσα στην ίδια λίστα αποτελεσμάτων
+    run_index = SimHashIndex()
+    summaries = {}
+    originals = []
+
+    # Batched έλεγχος για ήδη γνωστά URLs πριν από fetch και AI summary
+    new_urls = filter_new_urls([r.get('url', '') for r in results])
 
     for result in results:
         try:
             title = result.get('title', '')
-            url = result.get('url', '')
+            url = canonicalize_url(result.get('url', ''))
             snippet = result.get('snippet', '')
 
-            if not title or not url:
+            if not title or url not in new_urls:
                 continue
+            new_urls.discard(url)
 
             # Fetch το πραγματικό περιεχόμενο αν ζητηθεί
             content = ""
@@ -308,23 +379,52 @@ def save_search_results_to_db(results: list, query: str = "", topic: str = "", f
                 content = fetch_article_content(url)
                 print(f"[INFO] Fetched {len(content)} chars από {url[:50]}...")
 
-            # Δημιουργία AI summary με το πραγματικό content (αν υπάρχει) ή το snippet
-            summary = summarize_article(title, content or snippet) or snippet
-
             item = {
                 'title': title,
                 'url': url,
                 'date': result.get('date', datetime.now().isoformat(timespec='seconds')),
                 'source': f'Smart Search: {query or topic}',
                 'topic': topic or 'Γενικά',
-                'summary': summary
+                'content': content or snippet,
+                'simhash': compute_simhash(title, content or snippet)
             }
 
-            if save_news_if_new(item):
-                saved_count += 1
+            # Αναδημοσίευση ήδη γνωστού άρθρου: κρατάμε την περίληψη του canonical
+            original_url = run_index.find(item['simhash']) if item['simhash'] is not None else None
+            canonical = None if original_url else find_near_duplicate(item['simhash'])
+            if original_url:
+                item['duplicate_of'] = original_url
+            elif canonical:
+                item['cluster_id'] = canonical['id']
+                item['summary'] = canonical['summary'] or snippet
+                item['summary_engine'] = canonical['summary_engine'] if canonical['summary'] else None
+            else:
+                # AI summary με το πραγματικό content (αν υπάρχει) ή το snippet, σε batch
+                item['summary'] = snippet
+                originals.append(item)
+                if item['simhash'] is not None:
+                    run_index.add(url, item['simhash'])
+
+            items.append(item)
 
         except Exception as e:
             print(f"[WARNING] Σφάλμα αποθήκευσης result: {e}")
             continue
 
-    return saved_count
+    # Όλες οι περιλήψεις με λίγα round trips, το snippet ως fallback
+    if originals:
+        articles = [(it['title'], it['content']) for it in originals]
+        for item, (summary, engine) in zip(originals, summarize_articles(articles, with_engine=True)):
+            item['summary'] = summary or item['summary']
+            item['summary_engine'] = engine
+            summaries[item['url']] = (item['summary'], engine)
+    for item in items:
+        if 'duplicate_of' in item:
+            item['summary'], item['summary_engine'] = summaries[item['duplicate_of']]
+
+    # Όλα τα νέα άρθρα σε ένα transaction
+    try:
+        return len(ingest_news(items))
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα αποθήκευσης results: {e}")
+        return 0
@@ -0,0 +1,99 @@
+"""
+Υγεία πηγών και circuit breaker ανά πηγή
+
+Κάθε fetch πηγής καταγράφει latency (EWMA), αποτυχίες στη σειρά και το
+τελευταίο σφάλμα. Μετά από CIRCUIT_FAILURE_THRESHOLD αποτυχίες στη σειρά
+το circuit ανοίγει: η πηγή παραλείπεται από το scraping μέχρι το
+open_until, με exponential backoff (CIRCUIT_BASE_BACKOFF_MINUTES,
+διπλάσιο σε κάθε νέα αποτυχία, έως CIRCUIT_MAX_BACKOFF_HOURS). Όταν λήξει,
+το επόμενο scraping κάνει ένα δοκιμαστικό fetch (half-open): επιτυχία
+κλείνει το circuit, αποτυχία το ξανανοίγει με μεγαλύτερο backoff.
+"""
+
+import os
+import random
+from db import get_connection, SOURCES_DB
+from utils import now_epoch
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_BASE_BACKOFF_MINUTES = float(os.getenv("CIRCUIT_BASE_BACKOFF_MINUTES", "30"))
+CIRCUIT_MAX_BACKOFF_HOURS = float(os.getenv("CIRCUIT_MAX_BACKOFF_HOURS", "24"))
+# Βάρος της τελευταίας μέτρησης στο EWMA του latency
+LATENCY_ALPHA = 0.3
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+def backoff_seconds(consecutive_failures: int) -> float:
+    """Διάρκεια του ανοιχτού circuit μετά από `consecutive_failures` αποτυχίες"""
+    exponent = max(0, consecutive_failures - CIRCUIT_FAILURE_THRESHOLD)
+    backoff = CIRCUIT_BASE_BACKOFF_MINUTES * 60 * 2 ** min(exponent, 16)
+    return min(backoff, CIRCUIT_MAX_BACKOFF_HOURS * 3600)
+
+def circuit_state(consecutive_failures: int, open_until: int, now: int = None) -> str:
+    if (consecutive_failures or 0) < CIRCUIT_FAILURE_THRESHOLD:
+        return CLOSED
+    if open_until and open_until > (now or now_epoch()):
+        return OPEN
+    return HALF_OPEN
+
+def record_success(url: str, latency: float):
+    """Επιτυχημένο fetch: κλείνει το circuit και ενημερώνει το latency"""
+    latency_ms = latency * 1000
+    conn = get_connection(SOURCES_DB)
+    with conn:
+        conn.execute("""
+            UPDATE sources
+            SET consecutive_failures = 0, open_until = NULL,
+                latency_ms = CASE WHEN latency_ms IS NULL THEN ? ELSE ? * ? + (1 - ?) * latency_ms END
+            WHERE url = ?
+        """, (latency_ms, LATENCY_ALPHA, latency_ms, LATENCY_ALPHA, url))
+
+def record_failure(url: str, error: str, latency: float = None):
+    """
+    Αποτυχημένο fetch: μετράει τις αποτυχίες στη σειρά και ανοίγει το
+    circuit όταν φτάσουν το CIRCUIT_FAILURE_THRESHOLD
+
+    Returns:
+        Το νέο state του circuit
+    """
+    now = now_epoch()
+    conn = get_connection(SOURCES_DB)
+    with conn:
+        row = conn.execute("SELECT consecutive_failures FROM sources WHERE url=?", (url,)).fetchone()
+        if row is None:
+            return CLOSED
+        failures = (row[0] or 0) + 1
+        open_until = None
+        if failures >= CIRCUIT_FAILURE_THRESHOLD:
+            open_until = now + round(backoff_seconds(failures) * random.uniform(0.9, 1.1))
+        conn.execute("""
+            UPDATE sources
+            SET consecutive_failures = ?, open_until = ?, last_error = ?, last_error_at = ?,
+                latency_ms = COALESCE(?, latency_ms)
+            WHERE url = ?
+        """, (failures, open_until, (error or "")[:500], now,
+              latency * 1000 if latency is not None else None, url))
+    if open_until:
+        print(f"[WARNING] Circuit ανοιχτό για {url} ({failures} αποτυχίες στη σειρά) "
+              f"για {round((open_until - now) / 60)} λεπτά")
+        return OPEN
+    return CLOSED
+
+def open_circuits(now: int = None) -> set:
+    """URLs πηγών με ανοιχτό circuit (παραλείπονται από το scraping)"""
+    now = now or now_epoch()
+    rows = get_connection(SOURCES_DB).execute(
+        "SELECT url FROM sources WHERE consecutive_failures >= ? AND open_until > ?",
+        (CIRCUIT_FAILURE_THRESHOLD, now)).fetchall()
+    return {r[0] for r in rows}
+
+def health_dict(consecutive_failures, open_until, latency_ms, last_error, last_error_at) -> dict:
+    """Η υγεία μιας πηγής όπως εμφανίζεται στο /sources"""
+    return {
+        "state": circuit_state(consecutive_failures, open_until),
+        "consecutive_failures": consecutive_failures or 0,
+        "latency_ms": round(latency_ms) if latency_ms is not None else None,
+        "last_error": last_error,
+        "last_error_at": last_error_at,
+        "open_until": open_until,
+    }
@@ -1,13 +1,20 @@
 
-import os, sqlite3, requests
-from db import SOURCES_DB
+import requests
+from datetime import datetime
+from db import SOURCES_DB, SOURCES_EXTRA_COLUMNS, ensure_columns, get_connection
+from source_health import health_dict
+
+_sources_table_ready = False
 
 def init_sources_table():
-    conn = sqlite3.connect(SOURCES_DB)
-    cur = conn.cursor()
-    cur.execute("CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, type TEXT, last_check TEXT)")
-    conn.commit()
-    conn.close()
+    global _sources_table_ready
+    if _sources_table_ready:
+        return
+    conn = get_connection(SOURCES_DB)
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, type TEXT, last_check TEXT)")
+    ensure_columns(conn, "sources", SOURCES_EXTRA_COLUMNS)
+    _sources_table_ready = True
 
 def detect_source_type(url: str) -> str:
     try:
@@ -34,18 +41,16 @@ def add_source(url: str) -> str:
     try:
         init_sources_table()
         typ = detect_source_type(url)
-        conn = sqlite3.connect(SOURCES_DB)
+        conn = get_connection(SOURCES_DB)
         cur = conn.cursor()
 
         # Έλεγχος αν υπάρχει ήδη
         cur.execute("SELECT 1 FROM sources WHERE url=?", (url,))
         if cur.fetchone():
-            conn.close()
             return f"[WARNING] Η πηγή {url} υπάρχει ήδη."
 
-        cur.execute("INSERT INTO sources (url,type) VALUES (?,?)", (url, typ))
-        conn.commit()
-        conn.close()
+        with conn:
+            cur.execute("INSERT INTO sources (url,type) VALUES (?,?)", (url, typ))
         return f"[OK] Προστέθηκε πηγή {url} ({typ})"
     except Exception as e:
         return f"[ERROR] Σφάλμα κατά την προσθήκη πηγής: {str(e)}"
@@ -55,16 +60,14 @@ def remove_source(url: str) -> str:
         return "[ERROR] Το URL δεν μπορεί να είναι κενό."
 
     try:
-        conn = sqlite3.connect(SOURCES_DB)
+        conn = get_connection(SOURCES_DB)
         cur = conn.cursor()
         cur.execute("SELECT 1 FROM sources WHERE url=?", (url.strip(),))
         if not cur.fetchone():
-            conn.close()
             return f"[WARNING] Η πηγή {url} δεν βρέθηκε."
 
-        cur.execute("DELETE FROM sources WHERE url=?", (url.strip(),))
-        conn.commit()
-        conn.close()
+        with conn:
+            cur.execute("DELETE FROM sources WHERE url=?", (url.strip(),))
         return f"[OK] Αφαιρέθηκε η πηγή {url}"
     except Exception as e:
         return f"[ERROR] Σφάλμα κατά την αφαίρεση πηγής: {str(e)}"
@@ -72,12 +75,65 @@ def remove_source(url: str) -> str:
 def get_all_sources():
     try:
         init_sources_table()
-        conn = sqlite3.connect(SOURCES_DB)
-        cur = conn.cursor()
-        cur.execute("SELECT url,type,last_check FROM sources ORDER BY url ASC")
+        cur = get_connection(SOURCES_DB).cursor()
+        cur.execute("""
+            SELECT url, type, last_check, rate_ewma, poll_interval, next_poll_at,
+                   consecutive_failures, open_until, latency_ms, last_error, last_error_at
+            FROM sources ORDER BY url ASC
+        """)
         rows = cur.fetchall()
-        conn.close()
-        return [{"url": r[0], "type": r[1], "last_check": r[2]} for r in rows]
+        return [{
+            "url": r[0], "type": r[1], "last_check": r[2],
+            # Adaptive polling (polling.py)
+            "items_per_day": round(r[3] * 24, 2) if r[3] is not None else None,
+            "poll_interval_minutes": round(r[4] / 60) if r[4] is not None else None,
+            "next_poll_at": r[5],
+            # Circuit breaker (source_health.py)
+            "health": health_dict(*r[6:11]),
+        } for r in rows]
     except Exception as e:
         print(f"[ERROR] Σφάλμα κατά την ανάκτηση πηγών: {e}")
         return []
+
+def get_source_state(url: str) -> dict:
+    """Επιστρέφει τους HTTP validators (ETag, Last-Modified, hash) μιας πηγής"""
+    try:
+        cur = get_connection(SOURCES_DB).cursor()
+        cur.execute("SELECT etag,last_modified,content_hash,last_check FROM sources WHERE url=?", (url,))
+        row = cur.fetchone()
+    except Exception as e:
+        print(f"[WARNING] Αδυναμία ανάγνωσης κατάστασης πηγής {url}: {e}")
+        row = None
+    if not row:
+        return {}
+    return {"etag": row[0], "last_modified": row[1], "content_hash": row[2], "last_check": row[3]}
+
+def update_source_state(url: str, etag: str = None, last_modified: str = None, content_hash: str = None):
+    """
+    Αποθηκεύει τους validators της τελευταίας λήψης και ενημερώνει το last_check
+
+    Καλείται μόνο αφού αποθηκευτούν τα άρθρα της λήψης (βλ. scraper.run_scraping):
+    αν αποθηκευτούν νωρίτερα και το scraping ακυρωθεί ή αποτύχει, κάθε επόμενο
+    poll παίρνει 304 και τα άρθρα χάνονται. Οι τιμές αντικαθιστούν τις παλιές,
+    ώστε ένα ETag που σταμάτησε να στέλνει ο server να μη στέλνεται ξανά.
+    """
+    try:
+        conn = get_connection(SOURCES_DB)
+        with conn:
+            conn.execute("""
+                UPDATE sources
+                SET etag = ?, last_modified = ?, content_hash = ?, last_check = ?
+                WHERE url = ?
+            """, (etag, last_modified, content_hash, datetime.now().isoformat(timespec="seconds"), url))
+    except Exception as e:
+        print(f"[WARNING] Αδυναμία ενημέρωσης κατάστασης πηγής {url}: {e}")
+
+def mark_source_checked(url: str):
+    """Ενημερώνει μόνο το last_check (η πηγή δεν άλλαξε από την τελευταία λήψη)"""
+    try:
+        conn = get_connection(SOURCES_DB)
+        with conn:
+            conn.execute("UPDATE sources SET last_check = ? WHERE url = ?",
+                         (datetime.now().isoformat(timespec="seconds"), url))
+    except Exception as e:
+        print(f"[WARNING] Αδυναμία ενημέρωσης κατάστασης πηγής {url}: {e}")
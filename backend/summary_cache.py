@@ -0,0 +1,104 @@
+"""
+Summary Cache - Μόνιμη cache των AI περιλήψεων με κλειδί το hash του περιεχομένου
+
+Το ίδιο κείμενο έρχεται ξανά από πολλές πηγές, από το smart search και από
+το /notes/generate-summary. Με κλειδί sha256(model, prompt template, τίτλος,
+κανονικοποιημένο κείμενο) η περίληψη ζητείται από το LLM μία φορά.
+Το μέγεθος είναι περιορισμένο με LRU eviction (last_used).
+"""
+
+import os
+import time
+import hashlib
+import threading
+from db import get_connection
+
+CACHE_DB = os.path.join(os.path.dirname(__file__), "..", "data", "cache.db")
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "20000"))
+
+_cache_table_ready = False
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+def init_cache_table():
+    """Δημιουργία πίνακα summary_cache αν δεν υπάρχει (μία φορά ανά process)"""
+    global _cache_table_ready
+    if _cache_table_ready:
+        return
+    os.makedirs(os.path.dirname(CACHE_DB), exist_ok=True)
+    conn = get_connection(CACHE_DB)
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at INTEGER,
+                last_used INTEGER
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_summary_cache_last_used ON summary_cache(last_used)")
+    _cache_table_ready = True
+
+def cache_key(model: str, template: str, title: str, content: str) -> str:
+    """Hash των (model, prompt template, τίτλος, κανονικοποιημένο κείμενο)"""
+    normalized = " ".join((content or "").split())
+    raw = "\x1f".join([model or "", template or "", (title or "").strip(), normalized])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _count(hit: bool):
+    with _stats_lock:
+        _stats["hits" if hit else "misses"] += 1
+
+def get_cached_summary(key: str):
+    """
+    Returns:
+        Την αποθηκευμένη περίληψη ή None (μετράει hit/miss)
+    """
+    try:
+        init_cache_table()
+        conn = get_connection(CACHE_DB)
+        row = conn.execute("SELECT summary FROM summary_cache WHERE key=?", (key,)).fetchone()
+        if row:
+            with conn:
+                conn.execute("UPDATE summary_cache SET last_used=? WHERE key=?", (int(time.time()), key))
+        _count(bool(row))
+        return row[0] if row else None
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα ανάγνωσης summary cache: {e}")
+        return None
+
+def store_summary(key: str, summary: str):
+    """Αποθήκευση περίληψης και eviction των λιγότερο πρόσφατα χρησιμοποιημένων"""
+    if not summary:
+        return
+    try:
+        init_cache_table()
+        conn = get_connection(CACHE_DB)
+        now = int(time.time())
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO summary_cache(key, summary, created_at, last_used) "
+                         "VALUES (?,?,?,?)", (key, summary, now, now))
+            excess = conn.execute("SELECT count(*) FROM summary_cache").fetchone()[0] - SUMMARY_CACHE_MAX_ENTRIES
+            if excess > 0:
+                conn.execute("DELETE FROM summary_cache WHERE key IN "
+                             "(SELECT key FROM summary_cache ORDER BY last_used LIMIT ?)", (excess,))
+    except Exception as e:
+        print(f"[WARNING] Σφάλμα εγγραφής summary cache: {e}")
+
+def cache_stats() -> dict:
+    """Hits/misses από την εκκίνηση του process και μέγεθος της cache"""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    try:
+        init_cache_table()
+        entries = get_connection(CACHE_DB).execute("SELECT count(*) FROM summary_cache").fetchone()[0]
+    except Exception:
+        entries = 0
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0.0,
+        "entries": entries,
+        "max_entries": SUMMARY_CACHE_MAX_ENTRIES,
+    }
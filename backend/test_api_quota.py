@@ -0,0 +1,85 @@
+"""
+Test script για τις δεσμεύσεις του api_quota με πολλά threads και processes
+Τρέχει σε προσωρινή βάση (δεν αγγίζει το data/api_usage.db).
+Χρήση: python test_api_quota.py (ή pytest)
+"""
+
+import sys
+import os
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(__file__))
+
+import api_quota
+
+LIMIT_SECONDS = 20
+CALL_SECONDS = 2.0  # ίση με την αρχική εκτίμηση του reserve_quota
+
+def _use_db(path: str):
+    api_quota.DATA_DIR = os.path.dirname(path)
+    api_quota.USAGE_DB = path
+    api_quota.USAGE_FILE = os.path.join(os.path.dirname(path), "api_usage.log")
+    api_quota.MAX_DAILY_SECONDS = LIMIT_SECONDS
+    api_quota._table_ready = False
+
+def _calls(attempts: int) -> int:
+    """Κλήσεις όπως του ai_summarizer: δέσμευση, "κλήση", καταγραφή"""
+    granted = 0
+    for _ in range(attempts):
+        reservation = api_quota.reserve_quota()
+        if reservation is None:
+            continue
+        granted += 1
+        time.sleep(0.005)
+        api_quota.update_quota(CALL_SECONDS, prompt_tokens=100, completion_tokens=10,
+                               model="gpt-4o-mini", reservation=reservation)
+    return granted
+
+def _process_worker(path: str, attempts: int) -> int:
+    _use_db(path)
+    return _calls(attempts)
+
+def test_threads_respect_limit():
+    _use_db(os.path.join(tempfile.mkdtemp(prefix="test_quota_"), "api_usage.db"))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        granted = sum(pool.map(_calls, [10] * 8))
+    usage = api_quota.usage_today()
+    assert granted == LIMIT_SECONDS / CALL_SECONDS, granted
+    assert usage["seconds"] == LIMIT_SECONDS and usage["calls"] == granted, usage
+    assert usage["reserved_seconds"] == 0
+    assert api_quota.reserve_quota() is None
+    print(f"[OK] 8 threads: {granted} κλήσεις μέσα στο όριο")
+
+def test_processes_respect_limit():
+    path = os.path.join(tempfile.mkdtemp(prefix="test_quota_"), "api_usage.db")
+    # spawn: όπως στα Windows, κάθε process με δικά του connections και state
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        granted = sum(pool.starmap(_process_worker, [(path, 10)] * 4))
+    _use_db(path)
+    usage = api_quota.usage_today()
+    assert granted == LIMIT_SECONDS / CALL_SECONDS, granted
+    # Τα σύνολα διαβάζονται από τη βάση: ίδια σε όποιο process κι αν ρωτηθούν
+    assert usage["seconds"] == LIMIT_SECONDS and usage["calls"] == granted, usage
+    assert api_quota.check_api_quota() == LIMIT_SECONDS
+    print(f"[OK] 4 processes: {granted} κλήσεις μέσα στο όριο")
+
+def test_expired_reservation_released():
+    _use_db(os.path.join(tempfile.mkdtemp(prefix="test_quota_"), "api_usage.db"))
+    held = [api_quota.reserve_quota() for _ in range(int(LIMIT_SECONDS / CALL_SECONDS))]
+    assert all(r is not None for r in held)
+    assert api_quota.reserve_quota() is None
+    assert api_quota.usage_today()["reserved_seconds"] == LIMIT_SECONDS
+
+    # Process που πέθανε χωρίς update_quota: η δέσμευση λήγει μετά το TTL
+    conn = api_quota._conn()
+    with conn:
+        conn.execute("UPDATE quota_reservations SET expires_at = ? WHERE id = ?", (time.time() - 1, held[0]))
+    assert api_quota.reserve_quota() is not None
+    print("[OK] ληγμένες δεσμεύσεις δεν μετράνε στο όριο")
+
+if __name__ == "__main__":
+    test_threads_respect_limit()
+    test_processes_respect_limit()
+    test_expired_reservation_released()
@@ -0,0 +1,99 @@
+"""
+Test script για το jobs registry (dedup, ακύρωση, κατάσταση στη βάση)
+Τρέχει σε προσωρινή βάση (δεν αγγίζει το data/jobs.db).
+Χρήση: python test_jobs.py (ή pytest)
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(__file__))
+
+import jobs
+
+jobs.JOBS_DB = os.path.join(tempfile.mkdtemp(prefix="test_jobs_"), "jobs.db")
+jobs.JOB_HEARTBEAT_SECONDS = 0.2
+
+def _wait(job_id: str, timeout: float = 5) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.get_job(job_id)
+        if job.status not in jobs.ACTIVE_STATES:
+            return job.to_dict()
+        time.sleep(0.05)
+    raise AssertionError(f"Το job {job_id} δεν τελείωσε")
+
+def _steps(job, n: int, gate: threading.Event = None) -> dict:
+    if gate is not None:
+        gate.wait(5)
+    for i in range(n):
+        if job.cancelled:
+            return {"stopped_at": i}
+        job.report(i + 1, n, f"βήμα {i + 1}")
+        job.add_partial("last", i)
+        time.sleep(0.05)
+    return {"steps": n}
+
+def test_dedup_and_result():
+    gate = threading.Event()
+    job, created = jobs.submit_job("test", _steps, 3, gate, key="a")
+    same, created_again = jobs.submit_job("test", _steps, 3, key="a")
+    other, created_other = jobs.submit_job("test", _steps, 1, key="b")
+    assert created and not created_again and created_other
+    assert same.id == job.id and other.id != job.id
+    gate.set()
+
+    done = _wait(job.id)
+    assert done["status"] == jobs.DONE and done["result"] == {"steps": 3}
+    assert done["progress"] == {"done": 3, "total": 3, "message": "βήμα 3"}
+    assert done["partial"] == {"last": 2}
+    assert _wait(other.id)["status"] == jobs.DONE
+
+    # Μετά το τέλος, ίδιο (kind, key) ξεκινάει νέο job
+    again, created = jobs.submit_job("test", _steps, 1, key="a")
+    assert created and again.id != job.id
+    _wait(again.id)
+    print("[OK] ένα ενεργό job ανά (kind, key), αποτέλεσμα και progress στη βάση")
+
+def test_cancel_running_job():
+    job, _ = jobs.submit_job("test", _steps, 200, key="cancel")
+    time.sleep(0.2)
+    assert jobs.cancel_job(job.id)
+    finished = _wait(job.id)
+    assert finished["status"] == jobs.CANCELLED and finished["cancel_requested"]
+    assert finished["result"]["stopped_at"] < 200
+    assert not jobs.cancel_job(job.id)
+    assert not jobs.cancel_job("δεν-υπάρχει")
+    print("[OK] ακύρωση job σε εκτέλεση")
+
+def test_cancel_from_other_process():
+    job, _ = jobs.submit_job("test", _steps, 200, key="remote")
+    time.sleep(0.2)
+    # Όπως ένα cancel από άλλο worker: μόνο η σημαία στη βάση, όχι το τοπικό Event
+    conn = jobs._conn()
+    with conn:
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job.id,))
+    finished = _wait(job.id)
+    assert finished["status"] == jobs.CANCELLED, finished
+    print("[OK] αίτημα ακύρωσης από άλλο process φτάνει με το heartbeat")
+
+def test_dead_worker_job_is_reaped():
+    conn = jobs._conn()
+    with conn:
+        conn.execute("INSERT INTO jobs(id, kind, key, status, owner, heartbeat_at, created_at) "
+                      "VALUES ('dead1', 'test', 'dead', 'running', 'άλλο-process', ?, 0)",
+                      (time.time() - jobs.JOB_STALE_SECONDS - 1,))
+    assert jobs.get_job("dead1").status == jobs.FAILED
+    job, created = jobs.submit_job("test", _steps, 1, key="dead")
+    assert created
+    _wait(job.id)
+    print("[OK] jobs χωρίς heartbeat σημειώνονται failed και δεν μπλοκάρουν νέα")
+
+if __name__ == "__main__":
+    test_dedup_and_result()
+    test_cancel_running_job()
+    test_cancel_from_other_process()
+    test_dead_worker_job_is_reaped()
+    jobs.shutdown_jobs()
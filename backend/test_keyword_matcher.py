@@ -0,0 +1,47 @@
+"""
+Test script για το KeywordMatcher (όρια λέξεων, κλίσεις, προτεραιότητα topics)
+Χρήση: python test_keyword_matcher.py (ή pytest)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from keyword_matcher import KeywordMatcher, TOPIC_MATCHER
+
+def test_latin_word_boundaries():
+    assert TOPIC_MATCHER.matches("Lawn mowers and upvote grants granted") == {}
+    assert TOPIC_MATCHER.first("New PV law") == "Φωτοβολταϊκά"
+    assert TOPIC_MATCHER.matches("funding-law, (grant)") == {"Νομοθεσία": 1, "Επιδοτήσεις": 2}
+    assert TOPIC_MATCHER.matches("smart home automation") == {"Smart_Σπίτια": 3}
+    print("[OK] λατινικά keywords μόνο σε ολόκληρες λέξεις")
+
+def test_greek_word_starts_and_inflections():
+    # Keyword ως αρχή άλλης λέξης: όχι match
+    assert TOPIC_MATCHER.matches("Ο αγωγός έσπασε στην Αθήνα") == {}
+    assert TOPIC_MATCHER.matches("Έρχεται νέο προγραμματισμένο") == {}
+    assert TOPIC_MATCHER.matches("Αντλιοστάσιο και πανελλήνιο") == {}
+    # Keyword στη μέση λέξης: όχι match
+    assert TOPIC_MATCHER.matches("ανανόμος") == {}
+    # Κλίσεις, τόνοι και κεφαλαία
+    assert TOPIC_MATCHER.first("ΕΠΙΔΟΤΗΣΕΩΝ για στέγες") == "Επιδοτήσεις"
+    assert TOPIC_MATCHER.first("Τιμές φωτοβολταϊκών") == "Φωτοβολταϊκά"
+    assert TOPIC_MATCHER.first("νέου κανονισμού") == "Νομοθεσία"
+    assert TOPIC_MATCHER.matches("Προγράμματα ΕΣΠΑ") == {"Επιδοτήσεις": 2}
+    # Σε φράσεις κλίνεται μόνο η τελευταία λέξη: "αντλίας θερμότητας" δίνει αντλία + θερμότητα
+    assert TOPIC_MATCHER.matches("αντλίας θερμότητας") == {"Αντλίες": 2}
+    assert TOPIC_MATCHER.matches("Η αντλία θερμότητας") == {"Αντλίες": 3}
+    print("[OK] ελληνικά keywords στην αρχή λέξης, με κλίσεις")
+
+def test_priority_and_best():
+    matcher = KeywordMatcher({"Α": ["ηλιακό"], "Β": ["μπαταρία", "αποθήκευση"]})
+    text = "ηλιακό με μπαταρία και αποθήκευση"
+    assert matcher.first(text) == "Α"
+    assert matcher.best(text) == "Β"
+    assert matcher.best("τίποτα σχετικό") == ""
+    print("[OK] first: σειρά πίνακα, best: περισσότερα keywords")
+
+if __name__ == "__main__":
+    test_latin_word_boundaries()
+    test_greek_word_starts_and_inflections()
+    test_priority_and_best()
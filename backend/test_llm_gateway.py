@@ -0,0 +1,107 @@
+"""
+Test script για το llm_gateway με τοπικό fake OpenAI-compatible server
+Δεν χρειάζεται API key ούτε δίκτυο.
+Χρήση: python test_llm_gateway.py
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(__file__))
+
+FAKE_LATENCY = 0.2
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Απαντά σε POST /v1/chat/completions όπως το OpenAI API"""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = set()
+    requests = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeOpenAIHandler.connections.add(self.client_address)
+        FakeOpenAIHandler.requests += 1
+        time.sleep(FAKE_LATENCY)
+        prompt = body["messages"][-1]["content"]
+        content = f"Σύνοψη: {prompt[:40]}"
+        if body.get("response_format", {}).get("type") == "json_object":
+            # Batch summarization: μία περίληψη ανά [id=N]
+            ids = re.findall(r"\[id=(\d+)\]", prompt)
+            content = json.dumps({"summaries": [{"id": int(i), "summary": f"Σύνοψη άρθρου {i}"} for i in ids]})
+        payload = json.dumps({
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 20,
+                      "total_tokens": len(prompt) // 4 + 20},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def start_fake_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_gateway(n: int = 40):
+    print("=" * 60)
+    print("LLM GATEWAY TEST (fake server)")
+    print("=" * 60)
+
+    server = start_fake_server()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ["LLM_HTTP2"] = "false"  # ο http.server μιλάει μόνο HTTP/1.1
+
+    import llm_gateway
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        answers = list(pool.map(
+            lambda i: llm_gateway.chat_text(f"Άρθρο {i}", max_tokens=120), range(n)))
+    elapsed = time.time() - start
+
+    print(f"Κλήσεις: {FakeOpenAIHandler.requests}, απαντήσεις: {sum(1 for a in answers if a)}")
+    print(f"TCP συνδέσεις: {len(FakeOpenAIHandler.connections)} "
+          f"(max {llm_gateway.LLM_MAX_CONCURRENCY})")
+    print(f"Χρόνος: {elapsed:.2f}s (σειριακά θα ήταν {n * FAKE_LATENCY:.1f}s)")
+
+    if len(FakeOpenAIHandler.connections) <= llm_gateway.LLM_MAX_CONCURRENCY:
+        print("[OK] Οι συνδέσεις επαναχρησιμοποιούνται από το pool")
+    else:
+        print("[ERROR] Άνοιξαν περισσότερες συνδέσεις από το όριο")
+
+    # Οι fake περιλήψεις δεν πρέπει να μπουν στην πραγματική cache/quota
+    import tempfile
+    import api_quota
+    import ai_summarizer
+    import summary_cache
+    tmp = tempfile.mkdtemp()
+    summary_cache.CACHE_DB = os.path.join(tmp, "cache.db")
+    api_quota.USAGE_DB = os.path.join(tmp, "api_usage.db")
+    api_quota.USAGE_FILE = os.path.join(tmp, "api_usage.log")
+
+    requests_before = FakeOpenAIHandler.requests
+    summarize_articles = ai_summarizer.summarize_articles
+    articles = [(f"Τίτλος {i}", f"Κείμενο άρθρου νούμερο {i} " * 20) for i in range(20)]
+    summaries = summarize_articles(articles)
+    print(f"Batch: {len(articles)} άρθρα, {sum(1 for s in summaries if s)} περιλήψεις, "
+          f"{FakeOpenAIHandler.requests - requests_before} κλήσεις")
+
+    llm_gateway.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    test_gateway()
@@ -0,0 +1,142 @@
+"""
+Test script για το ingest, το near-duplicate clustering, το keyset
+pagination, το count_news και το FTS search του db.py
+Τρέχει σε προσωρινή βάση (δεν αγγίζει το data/).
+Χρήση: python test_news_db.py (ή pytest)
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+import db
+from near_dup import compute_simhash
+
+_tmp = tempfile.mkdtemp(prefix="test_news_db_")
+db.DATA_DIR = _tmp
+db.NEWS_DB = os.path.join(_tmp, "news.db")
+db.SOURCES_DB = os.path.join(_tmp, "sources.db")
+db.PROMPTS_DB = os.path.join(_tmp, "prompts.db")
+db.init_all()
+
+BODY = ("Το υπουργείο ανακοίνωσε νέο πρόγραμμα επιδότησης για φωτοβολταϊκά σε στέγες "
+        "κατοικιών με αυξημένη χρηματοδότηση για νοικοκυριά και αγρότες σε όλη τη χώρα. "
+        "Οι αιτήσεις ξεκινούν τον επόμενο μήνα μέσω της ηλεκτρονικής πλατφόρμας και η "
+        "επιδότηση καλύπτει μέρος του κόστους αγοράς και εγκατάστασης των συστημάτων.")
+
+def _reset():
+    conn = db.get_connection(db.NEWS_DB)
+    with conn:
+        conn.execute("DELETE FROM news")
+        conn.execute("DELETE FROM news_lsh")
+
+def _item(i: int, **extra) -> dict:
+    item = {"title": f"Άρθρο {i}", "url": f"https://example.gr/news/{i}", "source": "example.gr",
+            "topic": "Φωτοβολταϊκά" if i % 2 else "Μπαταρίες", "summary": f"Περίληψη {i}",
+            "date": f"2026-01-{1 + i % 28:02d} 10:{i % 60:02d}"}
+    item.update(extra)
+    return item
+
+def test_ingest_dedup():
+    _reset()
+    first = db.ingest_news([_item(1), _item(2)])
+    assert len(first) == 2
+
+    # Ίδιο άρθρο με tracking params, fragment και κεφαλαίο host: ίδιο canonical URL
+    again = db.ingest_news([
+        _item(1, url="https://EXAMPLE.gr/news/1?utm_source=fb&fbclid=x#top"),
+        _item(3), _item(3),
+    ])
+    assert [it["url"] for it in again] == ["https://example.gr/news/3"], again
+    assert db.count_news() == 3
+    assert db.filter_new_urls(["https://example.gr/news/1?utm_medium=rss",
+                               "https://example.gr/news/9"]) == {"https://example.gr/news/9"}
+    print("[OK] ingest dedup με canonical URLs")
+
+def test_near_duplicate_cluster():
+    _reset()
+    original = _item(1, simhash=compute_simhash("Νέο πρόγραμμα για φωτοβολταϊκά", BODY))
+    [stored] = db.ingest_news([original])
+
+    # Αναδημοσίευση με άλλη μορφοποίηση (κεφαλαία, στίξη): ίδιο fingerprint μετά το normalize
+    copy_hash = compute_simhash("ΝΕΟ ΠΡΟΓΡΑΜΜΑ ΓΙΑ ΦΩΤΟΒΟΛΤΑΪΚΑ!", BODY.replace(".", ",").upper())
+    match = db.find_near_duplicate(copy_hash)
+    assert match is not None and match["id"] == stored["id"], match
+
+    # Αναδημοσίευση και canonical στο ίδιο batch
+    batch = db.ingest_news([
+        _item(2, simhash=copy_hash, duplicate_of=match["url"]),
+        _item(3, title="Άλλη ιστορία", simhash=compute_simhash("Μπαταρίες", "εντελώς άλλο κείμενο " * 5)),
+        _item(4, duplicate_of="https://example.gr/news/3"),
+    ])
+    clusters = {it["url"]: it for it in db.fetch_news(limit=10)}
+    assert clusters["https://example.gr/news/2"]["cluster_id"] == stored["id"]
+    assert clusters["https://example.gr/news/4"]["cluster_id"] == clusters["https://example.gr/news/3"]["id"]
+    assert db.find_near_duplicate(compute_simhash("Εντελώς άσχετος τίτλος", "καμία σχέση " * 10)) is None
+
+    grouped = db.fetch_news(limit=10, group_duplicates=True)
+    assert sorted(it["url"] for it in grouped) == ["https://example.gr/news/1", "https://example.gr/news/3"]
+    dup_urls = {it["url"]: [d["url"] for d in it["duplicates"]] for it in grouped}
+    assert dup_urls["https://example.gr/news/1"] == ["https://example.gr/news/2"]
+    assert len(batch) == 3
+    print("[OK] SimHash near-duplicates παίρνουν το cluster_id του canonical")
+
+def test_pagination_and_count():
+    _reset()
+    db.ingest_news([_item(i, saved=0) for i in range(1, 58)])
+    # Ίδιο published_ts σε πολλά άρθρα: το id σπάει την ισοπαλία
+    db.ingest_news([_item(i, date="2026-02-01 12:00") for i in range(100, 110)])
+    for i in range(1, 20, 3):
+        db.mark_saved(f"https://example.gr/news/{i}")
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = db.fetch_news_page(limit=10, cursor=cursor)
+        seen.extend((it["published_ts"], it["id"]) for it in page["news"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 67 and len(set(seen)) == 67, len(seen)
+    assert seen == sorted(seen, reverse=True)
+    assert pages == 7
+
+    saved_ids, cursor = [], None
+    while True:
+        page = db.fetch_news_page(limit=2, cursor=cursor, saved=True)
+        saved_ids.extend(it["id"] for it in page["news"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(saved_ids) == db.count_news(saved=True) == 7
+    assert db.count_news() == 67
+    assert db.count_news(topic="Φωτοβολταϊκά") == len(db.fetch_news(limit=1000, topic="Φωτοβολταϊκά"))
+
+    try:
+        db.fetch_news_page(limit=10, cursor="όχι-cursor")
+        assert False, "μη έγκυρο cursor πρέπει να δίνει ValueError"
+    except ValueError:
+        pass
+    print("[OK] keyset pagination χωρίς κενά/διπλά και count_news")
+
+def test_fts_stemming():
+    _reset()
+    db.ingest_news([
+        _item(1, title="Νέες επιδοτήσεις για αντλίες θερμότητας", summary="Αιτήσεις από Δευτέρα"),
+        _item(2, title="Τιμές ρεύματος", summary="Επιδότηση στους λογαριασμούς"),
+        _item(3, title="Μπαταρίες αποθήκευσης", summary="Χωρίς σχέση"),
+    ])
+    found = db.search_news(["επιδότηση"])
+    assert found["total"] == 2, found
+    # Ο τίτλος έχει μεγαλύτερο βάρος από το summary
+    assert found["results"][0]["url"] == "https://example.gr/news/1"
+    assert db.search_news(["ΑΝΤΛΙΑ"])["total"] == 1
+    assert db.search_news(["φωτοβολταϊκά"])["total"] == 0
+    print("[OK] FTS search με stemming και accent folding")
+
+if __name__ == "__main__":
+    test_ingest_dedup()
+    test_near_duplicate_cluster()
+    test_pagination_and_count()
+    test_fts_stemming()
@@ -0,0 +1,86 @@
+"""
+Test script για το watermark.select_entries / entry_cap (incremental parsing των feeds)
+Δεν χρειάζεται βάση ούτε δίκτυο.
+Χρήση: python test_watermark.py (ή pytest)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from watermark import select_entries, entry_cap, FEED_MIN_ENTRIES, FEED_MAX_ENTRIES, FEED_SEEN_STOP
+
+NOW = 1_800_000_000
+
+def _feed(n: int, dated: bool = True) -> list:
+    """n entries, το νεότερο πρώτο (guid "g0" είναι το πιο πρόσφατο)"""
+    return [{"id": f"g{i}", "ts": NOW - i * 600 if dated else None} for i in range(n)]
+
+def _select(entries: list, watermark: dict) -> tuple:
+    selected, truncated = select_entries(entries, lambda e: e["id"], lambda e: e["ts"], watermark, "test")
+    return [guid for _, guid, _ in selected], truncated
+
+def test_first_poll_cap():
+    guids, truncated = _select(_feed(50), {})
+    assert guids == [f"g{i}" for i in range(FEED_MIN_ENTRIES)] and truncated
+
+    # Με ρυθμό 10 άρθρα/ώρα και 3 ώρες από το τελευταίο poll: 10 * 3 * headroom
+    watermark = {"rate_ewma": 10.0, "last_poll_at": NOW - 3 * 3600}
+    assert entry_cap(watermark, now=NOW) == 60
+    assert entry_cap({"rate_ewma": 1000.0, "last_poll_at": NOW - 86400}, now=NOW) == FEED_MAX_ENTRIES
+    assert entry_cap({"seen": {"g1"}}) == FEED_MAX_ENTRIES
+    print("[OK] όριο entries στο πρώτο poll")
+
+def test_stops_at_watermark():
+    entries = _feed(30)
+    watermark = {"seen": {f"g{i}" for i in range(3, 30)}, "newest_ts": NOW - 3 * 600}
+    guids, truncated = _select(entries, watermark)
+    assert guids == ["g0", "g1", "g2"] and not truncated
+
+    # Σειρά feed ανακατεμένη: ταξινομούνται με την ημερομηνία
+    guids, _ = _select(list(reversed(entries)), watermark)
+    assert guids == ["g0", "g1", "g2"]
+
+    # Γνωστό entry με νεότερη ημερομηνία (ενημέρωση άρθρου): παραλείπεται χωρίς στάση
+    updated = [{"id": "g5", "ts": NOW + 60}] + entries
+    guids, _ = _select(updated, watermark)
+    assert guids == ["g0", "g1", "g2"]
+    print("[OK] στάση στο πρώτο γνωστό entry (dated feed)")
+
+def test_undated_feed_tolerates_pinned_entries():
+    entries = _feed(30, dated=False)
+    # Δύο pinned γνωστά entries στην κορυφή δεν σταματάνε την επανάληψη
+    pinned = [{"id": "p1", "ts": None}, {"id": "p2", "ts": None}]
+    watermark = {"seen": {"p1", "p2"} | {f"g{i}" for i in range(4, 30)}}
+    guids, truncated = _select(pinned + entries, watermark)
+    assert guids == ["g0", "g1", "g2", "g3"] and not truncated
+
+    # FEED_SEEN_STOP συνεχόμενα γνωστά: στάση
+    known = [{"id": f"k{i}", "ts": None} for i in range(FEED_SEEN_STOP)]
+    guids, _ = _select(known + [{"id": "new", "ts": None}], {"seen": {e["id"] for e in known}})
+    assert guids == []
+    print("[OK] feed χωρίς ημερομηνίες: στάση μετά από FEED_SEEN_STOP γνωστά")
+
+def test_backlog_drains_older_entries():
+    entries = _feed(300)
+    guids, truncated = _select(entries, {})
+    assert len(guids) == FEED_MIN_ENTRIES and truncated
+
+    # Επόμενο poll με backlog: τα γνωστά παραλείπονται, διαβάζονται τα παλαιότερα
+    seen = set(guids)
+    while truncated:
+        batch, truncated = _select(entries, {"seen": seen, "newest_ts": NOW, "backlog": True})
+        assert batch and not seen & set(batch)
+        assert len(batch) <= FEED_MAX_ENTRIES
+        seen |= set(batch)
+    assert seen == {e["id"] for e in entries}
+
+    # Χωρίς backlog ένα feed χωρίς νέα entries δεν δίνει τίποτα
+    assert _select(entries, {"seen": seen, "newest_ts": NOW}) == ([], False)
+    print("[OK] backlog: τα entries που κόπηκαν διαβάζονται στα επόμενα polls")
+
+if __name__ == "__main__":
+    test_first_poll_cap()
+    test_stops_at_watermark()
+    test_undated_feed_tolerates_pinned_entries()
+    test_backlog_drains_older_entries()
@@ -1 +1,153 @@
-# helpers placeholder
+# helpers
+
+import re
+import time
+import unicodedata
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+# Query params που χρησιμοποιούνται μόνο για tracking και δεν αλλάζουν το άρθρο
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "cmpid", "spm", "rut",
+}
+
+def _unwrap_redirect(url: str) -> str:
+    """Ξετυλίγει redirect links από DuckDuckGo (/l/?uddg=) και Google (/url?q=)"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    params = dict(parse_qsl(parts.query))
+    if host.endswith("duckduckgo.com") and parts.path.startswith("/l/") and params.get("uddg"):
+        return unquote(params["uddg"])
+    if host.endswith("google.com") and parts.path == "/url":
+        target = params.get("q") or params.get("url")
+        if target:
+            return target
+    if not host and parts.path == "/url" and params.get("q"):
+        return params["q"]
+    return url
+
+def canonicalize_url(url: str) -> str:
+    """
+    Κανονική μορφή URL για σύγκριση duplicates
+
+    Ξετυλίγει redirects, αφαιρεί fragment και tracking params (utm_*, fbclid κτλ),
+    κάνει lowercase scheme/host και αφαιρεί default ports.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if url.startswith("//"):
+        url = "https:" + url
+    url = _unwrap_redirect(url)
+    if url.startswith("//"):
+        url = "https:" + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS]
+    path = parts.path or ("/" if netloc else "")
+    return urlunsplit((scheme, netloc, path, urlencode(query, doseq=True), ""))
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+
+def fold_text(text: str) -> str:
+    """
+    Lowercase, αφαίρεση τόνων/διαλυτικών και τελικό σίγμα -> σ
+
+    Έτσι τα "Φωτοβολταϊκά", "ΦΩΤΟΒΟΛΤΑΙΚΑ" και "φωτοβολταικα" ταυτίζονται.
+    """
+    decomposed = unicodedata.normalize("NFD", (text or "").lower())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.replace("ς", "σ")
+
+def normalize_text(text: str) -> str:
+    """fold_text + αφαίρεση σημείων στίξης και πολλαπλών κενών"""
+    text = _NON_WORD_RE.sub(" ", fold_text(text))
+    return _SPACE_RE.sub(" ", text).strip()
+
+# Καταλήξεις κλίσης (μετά το fold_text), η μεγαλύτερη που ταιριάζει αφαιρείται
+_GREEK_SUFFIXES = sorted((
+    "ματων", "ματοσ", "ματα", "μα",
+    "ουσεσ", "ουσα", "ουμε", "ονται", "εται", "ομαι", "ηκαν", "ηκε", "ουν",
+    "εισ", "εων", "ουσ", "ων", "οι", "εσ", "ασ", "οσ", "ου", "ον", "ησ", "ισ", "ει",
+    "α", "ο", "η", "ι", "ε", "υ", "σ", "ω",
+), key=len, reverse=True)
+_GREEK_RE = re.compile(r"[α-ω]")
+# Ελάχιστο μήκος του stem που μένει
+_MIN_STEM = 3
+
+def stem_token(token: str) -> str:
+    """
+    Απλό stemming με λίστα καταλήξεων (για tokens μετά το normalize_text)
+
+    Στα ελληνικά αφαιρείται η μεγαλύτερη κατάληξη κλίσης που αφήνει stem
+    τουλάχιστον _MIN_STEM χαρακτήρων, ώστε π.χ. "φωτοβολταικα" /
+    "φωτοβολταικων" / "φωτοβολταικο" -> "φωτοβολταικ" και "επιδοτηση" /
+    "επιδοτησεισ" / "επιδοτησεων" -> "επιδοτησ". Στα λατινικά αφαιρείται
+    μόνο το τελικό s του πληθυντικού.
+    """
+    if _GREEK_RE.search(token):
+        for suffix in _GREEK_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+                return token[:-len(suffix)]
+        return token
+    if len(token) >= 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def tokenize(text: str) -> list:
+    """normalize_text + stem_token για κάθε λέξη"""
+    return [stem_token(t) for t in normalize_text(text).split()]
+
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y")
+
+def parse_date_to_epoch(value):
+    """
+    Μετατρέπει ημερομηνία σε UTC epoch seconds
+
+    Δέχεται RFC 822 (RSS), ISO 8601, συνηθισμένα formats και epoch αριθμούς.
+    Ημερομηνίες χωρίς timezone θεωρούνται τοπική ώρα.
+
+    Returns:
+        int ή None αν δεν αναγνωρίζεται
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value / 1000 if value > 1e11 else value)
+    text = str(value).strip()
+    if text.isdigit():
+        return parse_date_to_epoch(int(text))
+
+    dt = None
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        pass
+    if dt is None:
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            for fmt in _DATE_FORMATS:
+                try:
+                    dt = datetime.strptime(text, fmt)
+                    break
+                except ValueError:
+                    continue
+    if dt is None:
+        return None
+    try:
+        return int(dt.timestamp())
+    except (OverflowError, OSError, ValueError):
+        return None
+
+def now_epoch() -> int:
+    return int(time.time())
@@ -0,0 +1,148 @@
+"""
+Watermark ανά πηγή για incremental parsing των feeds (RSS και API)
+
+Για κάθε πηγή κρατάμε τα GUIDs/links των πρόσφατων entries που έχουμε ήδη
+δει (seen_guids, τα πιο πρόσφατα πρώτα, έως FEED_WATERMARK_SIZE) και το πιο
+πρόσφατο published timestamp (newest_published_ts). Τα fetchers διατρέχουν
+τα entries από το νεότερο προς το παλαιότερο και σταματούν μόλις φτάσουν σε
+entry που έχουν ήδη δει, οπότε ένα feed με 1-2 νέα άρθρα δεν ξαναπερνάει
+από canonicalization, DB lookup και HTML parsing για όλα τα υπόλοιπα.
+
+Το όριο entries ανά fetch δεν είναι πια σταθερό 20: χωρίς watermark (πρώτο
+poll) προκύπτει από τον ρυθμό δημοσίευσης της πηγής (polling.py)
+επί τον χρόνο από το τελευταίο poll, με ελάχιστο FEED_MIN_ENTRIES. Με
+watermark το σημείο στάσης είναι γνωστό, οπότε ισχύει μόνο το FEED_MAX_ENTRIES.
+Αν ένα fetch κοπεί στο όριο, η πηγή σημειώνεται με backlog: στο επόμενο poll
+τα γνωστά entries παραλείπονται χωρίς να σταματάει η επανάληψη, ώστε να
+διαβαστούν και τα παλαιότερα που έμειναν εκτός.
+
+Οι HTML πηγές δεν χρησιμοποιούν watermark: τα links μιας σελίδας δεν έχουν
+σειρά ούτε ημερομηνίες, οπότε κρατάνε σταθερό όριο (scraper.HTML_MAX_LINKS).
+"""
+
+import os
+import json
+import math
+from db import get_connection, SOURCES_DB
+from utils import now_epoch
+
+FEED_MIN_ENTRIES = int(os.getenv("FEED_MIN_ENTRIES", "20"))
+FEED_MAX_ENTRIES = int(os.getenv("FEED_MAX_ENTRIES", "200"))
+FEED_WATERMARK_SIZE = int(os.getenv("FEED_WATERMARK_SIZE", "500"))
+# Περιθώριο πάνω από τα αναμενόμενα νέα entries (ρυθμός x χρόνος από το τελευταίο poll)
+FEED_CAP_HEADROOM = 2
+# Χωρίς ημερομηνίες η σειρά είναι αυτή του feed: σταματάμε μετά από τόσα
+# συνεχόμενα γνωστά entries (ανεκτικό σε pinned/sticky entries στην κορυφή)
+FEED_SEEN_STOP = 3
+
+def load_watermark(url: str) -> dict:
+    """
+    Returns:
+        Dict με seen (set από GUIDs/links), newest_ts, backlog, rate_ewma και
+        last_poll_at της πηγής, ή κενό dict αν η πηγή δεν υπάρχει
+    """
+    try:
+        row = get_connection(SOURCES_DB).execute(
+            "SELECT seen_guids, newest_published_ts, rate_ewma, last_poll_at, watermark_backlog "
+            "FROM sources WHERE url=?", (url,)).fetchone()
+    except Exception as e:
+        print(f"[WARNING] Αδυναμία ανάγνωσης watermark για {url}: {e}")
+        row = None
+    if not row:
+        return {}
+    try:
+        seen = set(json.loads(row[0])) if row[0] else set()
+    except ValueError:
+        seen = set()
+    return {"seen": seen, "newest_ts": row[1], "rate_ewma": row[2], "last_poll_at": row[3],
+            "backlog": bool(row[4])}
+
+def save_watermark(url: str, guids: list, newest_ts: int = None, backlog: bool = False):
+    """
+    Προσθέτει τα GUIDs ενός fetch στο watermark της πηγής
+
+    Args:
+        url: Η πηγή
+        guids: GUIDs/links των entries που επεξεργάστηκαν, τα νεότερα πρώτα
+        newest_ts: Το νεότερο published timestamp ανάμεσά τους
+        backlog: Αν το fetch κόπηκε στο όριο entries (βλ. select_entries)
+    """
+    conn = get_connection(SOURCES_DB)
+    with conn:
+        row = conn.execute("SELECT seen_guids, newest_published_ts FROM sources WHERE url=?", (url,)).fetchone()
+        if row is None:
+            return
+        try:
+            previous = json.loads(row[0]) if row[0] else []
+        except ValueError:
+            previous = []
+        # dict.fromkeys: dedup κρατώντας τη σειρά (νεότερα πρώτα)
+        seen = list(dict.fromkeys([g for g in guids if g] + previous))[:FEED_WATERMARK_SIZE]
+        newest = max((ts for ts in (row[1], newest_ts) if ts is not None), default=None)
+        conn.execute("UPDATE sources SET seen_guids = ?, newest_published_ts = ?, watermark_backlog = ? WHERE url = ?",
+                     (json.dumps(seen, ensure_ascii=False), newest, int(backlog), url))
+
+def entry_cap(watermark: dict, now: int = None) -> int:
+    """
+    Μέγιστο πλήθος νέων entries που διαβάζονται σε ένα fetch
+
+    Args:
+        watermark: Το αποτέλεσμα του load_watermark. Με γνωστά entries το
+                   watermark ορίζει το σημείο στάσης
+    """
+    if watermark.get("seen"):
+        return FEED_MAX_ENTRIES
+    rate, last_poll_at = watermark.get("rate_ewma"), watermark.get("last_poll_at")
+    if not rate or not last_poll_at:
+        return FEED_MIN_ENTRIES
+    hours = max(0, (now or now_epoch()) - last_poll_at) / 3600
+    expected = math.ceil(rate * hours * FEED_CAP_HEADROOM)
+    return min(FEED_MAX_ENTRIES, max(FEED_MIN_ENTRIES, expected))
+
+def select_entries(entries: list, key, published, watermark: dict, source: str = "") -> tuple:
+    """
+    Τα entries ενός feed που δεν έχουμε ήδη δει, από το νεότερο προς το παλαιότερο
+
+    Αν όλα τα entries έχουν ημερομηνία ταξινομούνται με αυτήν και η επανάληψη
+    σταματάει στο πρώτο γνωστό entry που δεν είναι νεότερο από το
+    newest_published_ts (ένα γνωστό entry με νεότερη ημερομηνία είναι
+    ενημέρωση και απλώς παραλείπεται). Αλλιώς ισχύει η σειρά του feed και η
+    επανάληψη σταματάει μετά από FEED_SEEN_STOP συνεχόμενα γνωστά entries.
+    Με backlog (το προηγούμενο fetch κόπηκε στο όριο) τα γνωστά entries
+    απλώς παραλείπονται.
+
+    Args:
+        entries: Τα entries όπως τα δίνει ο parser
+        key: Συνάρτηση entry -> GUID/link
+        published: Συνάρτηση entry -> epoch ή None
+        watermark: Το αποτέλεσμα του load_watermark
+        source: Το URL της πηγής (για logging)
+
+    Returns:
+        (selected, truncated): list από (entry, guid, published_ts) και αν η
+        επανάληψη κόπηκε στο όριο entries
+    """
+    seen = watermark.get("seen") or set()
+    newest_ts = watermark.get("newest_ts")
+    backlog = watermark.get("backlog", False)
+    stamped = [(e, key(e), published(e)) for e in entries]
+    dated = bool(stamped) and all(ts is not None for _, _, ts in stamped)
+    if dated:
+        stamped.sort(key=lambda s: s[2], reverse=True)
+    cap = entry_cap(watermark)
+
+    selected, seen_run = [], 0
+    for e, guid, ts in stamped:
+        if guid in seen:
+            seen_run += 1
+            if backlog:
+                continue
+            if (dated and (newest_ts is None or ts <= newest_ts)) or seen_run >= FEED_SEEN_STOP:
+                break
+            continue
+        seen_run = 0
+        if len(selected) >= cap:
+            print(f"[INFO] {source}: διαβάστηκαν τα {cap} νεότερα νέα entries, τα υπόλοιπα στο επόμενο poll")
+            return selected, True
+        selected.append((e, guid, ts))
+    return selected, False